@@ -0,0 +1,6 @@
+"""
+Benchmarks for the dMaster ontology and cohort pipelines.
+
+Run a benchmark module directly, e.g. ``python -m benchmarks.bench_combine_ontologies``
+from the backend directory.
+"""
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for unified_parser's ClassIndex against the old linear class scan.
+
+Generates a synthetic core ontology (a layered DAG where each class has one
+to three parents in the layer above), then reports index build time and the
+per-call cost of validity and subsumption checks, with and without the index,
+as JSON. The linear baseline runs on a sample since it is O(n) per lookup.
+
+    python -m benchmarks.bench_class_index --classes 50000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.append(str(BACKEND_DIR / "scripts" / "ingest" / "json_parser"))
+
+from unified_parser import ClassIndex
+
+
+def build_classes(count: int, fan_out: int = 8, seed: int = 0) -> List[Dict[str, Any]]:
+    """count classes in layers fan_out times wider than the one above."""
+    rng = random.Random(seed)
+    classes = [{"id": "ex:C0", "label": "C0", "subClassOf": []}]
+    layer_start, layer_end = 0, 1
+    while len(classes) < count:
+        width = min((layer_end - layer_start) * fan_out, count - len(classes))
+        for _ in range(width):
+            i = len(classes)
+            parents = rng.sample(range(layer_start, layer_end), min(rng.randint(1, 3), layer_end - layer_start))
+            classes.append({"id": f"ex:C{i}", "label": f"C{i}", "subClassOf": [f"ex:C{p}" for p in parents]})
+        layer_start, layer_end = layer_end, len(classes)
+    return classes
+
+
+def linear_get(classes: List[Dict[str, Any]], class_id: str) -> Optional[Dict[str, Any]]:
+    for cls in classes:
+        if cls["id"] == class_id:
+            return cls
+    return None
+
+
+def linear_is_subclass_of(classes: List[Dict[str, Any]], sub_class_id: str, super_class_id: str) -> bool:
+    if sub_class_id == super_class_id:
+        return True
+    current = linear_get(classes, sub_class_id)
+    if not current:
+        return False
+    for parent_id in current.get("subClassOf", []):
+        if parent_id == super_class_id or linear_is_subclass_of(classes, parent_id, super_class_id):
+            return True
+    return False
+
+
+def per_call(func, calls) -> float:
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return (time.perf_counter() - start) / len(calls)
+
+
+def run(class_count: int, lookups: int = 100000, baseline_lookups: int = 200) -> Dict[str, Any]:
+    classes = build_classes(class_count)
+    rng = random.Random(1)
+    ids = [cls["id"] for cls in classes]
+    pairs = [(rng.choice(ids), rng.choice(ids[:len(ids) // 10 or 1])) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    index = ClassIndex(classes)
+    build_seconds = time.perf_counter() - start
+
+    sample = pairs[:baseline_lookups]
+    result = {
+        "classes": len(classes),
+        "index_build_seconds": round(build_seconds, 4),
+        "closure_entries": sum(len(s) for s in index.superclasses.values()),
+        "indexed": {
+            "is_valid_us": round(per_call(index.__contains__, [(a,) for a, _ in pairs]) * 1e6, 3),
+            "is_subclass_of_us": round(per_call(index.is_subclass_of, pairs) * 1e6, 3),
+        },
+        "linear": {
+            "is_valid_us": round(per_call(lambda a: linear_get(classes, a), [(a,) for a, _ in sample]) * 1e6, 3),
+            "is_subclass_of_us": round(per_call(lambda a, b: linear_is_subclass_of(classes, a, b), sample) * 1e6, 3),
+        },
+    }
+    assert all(index.is_subclass_of(a, b) == linear_is_subclass_of(classes, a, b) for a, b in sample[:50])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.classes, args.lookups), indent=2))
+
+
+if __name__ == "__main__":
+    main()
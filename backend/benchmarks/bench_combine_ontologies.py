@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Time and memory benchmark for OntologyCombiner.
+
+Combines the current module set and synthetic module sets scaled up from it
+(every module's triples replicated ``scale`` times under fresh IRIs), and
+reports wall time, peak traced memory and triple counts as JSON.
+
+    python -m benchmarks.bench_combine_ontologies --scales 1 10
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from rdflib import Graph, URIRef
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.append(str(BACKEND_DIR / "scripts"))
+
+from combine_ontologies import OntologyCombiner
+
+ONTOLOGIES_DIR = BACKEND_DIR / "ontologies"
+INTERNAL_NAMESPACE = "http://example.org/"
+
+
+def _scaled(term, copy: int):
+    if copy and isinstance(term, URIRef) and str(term).startswith(INTERNAL_NAMESPACE):
+        return URIRef(f"{term}_{copy}")
+    return term
+
+
+def build_module_set(target_dir: Path, scale: int = 1) -> Path:
+    """Copy the ontology modules into target_dir, replicating each module's triples scale times."""
+    ontology_dir = target_dir / "ontologies"
+    shutil.copytree(ONTOLOGIES_DIR, ontology_dir,
+                    ignore=shutil.ignore_patterns(".combine_cache", "combined_ontology.ttl"))
+    if scale > 1:
+        module_files = list(ontology_dir.rglob("*_core.ttl")) + [ontology_dir / "main_ontology" / "ontology.ttl"]
+        for module_file in module_files:
+            g = Graph()
+            g.parse(module_file, format="turtle")
+            original = list(g)
+            for copy in range(1, scale):
+                g.addN((_scaled(s, copy), p, _scaled(o, copy), g) for s, p, o in original)
+            g.serialize(destination=module_file, format="turtle")
+    return target_dir
+
+
+def measure(base_dir: Path, **combiner_kwargs) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    combiner = OntologyCombiner(str(base_dir), **combiner_kwargs)
+    combiner.combine_ontologies()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 4),
+        "peak_mib": round(peak / (1 << 20), 2),
+        "triples": len(combiner.combined_graph),
+        "output_bytes": combiner.output_file.stat().st_size if combiner.output_file.exists() else 0,
+    }
+
+
+def run(scales, repeat: int = 3) -> dict:
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = build_module_set(Path(tmp), scale)
+            runs = [measure(base_dir) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["seconds"])
+            results[f"scale_{scale}"] = {"scale": scale, **best}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10],
+                        help="Module-set size multipliers to benchmark (default: 1 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scale; the fastest is reported")
+    args = parser.parse_args()
+    print(json.dumps(run(args.scales, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
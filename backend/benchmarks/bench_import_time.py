@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for unified_parser, usable as a startup regression gate.
+
+Runs ``python -X importtime -c "import unified_parser"`` in fresh
+interpreters, from an empty working directory and with bytecode cached under
+a temporary PYTHONPYCACHEPREFIX (one warm-up run fills it), and reports as
+JSON:
+
+* the median cumulative import time of unified_parser, and its self time;
+* the slowest modules it pulls in;
+* modules that must only load on use (yaml, rdflib, ...) but were imported;
+* files the import left in the working directory (it used to open
+  cohort_parser.log).
+
+Exits with status 1 when the median is more than --tolerance slower than
+the stored baseline (or over --budget-ms, if given), a lazy module was
+imported or a file was created. --save-baseline writes the report as the
+baseline; re-measure it after a deliberate change to the import.
+
+    python -m benchmarks.bench_import_time --runs 7
+    python -m benchmarks.bench_import_time --runs 15 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+PARSER_DIR = BACKEND_DIR / "scripts" / "ingest" / "json_parser"
+MODULE = "unified_parser"
+# Loaded by ParserContext or the optional backends, never by the import itself
+LAZY_MODULES = ("yaml", "rdflib", "owlready2")
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "import_time.json"
+DEFAULT_TOLERANCE = 0.25
+SLOWEST = 10
+
+
+def parse_importtime(stderr: str, module: str = MODULE) -> Dict[str, Tuple[int, int]]:
+    """
+    module and everything imported under it -> (self, cumulative) microseconds, from -X importtime output.
+
+    A module is listed after the modules it imports, one level deeper, so
+    module's subtree is every line between the previous top-level line and
+    module's own.
+    """
+    subtree: Dict[str, Tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        name = raw_name.strip()
+        subtree[name] = (int(self_us), int(cumulative_us))
+        # Top-level lines are indented by the single space after the "|"
+        if len(raw_name) - len(raw_name.lstrip()) == 1:
+            if name == module:
+                return subtree
+            subtree = {}
+    return {}
+
+
+def import_once(work_dir: str, pycache_dir: str) -> Dict[str, Tuple[int, int]]:
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    env["PYTHONPATH"] = str(PARSER_DIR)
+    env["PYTHONPYCACHEPREFIX"] = pycache_dir
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+                         cwd=work_dir, env=env, check=True, capture_output=True, text=True)
+    return parse_importtime(out.stderr)
+
+
+def run(runs: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as work_dir, tempfile.TemporaryDirectory() as pycache_dir:
+        import_once(work_dir, pycache_dir)
+        samples: List[Dict[str, Tuple[int, int]]] = [import_once(work_dir, pycache_dir) for _ in range(runs)]
+        created = sorted(os.listdir(work_dir))
+
+    # Modules already loaded at startup (by site) do not show up in the subtree
+    last = samples[-1]
+    slowest = sorted(((name, us[0]) for name, us in last.items() if name != MODULE),
+                     key=lambda item: item[1], reverse=True)[:SLOWEST]
+    return {
+        "python": platform.python_version(),
+        "runs": runs,
+        "median_ms": round(statistics.median(s[MODULE][1] for s in samples) / 1000, 2),
+        "self_ms": round(statistics.median(s[MODULE][0] for s in samples) / 1000, 2),
+        "slowest_self_ms": {name: round(us / 1000, 2) for name, us in slowest},
+        "lazy_modules_imported": [name for name in LAZY_MODULES if name in last],
+        "files_created": created,
+    }
+
+
+def failures(report: Dict[str, Any], budget_ms: Optional[float] = None, baseline: Optional[Dict[str, Any]] = None,
+             tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Why the report fails the gate; empty when it passes."""
+    found = []
+    if budget_ms is not None and report["median_ms"] > budget_ms:
+        found.append(f"import takes {report['median_ms']} ms, budget {budget_ms} ms")
+    if baseline is not None:
+        if baseline.get("python") != report["python"]:
+            found.append(f"baseline was measured on Python {baseline.get('python')}; not comparable")
+        elif report["median_ms"] > baseline["median_ms"] * (1 + tolerance):
+            found.append(f"import takes {report['median_ms']} ms, baseline {baseline['median_ms']} ms")
+    if report["lazy_modules_imported"]:
+        found.append(f"imported on import: {', '.join(report['lazy_modules_imported'])}")
+    if report["files_created"]:
+        found.append(f"files created on import: {', '.join(report['files_created'])}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, help="Also fail when the median import exceeds this")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help=f"Compare with this baseline report (default {DEFAULT_BASELINE.relative_to(BACKEND_DIR)})")
+    parser.add_argument("--save-baseline", type=Path, nargs="?", const=DEFAULT_BASELINE,
+                        help="Write the report as the baseline instead of comparing with one")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+    report = run(args.runs)
+    baseline = None
+    if not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report["failures"] = failures(report, args.budget_ms, baseline, args.tolerance)
+    print(json.dumps(report, indent=2))
+    if args.save_baseline:
+        os.makedirs(args.save_baseline.parent, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in report.items() if key != "failures"}, f, indent=2)
+            f.write("\n")
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
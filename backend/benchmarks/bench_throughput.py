@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the JSON -> TTL path, with a stored baseline.
+
+Generates synthetic cohorts (see synthetic_cohorts) once, then for each
+batch size runs, in a fresh interpreter so peak RSS is not shared:
+
+* parse_cohort_json and write_triples_to_file for the first ``size``
+  cohorts, with one ConceptRegistry for the batch as run_all_parsers shares
+  one between its workers;
+* combine_ttl_files over the TTL files written.
+
+Reports triples/sec and files/sec of the parse (and of the whole run),
+peak RSS, and TTL and combined output bytes as JSON.
+
+With --save-baseline the report is written to a baseline file; with
+--baseline it is compared with one, and the run exits with status 1 when a
+size got slower or bigger in memory by more than --tolerance. Changed output
+sizes are reported too, as the parser output itself changed.
+
+    python -m benchmarks.bench_throughput --sizes 10 100 1000 10000 --baseline benchmarks/baselines/throughput.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.synthetic_cohorts import CohortShape, add_shape_arguments, shape_from_args, write_cohorts
+
+BACKEND_DIR = Path(__file__).parent.parent
+PARSER_DIR = BACKEND_DIR / "scripts" / "ingest" / "json_parser"
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "throughput.json"
+DEFAULT_TOLERANCE = 0.25
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_size(input_dir: str, size: int, output_dir: str) -> Dict[str, Any]:
+    """Parse the first size cohorts of input_dir and combine them; called in a child interpreter."""
+    sys.path.append(str(PARSER_DIR))
+    import logging
+    import unified_parser
+    from combine_ttl_files import combine_ttl_files
+    from concept_registry import ConceptRegistry
+    logging.disable(logging.CRITICAL)
+    unified_parser.get_context().load()
+
+    json_files = sorted(Path(input_dir).glob("*.json"))[:size]
+    ttl_dir = Path(output_dir) / "ttl"
+    ttl_dir.mkdir(parents=True)
+    combined_file = Path(output_dir) / "combined.ttl"
+    registry = ConceptRegistry()
+
+    start = time.perf_counter()
+    triples = 0
+    for json_file in json_files:
+        parsed = unified_parser.parse_cohort_json(str(json_file), registry=registry)
+        triples += unified_parser.write_triples_to_file(parsed, str(ttl_dir / f"{json_file.stem}.ttl"))
+    parse_seconds = time.perf_counter() - start
+    combine_ttl_files(str(ttl_dir), str(combined_file))
+    total_seconds = time.perf_counter() - start
+
+    return {
+        "files": len(json_files),
+        "triples": triples,
+        "parse_seconds": round(parse_seconds, 3),
+        "combine_seconds": round(total_seconds - parse_seconds, 3),
+        "triples_per_sec": round(triples / parse_seconds, 1),
+        "files_per_sec": round(len(json_files) / parse_seconds, 2),
+        "end_to_end_triples_per_sec": round(triples / total_seconds, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "ttl_bytes": sum(path.stat().st_size for path in ttl_dir.glob("*.ttl")),
+        "combined_bytes": combined_file.stat().st_size,
+    }
+
+
+def measure(input_dir: Path, size: int, output_dir: Path) -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_throughput", "--child", str(input_dir), str(size), str(output_dir)],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(sizes: List[int], shape: CohortShape, seed: int = 0) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        input_dir = tmp_dir / "cohorts"
+        paths = write_cohorts(input_dir, max(sizes), shape, seed)
+        return {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "shape": shape.to_dict(),
+            "input_bytes_per_cohort": round(sum(path.stat().st_size for path in paths) / len(paths)),
+            "sizes": {str(size): measure(input_dir, size, tmp_dir / f"out_{size}") for size in sizes},
+        }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, List[str]]:
+    """Regressions of report against baseline beyond tolerance, and changes in output size."""
+    found: Dict[str, List[str]] = {"regressions": [], "output_changes": []}
+    if (report["shape"], report["seed"]) != (baseline.get("shape"), baseline.get("seed")):
+        found["regressions"].append("cohort shape or seed differs from the baseline; not comparable")
+        return found
+    for size, current in report["sizes"].items():
+        before = baseline["sizes"].get(size)
+        if before is None:
+            continue
+        for key in ("triples_per_sec", "files_per_sec"):
+            if current[key] < before[key] * (1 - tolerance):
+                found["regressions"].append(f"{size} cohorts: {key} {current[key]} < baseline {before[key]}")
+        if current["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            found["regressions"].append(
+                f"{size} cohorts: peak_rss_mb {current['peak_rss_mb']} > baseline {before['peak_rss_mb']}")
+        for key in ("triples", "combined_bytes"):
+            if current[key] != before[key]:
+                found["output_changes"].append(f"{size} cohorts: {key} {before[key]} -> {current[key]}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--baseline", type=Path, help="Compare with this baseline report")
+    parser.add_argument("--save-baseline", type=Path, nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Write the report as the baseline (default {DEFAULT_BASELINE.relative_to(BACKEND_DIR)})")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown or memory growth against the baseline")
+    parser.add_argument("--child", nargs=3, metavar=("INPUT_DIR", "SIZE", "OUTPUT_DIR"), help=argparse.SUPPRESS)
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    if args.child:
+        input_dir, size, output_dir = args.child
+        print(json.dumps(run_size(input_dir, int(size), output_dir)))
+        return
+
+    report = run(args.sizes, shape_from_args(args), args.seed)
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report["comparison"]["regressions"] else 0
+    print(json.dumps(report, indent=2))
+    if args.save_baseline:
+        os.makedirs(args.save_baseline.parent, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in report.items() if key != "comparison"}, f, indent=2)
+            f.write("\n")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Peak-memory benchmark for unified_parser's triple emission.
+
+Writes a synthetic cohort whose one concept set has ``--resolved`` resolved
+concepts (taken from an example cohort and renumbered), then turns it into
+TTL two ways, each in a fresh interpreter so peak RSS is not shared:
+
+* ``list``: json.load, parse_cohort_json and write_triples_to_file, i.e. the
+  whole document and every triple held in memory at once (the old path);
+* ``stream``: write_cohort_ttl with streaming, i.e. concept sets read with
+  ijson and triples written as the generators produce them;
+* ``parse_file``: run_all_parsers.parse_file, i.e. the streaming path plus
+  the chunked Turtle validation a batch run does.
+
+Reports peak RSS, RSS after imports, wall time and triple counts as JSON,
+and whether every mode wrote the same TTL.
+Needs the resource module (Unix).
+
+    python -m benchmarks.bench_triple_pipeline --resolved 100000
+"""
+
+import argparse
+import copy
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).parent.parent
+PARSER_DIR = BACKEND_DIR / "scripts" / "ingest" / "json_parser"
+TEMPLATE_FILE = BACKEND_DIR / "example_input" / "cohortDefinitionOutputs" / "cohort_definition_12397.json"
+MODES = ("list", "stream", "parse_file")
+
+
+def build_cohort(path: Path, resolved: int) -> None:
+    """A cohort like TEMPLATE_FILE whose first concept set has `resolved` distinct resolved concepts."""
+    with open(TEMPLATE_FILE, encoding="utf-8") as f:
+        data = json.load(f)
+    concept_set = data["concept_sets"][0]
+    templates = concept_set["resolvedConcepts"]
+    data["concept_sets"] = [concept_set]
+    concept_set["resolvedConcepts"] = []
+    with open(path, "w", encoding="utf-8") as f:
+        # Write the concept array by hand so the generator itself stays small
+        head = json.dumps(data)
+        marker = '"resolvedConcepts": []'
+        before, after = head.split(marker, 1)
+        f.write(before + '"resolvedConcepts": [')
+        for i in range(resolved):
+            concept = copy.copy(templates[i % len(templates)])
+            concept["conceptId"] = 10_000_000 + i
+            concept["conceptCode"] = f"SYN{i}"
+            concept["conceptName"] = f"{concept['conceptName']} {i}"
+            f.write(("," if i else "") + json.dumps(concept))
+        f.write("]" + after)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_mode(mode: str, input_file: str, output_file: str) -> Dict[str, Any]:
+    """Parse input_file in this process the given way; called in a child interpreter."""
+    sys.path.append(str(PARSER_DIR))
+    import logging
+    import unified_parser
+    logging.disable(logging.CRITICAL)
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "list":
+        triples = unified_parser.parse_cohort_json(input_file, streaming=False)
+        count = unified_parser.write_triples_to_file(triples, output_file)
+    elif mode == "stream":
+        count = unified_parser.write_cohort_ttl(input_file, output_file, streaming=True)
+    else:
+        import run_all_parsers
+        output_dir = Path(output_file).parent / mode
+        output_dir.mkdir()
+        result = run_all_parsers.parse_file(input_file, str(output_dir))
+        os.replace(result.output_file, output_file)
+        count = result.triple_count
+    return {
+        "mode": mode,
+        "triples": count,
+        "seconds": round(time.perf_counter() - start, 2),
+        "rss_after_import_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def measure(mode: str, input_file: Path, output_file: Path) -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_triple_pipeline", "--child", mode, str(input_file), str(output_file)],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(resolved: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        input_file = tmp_dir / "synthetic_cohort.json"
+        build_cohort(input_file, resolved)
+        results = {mode: measure(mode, input_file, tmp_dir / f"{mode}.ttl") for mode in MODES}
+        outputs = {(tmp_dir / f"{mode}.ttl").read_bytes() for mode in MODES}
+        return {
+            "resolved_concepts": resolved,
+            "input_mb": round(os.path.getsize(input_file) / (1024 * 1024), 1),
+            "identical_output": len(outputs) == 1,
+            "results": results,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resolved", type=int, default=100000)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(run_mode(*args.child)))
+        return
+    print(json.dumps(run(args.resolved), indent=2))
+
+
+if __name__ == "__main__":
+    main()
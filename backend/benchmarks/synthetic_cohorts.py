@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Generator of synthetic OHDSI cohort definition JSONs for benchmarks.
+
+The cohorts have the shape of the Atlas exports in example_input (name,
+edit_url, clinical_description, evaluation_summary,
+human_readable_algorithm and concept_sets with expression items, resolved
+and source concepts), filled with randomised but plausible content. A
+``CohortShape`` sets the knobs: concept sets per cohort, items, resolved and
+source concepts per set, clinical description length, inclusion rules, the
+vocabulary mix of the concepts and the size of the concept pool they are
+drawn from (a smaller pool means more concepts shared between cohorts).
+
+Generation is deterministic: cohort ``i`` of a seed is always the same
+document, whatever the count, so runs at different sizes are comparable.
+
+    python -m benchmarks.synthetic_cohorts /tmp/cohorts --count 100 --concept-sets 5
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Atlas epoch-millisecond dates used for every concept
+VALID_START_DATE = 1262304000000
+VALID_END_DATE = 4102358400000
+FIRST_COHORT_ID = 900_000
+FIRST_CONCEPT_ID = 40_000_000
+
+# Vocabulary -> (domain, concept class, code format)
+VOCABULARIES: Dict[str, Tuple[str, str, Callable[[random.Random], str]]] = {
+    "SNOMED": ("Condition", "Clinical Finding", lambda rng: str(rng.randrange(10**8, 10**9))),
+    "ICD10CM": ("Condition", "ICD10 code",
+                lambda rng: f"{rng.choice('ABCDEGIJKLMN')}{rng.randrange(10, 99)}.{rng.randrange(0, 9)}"),
+    "ICD9CM": ("Condition", "4-dig nonbill code", lambda rng: f"{rng.randrange(100, 999)}.{rng.randrange(0, 9)}"),
+    "RxNorm": ("Drug", "Ingredient", lambda rng: str(rng.randrange(10**5, 10**7))),
+    "LOINC": ("Measurement", "Lab Test", lambda rng: f"{rng.randrange(1000, 99999)}-{rng.randrange(0, 9)}"),
+    "OMOP Extension": ("Condition", "Disorder", lambda rng: f"OMOP{rng.randrange(10**6, 10**7)}"),
+}
+DEFAULT_VOCABULARY_MIX = {"SNOMED": 0.5, "ICD10CM": 0.2, "RxNorm": 0.1, "LOINC": 0.1,
+                          "ICD9CM": 0.05, "OMOP Extension": 0.05}
+
+DISEASES = [
+    "Crohn's disease", "Ulcerative colitis", "Psoriatic arthritis", "Rheumatoid arthritis", "Psoriasis",
+    "Systemic lupus erythematosus", "Multiple sclerosis", "Type 2 diabetes mellitus", "Atrial fibrillation",
+    "Heart failure", "Chronic kidney disease", "Asthma", "Chronic obstructive pulmonary disease",
+    "Ankylosing spondylitis", "Celiac disease", "Hidradenitis suppurativa", "Major depressive disorder",
+    "Migraine", "Osteoarthritis", "Gout",
+]
+TEMPORAL = ["Earliest event", "First occurrence", "Latest event", "Initial diagnosis"]
+# Extracted values: core ontology classes, and some that are not (and so get dropped with a warning)
+CHARACTERISTICS = ["Chronic Inflammation", "Chronic Inflammation", "Acute Inflammation"]
+SITES = ["Intestinal Tract", "Mesentery", "Regional Lymph Nodes", "Joints", "Skin"]
+RISK_FACTORS = ["Smoking", "Diet", "Genetic Variant", "Obesity"]
+QUALIFIERS = ["chronic", "acute", "severe", "mild", "recurrent", "idiopathic", "secondary", "primary",
+              "exacerbation of", "complication of", "history of", "suspected"]
+FINDINGS = ["inflammation", "pain", "swelling", "stiffness", "fatigue", "lesion", "stenosis", "fibrosis",
+            "ulceration", "bleeding", "infection", "fever", "rash", "erosion"]
+FILLER = ("patients may present with {finding} and {finding}, which may flare and subside over time. "
+          "Assessment relies on the clinical history, imaging and laboratory tests to rule out other "
+          "conditions such as {disease}. Treatment may include {qualifier} therapy and follow-up. ").split()
+
+
+@dataclass
+class CohortShape:
+    """The knobs of generate_cohort."""
+    concept_sets: int = 3
+    items_per_set: int = 2
+    resolved_per_set: int = 12
+    source_per_set: int = 20
+    # Approximate length of the clinical description, in words
+    description_words: int = 250
+    inclusion_rules: int = 2
+    vocabularies: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_VOCABULARY_MIX))
+    # Distinct concept ids the concepts of every cohort are drawn from
+    concept_pool: int = 50_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def _concept_name(rng: random.Random, disease: str) -> str:
+    return f"{rng.choice(QUALIFIERS)} {disease.lower()} with {rng.choice(FINDINGS)}".capitalize()
+
+
+def _concept(rng: random.Random, shape: CohortShape, standard: bool) -> Dict[str, Any]:
+    """A resolved or source concept, in Atlas's camelCase form."""
+    concept_id = FIRST_CONCEPT_ID + rng.randrange(shape.concept_pool)
+    # A pooled concept depends only on its id, so cohorts sharing it describe it the same way
+    pooled = random.Random(concept_id)
+    vocabulary = pooled.choices(list(shape.vocabularies), weights=list(shape.vocabularies.values()))[0]
+    domain, concept_class, code = VOCABULARIES[vocabulary]
+    return {
+        "conceptId": concept_id,
+        "conceptName": _concept_name(pooled, pooled.choice(DISEASES)),
+        "standardConcept": "S" if standard else "N",
+        "standardConceptCaption": "Standard" if standard else "Non-Standard",
+        "invalidReason": "V",
+        "invalidReasonCaption": "Valid",
+        "conceptCode": code(pooled),
+        "domainId": domain,
+        "vocabularyId": vocabulary,
+        "conceptClassId": concept_class,
+        "validStartDate": VALID_START_DATE,
+        "validEndDate": VALID_END_DATE,
+    }
+
+
+def _expression_item(concept: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """An expression item, whose concept Atlas writes in UPPER_CASE."""
+    return {
+        "concept": {
+            "CONCEPT_ID": concept["conceptId"],
+            "CONCEPT_NAME": concept["conceptName"],
+            "STANDARD_CONCEPT": concept["standardConcept"],
+            "STANDARD_CONCEPT_CAPTION": concept["standardConceptCaption"],
+            "INVALID_REASON": "V",
+            "INVALID_REASON_CAPTION": "Valid",
+            "CONCEPT_CODE": concept["conceptCode"],
+            "DOMAIN_ID": concept["domainId"],
+            "VOCABULARY_ID": concept["vocabularyId"],
+            "CONCEPT_CLASS_ID": concept["conceptClassId"],
+        },
+        "isExcluded": rng.random() < 0.1,
+        "includeDescendants": rng.random() < 0.8,
+        "includeMapped": rng.random() < 0.2,
+    }
+
+
+def _concept_set(rng: random.Random, shape: CohortShape, set_id: int, disease: str) -> Dict[str, Any]:
+    resolved = [_concept(rng, shape, True) for _ in range(shape.resolved_per_set)]
+    items = [_expression_item(resolved[i % len(resolved)] if resolved else _concept(rng, shape, True), rng)
+             for i in range(shape.items_per_set)]
+    return {
+        "id": set_id,
+        "name": f"{disease} {rng.choice(FINDINGS)} ({rng.choice(QUALIFIERS)})",
+        "expression": {"items": items},
+        "resolvedConcepts": resolved,
+        "sourceConcepts": [_concept(rng, shape, False) for _ in range(shape.source_per_set)],
+    }
+
+
+def _clinical_description(rng: random.Random, shape: CohortShape, disease: str) -> str:
+    # The facts the extraction rules look for, then filler up to the requested length
+    lines = [
+        f"Overview: {disease} is characterized by {rng.choice(CHARACTERISTICS)}",
+        f"It affects the {rng.choice(SITES)}",
+        f"Typical age of onset {rng.randrange(5, 70)}, with {rng.randrange(1, 9)}.{rng.randrange(0, 9)}-"
+        f"{rng.randrange(10, 40)} cases per 100,000 py and {rng.randrange(20, 400)} cases per 100,000 persons",
+        f"Risk factors include {rng.choice(RISK_FACTORS)}",
+    ]
+    words = sum(len(line.split()) for line in lines)
+    sentences = []
+    while words < shape.description_words:
+        sentence = [w.format(finding=rng.choice(FINDINGS), disease=rng.choice(DISEASES),
+                             qualifier=rng.choice(QUALIFIERS)) for w in FILLER]
+        sentences.append(" ".join(sentence))
+        words += len(sentence)
+    return "\n".join(lines) + "\n" + " ".join(sentences)
+
+
+def _evaluation_summary(rng: random.Random, shape: CohortShape, disease: str) -> str:
+    concepts = shape.concept_sets * shape.resolved_per_set
+    return (f"We developed a {rng.choice(['prevalent', 'incident'])} cohort definition for {disease.lower()} "
+            f"using a concept set of {concepts} concepts. The algorithm retrieves subjects from all "
+            f"{rng.randrange(3, 15)} databases tested. A second diagnosis code in the "
+            f"{rng.randrange(1, 60)}-{rng.randrange(90, 365)} day window after index improves the specificity "
+            f"of the algorithm at the expense of sensitivity.")
+
+
+def _algorithm(rng: random.Random, shape: CohortShape, set_names: List[str]) -> str:
+    entry = "\n\n".join(f"{i}. condition occurrences of '{name}'." for i, name in enumerate(set_names[:2] or ["Any"], 1))
+    parts = [
+        "### Cohort Entry Events",
+        f"People enter the cohort when observing any of the following:\n\n{entry}",
+        "Limit cohort entry events to the earliest event per person.",
+    ]
+    if shape.inclusion_rules:
+        parts += ["### Inclusion Criteria"]
+        for rule in range(1, shape.inclusion_rules + 1):
+            name = rng.choice(set_names) if set_names else "Any condition"
+            parts += [f"#### {rule}. has {name.lower()}",
+                      f"Entry events having at least {rng.randrange(1, 3)} condition occurrence of '{name}', "
+                      f"starting between {rng.randrange(1, 365)} days before and 0 days after cohort entry start date."]
+    parts += [
+        "### Cohort Exit",
+        "The person exits the cohort at the end of continuous observation.",
+        "### Cohort Eras",
+        f"Remaining events will be combined into cohort eras if they are within {rng.randrange(0, 30)} days "
+        f"of each other.",
+    ]
+    return "\r\n\r\n".join(parts)
+
+
+def generate_cohort(index: int, shape: CohortShape, seed: int = 0) -> Dict[str, Any]:
+    """The index-th synthetic cohort of seed."""
+    rng = random.Random(f"{seed}:{index}")
+    cohort_id = FIRST_COHORT_ID + index
+    disease = rng.choice(DISEASES)
+    concept_sets = [_concept_set(rng, shape, set_id, disease) for set_id in range(shape.concept_sets)]
+    return {
+        "name": f"[SYN] {rng.choice(TEMPORAL)} of {disease}",
+        "id": cohort_id,
+        "edit_url": f"https://atlas.example.org/#/cohortdefinition/{cohort_id}",
+        "clinical_description": _clinical_description(rng, shape, disease),
+        "evaluation_summary": _evaluation_summary(rng, shape, disease),
+        "human_readable_algorithm": _algorithm(rng, shape, [s["name"] for s in concept_sets]),
+        "concept_sets": concept_sets,
+    }
+
+
+def write_cohorts(target_dir: Path, count: int, shape: CohortShape = None, seed: int = 0) -> List[Path]:
+    """Write count synthetic cohorts to target_dir as cohort_definition_<id>.json; returns their paths."""
+    shape = shape or CohortShape()
+    target_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        cohort = generate_cohort(index, shape, seed)
+        path = target_dir / f"cohort_definition_{cohort['id']}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cohort, f, indent=2)
+        paths.append(path)
+    return paths
+
+
+def parse_vocabulary_mix(text: str) -> Dict[str, float]:
+    """Parse "SNOMED=0.7,RxNorm=0.3" into {"SNOMED": 0.7, "RxNorm": 0.3}."""
+    mix = {}
+    for part in text.split(","):
+        vocabulary, _, weight = part.partition("=")
+        if vocabulary.strip() not in VOCABULARIES:
+            raise argparse.ArgumentTypeError(f"unknown vocabulary {vocabulary.strip()!r}")
+        mix[vocabulary.strip()] = float(weight or 1)
+    return mix
+
+
+def add_shape_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CohortShape()
+    parser.add_argument("--concept-sets", type=int, default=defaults.concept_sets)
+    parser.add_argument("--items-per-set", type=int, default=defaults.items_per_set)
+    parser.add_argument("--resolved-per-set", type=int, default=defaults.resolved_per_set)
+    parser.add_argument("--source-per-set", type=int, default=defaults.source_per_set)
+    parser.add_argument("--description-words", type=int, default=defaults.description_words)
+    parser.add_argument("--inclusion-rules", type=int, default=defaults.inclusion_rules)
+    parser.add_argument("--vocabularies", type=parse_vocabulary_mix, default=defaults.vocabularies,
+                        help="Vocabulary weights, e.g. SNOMED=0.7,RxNorm=0.3")
+    parser.add_argument("--concept-pool", type=int, default=defaults.concept_pool)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def shape_from_args(args: argparse.Namespace) -> CohortShape:
+    return CohortShape(**{f.name: getattr(args, f.name) for f in fields(CohortShape)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("target_dir", type=Path)
+    parser.add_argument("--count", type=int, default=10)
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    paths = write_cohorts(args.target_dir, args.count, shape_from_args(args), args.seed)
+    print(f"Wrote {len(paths)} cohorts to {args.target_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Conditional, content-negotiated downloads of generated files.
+
+The combine steps write pre-compressed .gz/.br siblings next to their output.
+``select_variant`` picks the best one the client accepts (falling back to the
+plain file), and ``is_not_modified`` answers If-None-Match / If-Modified-Since
+so unchanged files are not sent again. Range requests are left to Starlette's
+FileResponse, which handles them against whichever variant is served.
+"""
+
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# scripts/ is on sys.path (see server.py)
+from utils.compression import ENCODING_SUFFIXES, available_encodings, fresh_sibling
+
+
+@dataclass
+class DownloadVariant:
+    """The file actually sent for a download, and its validators."""
+    path: Path
+    encoding: Optional[str]
+    etag: str
+    last_modified: str
+    mtime: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "etag": self.etag,
+            "last-modified": self.last_modified,
+            "vary": "Accept-Encoding",
+        }
+        if self.encoding:
+            headers["content-encoding"] = self.encoding
+        return headers
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings from an Accept-Encoding header with q > 0, most preferred first."""
+    accepted = []
+    for position, item in enumerate(accept_encoding.split(",")):
+        parts = [p.strip() for p in item.split(";")]
+        token = parts[0].lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.append((-q, position, token))
+    return [token for _, _, token in sorted(accepted)]
+
+
+def stale_encodings(path: Path, accept_encoding: str) -> List[str]:
+    """Encodings the client accepts whose sibling of path is missing or out of date."""
+    accepted = accepted_encodings(accept_encoding)
+    wanted = [e for e in available_encodings() if e in accepted or "*" in accepted]
+    return [e for e in wanted if fresh_sibling(path, e) is None]
+
+
+def select_variant(path: Path, accept_encoding: str = "") -> DownloadVariant:
+    """The smallest up-to-date encoded sibling the client accepts, else path itself."""
+    path = Path(path)
+    accepted = accepted_encodings(accept_encoding)
+    chosen, encoding = path, None
+    for candidate in ENCODING_SUFFIXES:
+        if candidate not in accepted and "*" not in accepted:
+            continue
+        sibling = fresh_sibling(path, candidate)
+        if sibling is not None:
+            chosen, encoding = sibling, candidate
+            break
+
+    st = chosen.stat()
+    # The validators describe the bytes sent, so each encoding gets its own ETag
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}{"-" + encoding if encoding else ""}"'
+    source_mtime = path.stat().st_mtime
+    return DownloadVariant(
+        path=chosen,
+        encoding=encoding,
+        etag=etag,
+        last_modified=formatdate(source_mtime, usegmt=True),
+        mtime=source_mtime,
+    )
+
+
+def is_not_modified(variant: DownloadVariant, if_none_match: Optional[str],
+                    if_modified_since: Optional[str]) -> bool:
+    """True if the request's validators show the client already has this variant."""
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        # Weak comparison: W/"x" matches "x"
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return any(t == "*" or t.removeprefix("W/") == variant.etag for t in tags)
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(variant.mtime) <= since
+    return False
@@ -0,0 +1,152 @@
+"""
+Bounded executor for blocking work done on behalf of API requests.
+
+rdflib parsing, subprocess calls and file I/O are synchronous; running them
+inline in an ``async def`` endpoint stalls the event loop for every other
+request on the worker. ``BlockingExecutor`` runs them on a bounded thread pool
+instead, with a concurrency limit and timeout per endpoint class so a burst of
+heavy requests cannot starve the light ones.
+
+Sizes and limits are read from the environment:
+
+    EXECUTOR_MAX_WORKERS          thread pool size (default: 8)
+    EXECUTOR_<CLASS>_CONCURRENCY  in-flight calls per class
+    EXECUTOR_<CLASS>_TIMEOUT      seconds before a call is abandoned
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkTimeoutError(Exception):
+    """Raised when a call does not finish within its endpoint class timeout."""
+    pass
+
+
+@dataclass
+class EndpointClass:
+    """Concurrency limit and timeout shared by a group of endpoints."""
+    name: str
+    concurrency: int
+    timeout: Optional[float]
+
+
+# Defaults per endpoint class: light file reads, rdflib parsing, subprocesses
+DEFAULT_CLASSES = {
+    "light": EndpointClass("light", concurrency=8, timeout=10.0),
+    "parse": EndpointClass("parse", concurrency=2, timeout=60.0),
+    "process": EndpointClass("process", concurrency=1, timeout=300.0),
+}
+
+
+def _env_number(name: str, default, cast):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid value for {name}: {value!r}")
+        return default
+
+
+class BlockingExecutor:
+    """Runs blocking callables off the event loop under per-class limits."""
+
+    def __init__(self, max_workers: int = 8, classes: Optional[Dict[str, EndpointClass]] = None):
+        self.max_workers = max_workers
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking")
+        # Semaphores are created lazily so they bind to the running loop
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._counters = {name: {"running": 0, "completed": 0, "timeouts": 0} for name in self.classes}
+
+    @classmethod
+    def from_env(cls) -> "BlockingExecutor":
+        """Build an executor from EXECUTOR_* environment variables."""
+        max_workers = _env_number("EXECUTOR_MAX_WORKERS", 8, int)
+        classes = {}
+        for name, default in DEFAULT_CLASSES.items():
+            prefix = f"EXECUTOR_{name.upper()}"
+            timeout = _env_number(f"{prefix}_TIMEOUT", default.timeout, float)
+            classes[name] = EndpointClass(
+                name=name,
+                concurrency=max(1, _env_number(f"{prefix}_CONCURRENCY", default.concurrency, int)),
+                timeout=timeout if timeout and timeout > 0 else None,
+            )
+        return cls(max_workers=max_workers, classes=classes)
+
+    def _semaphore(self, class_name: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(class_name)
+        if sem is None:
+            sem = asyncio.Semaphore(self.classes[class_name].concurrency)
+            self._semaphores[class_name] = sem
+        return sem
+
+    async def run(self, class_name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the pool under the limits of class_name.
+
+        The class slot is held until the call actually finishes, even if the
+        caller has already given up on it, so timed-out work still counts
+        against the concurrency limit.
+        """
+        if class_name not in self.classes:
+            raise KeyError(f"Unknown endpoint class: {class_name}")
+        endpoint_class = self.classes[class_name]
+        counters = self._counters[class_name]
+        sem = self._semaphore(class_name)
+        loop = asyncio.get_running_loop()
+
+        await sem.acquire()
+        with self._lock:
+            counters["running"] += 1
+        try:
+            future = loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release(sem, counters)
+            raise
+        future.add_done_callback(lambda _: self._release(sem, counters))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=endpoint_class.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                counters["timeouts"] += 1
+            logger.warning(f"{class_name} call {getattr(func, '__name__', func)} timed out "
+                           f"after {endpoint_class.timeout}s")
+            raise WorkTimeoutError(
+                f"Request exceeded the {endpoint_class.timeout:g}s limit for {class_name} work"
+            )
+
+    def _release(self, sem: asyncio.Semaphore, counters: Dict[str, int]) -> None:
+        with self._lock:
+            counters["running"] -= 1
+            counters["completed"] += 1
+        sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "classes": {
+                    name: {
+                        "concurrency": self.classes[name].concurrency,
+                        "timeout": self.classes[name].timeout,
+                        **counters,
+                    }
+                    for name, counters in self._counters.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,156 @@
+"""
+Background jobs for long-running API actions (validation, combining).
+
+A POST submits a job and returns its id straight away; the work itself runs on
+the BlockingExecutor. Submitting a job while an identical one (same kind and
+key) is still pending or running returns the existing job instead of starting
+another. Finished jobs are kept for ``result_ttl`` seconds so clients can
+collect the result, then evicted.
+
+Work functions receive a ``report`` callback they can call from the worker
+thread with progress dicts; these are recorded on the job and pushed to any
+event-stream subscribers.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from executor import BlockingExecutor, WorkTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of one submitted job."""
+    id: str
+    kind: str
+    key: str
+    status: JobStatus = JobStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": [e for e in self.events if e.get("type") == "progress"],
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs, coalesces and expires background jobs."""
+
+    def __init__(self, executor: BlockingExecutor, result_ttl: float = 3600.0):
+        self.executor = executor
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[Tuple[str, str], Job] = {}
+        self._tasks = set()
+
+    def submit(self, kind: str, func: Callable[..., Any], key: str = "",
+               endpoint_class: str = "process") -> Tuple[Job, bool]:
+        """
+        Start func(report) as a job of the given kind.
+
+        Returns (job, coalesced); coalesced is True when an identical job was
+        already in flight and is being returned instead of a new one.
+        """
+        self.evict_expired()
+        active = self._active.get((kind, key))
+        if active is not None and not active.finished:
+            return active, True
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, key=key)
+        self._jobs[job.id] = job
+        self._active[(kind, key)] = job
+        task = asyncio.ensure_future(self._run(job, func, endpoint_class))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.evict_expired()
+        return self._jobs.get(job_id)
+
+    def evict_expired(self) -> None:
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.result_ttl:
+                del self._jobs[job_id]
+
+    async def _run(self, job: Job, func: Callable[..., Any], endpoint_class: str) -> None:
+        loop = asyncio.get_running_loop()
+
+        def report(event: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(self._publish, job, {"type": "progress", **event})
+
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self._publish(job, {"type": "status", "status": job.status.value})
+        final_status = JobStatus.FAILED
+        try:
+            job.result = await self.executor.run(endpoint_class, func, report)
+            final_status = JobStatus.SUCCEEDED
+        except WorkTimeoutError as e:
+            job.error = str(e)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+        finally:
+            if self._active.get((job.kind, job.key)) is job:
+                del self._active[(job.kind, job.key)]
+            # Let progress callbacks queued by the worker land before the final event
+            await asyncio.sleep(0)
+            job.finished_at = time.time()
+            job.status = final_status
+            self._publish(job, {"type": "status", "status": job.status.value, "error": job.error})
+
+    def _publish(self, job: Job, event: Dict[str, Any]) -> None:
+        job.events.append(event)
+        wakeup, job._wakeup = job._wakeup, asyncio.Event()
+        wakeup.set()
+
+    async def stream(self, job: Job) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events from the beginning, then live until it finishes."""
+        cursor = 0
+        while True:
+            while cursor < len(job.events):
+                yield job.events[cursor]
+                cursor += 1
+            if job.finished:
+                return
+            await job._wakeup.wait()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event dict as a Server-Sent Events message."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,246 @@
+"""
+Content-addressed cache of parsed ontology files for the API server.
+
+Parse results are stored by the SHA-256 digest of the file contents, and each
+path remembers the (mtime, size) it had when it was last hashed. A file whose
+stat signature is unchanged is served straight from the cache; a file whose
+signature changed is re-hashed and only re-parsed if its contents differ.
+
+The lock only guards the dictionaries: hashing and parsing happen outside
+it, so hits are never held up by a large file being parsed, and a file
+that several threads ask for at once is parsed by the first of them while
+the others wait on its in-flight future. Only the summaries are cached; the
+rdflib graphs the validation checks need are kept in a small LRU of their
+own (see OntologyCache.graph).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from rdflib import Graph
+from rdflib.namespace import OWL, RDF, RDFS
+
+logger = logging.getLogger(__name__)
+
+CLASS_TYPES = (OWL.Class, RDFS.Class)
+PROPERTY_TYPES = (
+    OWL.ObjectProperty,
+    OWL.DatatypeProperty,
+    OWL.AnnotationProperty,
+    RDF.Property,
+)
+# Parsed graphs kept for OntologyCache.graph; a module set is about a dozen files
+GRAPH_CACHE_SIZE = 16
+
+
+@dataclass
+class ParsedOntology:
+    """Parse result for one ontology file's contents."""
+    digest: str
+    size: int
+    is_valid: bool
+    error: Optional[str]
+    triple_count: int = 0
+    class_count: int = 0
+    property_count: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "digest": self.digest,
+            "size": self.size,
+            "is_valid": self.is_valid,
+            "error": self.error,
+            "triple_count": self.triple_count,
+            "class_count": self.class_count,
+            "property_count": self.property_count,
+        }
+
+
+def file_digest(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _parse_graph(file_path: Path, digest: str, size: int) -> Tuple[ParsedOntology, Optional[Graph]]:
+    """The summary of a Turtle file and its graph (None when it does not parse)."""
+    g = Graph()
+    try:
+        g.parse(file_path, format="turtle")
+    except Exception as e:
+        return ParsedOntology(digest=digest, size=size, is_valid=False, error=str(e)), None
+
+    classes = set()
+    for class_type in CLASS_TYPES:
+        classes.update(g.subjects(RDF.type, class_type))
+    properties = set()
+    for property_type in PROPERTY_TYPES:
+        properties.update(g.subjects(RDF.type, property_type))
+
+    return ParsedOntology(
+        digest=digest,
+        size=size,
+        is_valid=True,
+        error=None,
+        triple_count=len(g),
+        class_count=len(classes),
+        property_count=len(properties),
+    ), g
+
+
+def parse_ontology_file(file_path: Path, digest: str, size: int) -> ParsedOntology:
+    """Parse a Turtle file and summarise it; parse errors are captured, not raised."""
+    return _parse_graph(file_path, digest, size)[0]
+
+
+class OntologyCache:
+    """Thread-safe cache of ParsedOntology results for the .ttl files under a directory."""
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = Path(root_dir)
+        # path -> ((mtime_ns, size), digest)
+        self._paths: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+        # digest -> ParsedOntology
+        self._results: Dict[str, ParsedOntology] = {}
+        # digest -> Graph, least recently used first
+        self._graphs: "OrderedDict[str, Graph]" = OrderedDict()
+        # digest -> future of the parse under way
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: Path) -> ParsedOntology:
+        """Return the parse result for a file, re-parsing only if its contents changed."""
+        return self._lookup(Path(file_path), want_graph=False)[0]
+
+    def graph(self, file_path: Path) -> Graph:
+        """The parsed graph of a valid file, kept in a GRAPH_CACHE_SIZE LRU; ValueError for an invalid one."""
+        parsed, g = self._lookup(Path(file_path), want_graph=True)
+        if not parsed.is_valid:
+            raise ValueError(parsed.error)
+        return g
+
+    def _cached(self, digest: str, want_graph: bool) -> Optional[Tuple[ParsedOntology, Optional[Graph]]]:
+        """The cached result (and graph, if wanted) for digest; call with the lock held."""
+        parsed = self._results.get(digest)
+        if parsed is None:
+            return None
+        if not want_graph or not parsed.is_valid:
+            return parsed, None
+        g = self._graphs.get(digest)
+        if g is None:
+            return None
+        self._graphs.move_to_end(digest)
+        return parsed, g
+
+    def _lookup(self, file_path: Path, want_graph: bool) -> Tuple[ParsedOntology, Optional[Graph]]:
+        st = file_path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+
+        digest = None
+        with self._lock:
+            known = self._paths.get(file_path)
+            if known is not None and known[0] == signature:
+                digest = known[1]
+                found = self._cached(digest, want_graph)
+                if found is not None:
+                    self.hits += 1
+                    return found
+        if digest is None:
+            digest = file_digest(file_path)
+
+        while True:
+            with self._lock:
+                found = self._cached(digest, want_graph)
+                if found is not None:
+                    self.hits += 1
+                    self._paths[file_path] = (signature, digest)
+                    return found
+                future = self._inflight.get(digest)
+                if future is None:
+                    future = self._inflight[digest] = Future()
+                    self.misses += 1
+                    break
+            # Another thread is parsing these contents; look again once it is done
+            future.exception()
+
+        try:
+            logger.info(f"Parsing ontology file: {file_path}")
+            parsed, g = _parse_graph(file_path, digest, st.st_size)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[digest]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._results[digest] = parsed
+            self._paths[file_path] = (signature, digest)
+            if want_graph and g is not None:
+                self._graphs[digest] = g
+                while len(self._graphs) > GRAPH_CACHE_SIZE:
+                    self._graphs.popitem(last=False)
+            del self._inflight[digest]
+        future.set_result(parsed)
+        return parsed, g
+
+    def scan(self) -> List[Tuple[Path, ParsedOntology]]:
+        """Return (path, result) for every .ttl file under root_dir, pruning vanished files."""
+        entries = []
+        for root, dirs, files in os.walk(self.root_dir):
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith('.ttl'):
+                    file_path = Path(root) / file
+                    try:
+                        entries.append((file_path, self.get(file_path)))
+                    except FileNotFoundError:
+                        continue
+
+        with self._lock:
+            seen = {path for path, _ in entries}
+            for path in list(self._paths):
+                if path not in seen:
+                    del self._paths[path]
+            self._prune_results()
+        return entries
+
+    def invalidate(self, file_path: Optional[Path] = None) -> None:
+        """Forget one file, or everything when no path is given."""
+        with self._lock:
+            if file_path is None:
+                self._paths.clear()
+                self._results.clear()
+                self._graphs.clear()
+            else:
+                self._paths.pop(Path(file_path), None)
+                self._prune_results()
+
+    def _prune_results(self) -> None:
+        live = {digest for _, digest in self._paths.values()}
+        for digest in list(self._results):
+            if digest not in live:
+                del self._results[digest]
+                self._graphs.pop(digest, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "files": len(self._paths),
+                "entries": len(self._results),
+                "graphs": len(self._graphs),
+            }
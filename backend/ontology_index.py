@@ -0,0 +1,179 @@
+"""
+File-name lookups and streamed, paginated reads of ontology files.
+
+``OntologyPathIndex`` maps each file name under ontologies/ to its path. It is
+built once at startup and kept current by a background thread that re-walks
+the tree every ``poll_interval`` seconds (ONTOLOGY_INDEX_POLL_INTERVAL); a
+miss also triggers an immediate refresh, so a file uploaded between polls is
+still found.
+
+``ContentReader`` reads a file in chunks, optionally limited to a window of
+lines or bytes, so large files never have to be held in memory whole.
+"""
+
+import codecs
+import json
+import logging
+import os
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+PAGE_UNITS = ("lines", "bytes")
+# The longest UTF-8 character; a smaller byte page could hold none and never advance
+MIN_BYTE_LIMIT = 4
+
+
+class OntologyPathIndex:
+    """File name -> path for every file under root_dir; the first in sorted walk order wins."""
+
+    def __init__(self, root_dir: Path, poll_interval: float = 5.0):
+        self.root_dir = Path(root_dir)
+        self.poll_interval = poll_interval
+        self._paths: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> int:
+        """Rebuild the index from disk; returns the number of names indexed."""
+        paths = {}
+        for root, dirs, files in os.walk(self.root_dir):
+            dirs.sort()
+            for name in sorted(files):
+                paths.setdefault(name, Path(root) / name)
+        with self._lock:
+            self._paths = paths
+        return len(paths)
+
+    def lookup(self, name: str) -> Optional[Path]:
+        with self._lock:
+            path = self._paths.get(name)
+        if path is not None and path.exists():
+            return path
+        # Missing or moved since the last poll
+        self.refresh()
+        with self._lock:
+            return self._paths.get(name)
+
+    def start(self) -> None:
+        """Build the index and start the background refresh thread."""
+        self.refresh()
+        if self.poll_interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="ontology-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except OSError as e:
+                logger.warning(f"Failed to refresh ontology index: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._paths)
+
+
+class ContentReader:
+    """
+    Iterates over a UTF-8 text file in chunks, optionally within a page.
+
+    With unit="lines", offset and limit count lines; with unit="bytes" they
+    count bytes (at least MIN_BYTE_LIMIT of them per page), and a page never
+    ends part-way through a character. Once
+    iteration finishes, next_offset is where the following page starts, or
+    None if the page reached the end of the file.
+    """
+
+    def __init__(self, path: Path, unit: str = "lines", offset: int = 0,
+                 limit: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        if unit not in PAGE_UNITS:
+            raise ValueError(f"unit must be one of {', '.join(PAGE_UNITS)}")
+        if offset < 0 or (limit is not None and limit <= 0):
+            raise ValueError("offset must be >= 0 and limit > 0")
+        if unit == "bytes" and limit is not None and limit < MIN_BYTE_LIMIT:
+            raise ValueError(f"limit must be >= {MIN_BYTE_LIMIT} with unit=bytes")
+        self.path = Path(path)
+        self.unit = unit
+        self.offset = offset
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.next_offset: Optional[int] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.offset > 0 or self.limit is not None
+
+    def __iter__(self) -> Iterator[str]:
+        if self.unit == "bytes":
+            return self._iter_bytes()
+        return self._iter_lines()
+
+    def _iter_lines(self) -> Iterator[str]:
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            if not self.paginated:
+                for chunk in iter(lambda: f.read(self.chunk_size), ""):
+                    yield chunk
+                return
+            lines = islice(f, self.offset, None)
+            buffer, buffered, emitted = [], 0, 0
+            for line in lines:
+                if self.limit is not None and emitted == self.limit:
+                    # One line past the page: there is more to read
+                    self.next_offset = self.offset + emitted
+                    break
+                buffer.append(line)
+                buffered += len(line)
+                emitted += 1
+                if buffered >= self.chunk_size:
+                    yield "".join(buffer)
+                    buffer, buffered = [], 0
+            if buffer:
+                yield "".join(buffer)
+
+    def _iter_bytes(self) -> Iterator[str]:
+        size = self.path.stat().st_size
+        end = size if self.limit is None else min(size, self.offset + self.limit)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        position = self.offset
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while position < end:
+                data = f.read(min(self.chunk_size, end - position))
+                if not data:
+                    break
+                position += len(data)
+                text = decoder.decode(data, final=position >= size)
+                if text:
+                    yield text
+        # Bytes of a character cut off by the page end start the next page
+        pending = len(decoder.getstate()[0])
+        if position - pending < size:
+            self.next_offset = position - pending
+
+
+def iter_json_content(name: str, reader: ContentReader) -> Iterator[str]:
+    """Stream {"name", "content"[, page fields]} as JSON without building the content string."""
+    yield '{"name": ' + json.dumps(name)
+    if reader.paginated:
+        yield f', "unit": {json.dumps(reader.unit)}, "offset": {reader.offset}'
+    yield ', "content": "'
+    for chunk in reader:
+        yield json.dumps(chunk)[1:-1]
+    yield '"'
+    if reader.paginated:
+        yield (f', "next_offset": {json.dumps(reader.next_offset)}'
+               f', "has_more": {json.dumps(reader.next_offset is not None)}')
+    yield "}"
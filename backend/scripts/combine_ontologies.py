@@ -1,20 +1,126 @@
 #!/usr/bin/env python3
 
 import os
+import gzip
+import json
+import hashlib
+import argparse
+from itertools import islice
 from pathlib import Path
-from rdflib import Graph, Namespace
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+from rdflib import Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
 import logging
 
+from utils.compression import write_compressed_siblings
+from import_resolver import ImportCycleError, ImportGraph, ParsedModule, module_file, parse_modules
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 2
+INTERNAL_NAMESPACE = "http://example.org/"
+
+# Output format -> file name. Pretty Turtle sorts and groups every subject in
+# memory before writing; the line-based formats are streamed out as they go.
+OUTPUT_FORMATS = {
+    "turtle": "combined_ontology.ttl",
+    "nt": "combined_ontology.nt",
+    "nt.gz": "combined_ontology.nt.gz",
+    "nquads": "combined_ontology.nq",
+}
+DEFAULT_OUTPUT_FORMATS = ["turtle"]
+WRITE_BATCH_SIZE = 10000
+
+def file_digest(file_path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def write_lines(stream: IO[bytes], lines: Iterable[str]):
+    """Encode and write lines in batches, so large outputs never sit in memory whole."""
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, WRITE_BATCH_SIZE))
+        if not batch:
+            break
+        stream.writelines(line.encode("utf-8") for line in batch)
+
+def ntriples_literal(literal: Literal) -> str:
+    """A literal in N-Triples syntax; Literal.n3() would shorten numbers and triple-quote multi-line strings."""
+    text = literal.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+    if literal.language:
+        return f'"{text}"@{literal.language}'
+    if literal.datatype:
+        return f'"{text}"^^<{literal.datatype}>'
+    return f'"{text}"'
+
+def ntriples_line(triple, graph: Optional[URIRef] = None) -> str:
+    """One N-Triples line, or an N-Quads line when graph names a graph other than the default one."""
+    s, p, o = triple
+    obj = ntriples_literal(o) if isinstance(o, Literal) else o.n3()
+    if graph is not None and graph != DATASET_DEFAULT_GRAPH_ID:
+        return f"{s.n3()} {p.n3()} {obj} {graph.n3()} .\n"
+    return f"{s.n3()} {p.n3()} {obj} .\n"
+
+def newest_output(ontology_dir: Path) -> Optional[Tuple[str, Path]]:
+    """The most recently written combined output, preferring a line-based format on ties."""
+    candidates = []
+    for rank, fmt in enumerate(["nt", "nt.gz", "nquads", "turtle"]):
+        path = Path(ontology_dir) / OUTPUT_FORMATS[fmt]
+        if path.exists():
+            candidates.append((-path.stat().st_mtime_ns, rank, fmt, path))
+    if not candidates:
+        return None
+    _, _, fmt, path = min(candidates)
+    return fmt, path
+
+def load_combined_ontology(ontology_dir: Path, graph: Optional[Graph] = None) -> Graph:
+    """Parse the newest combined output into graph; N-Triples loads far faster than Turtle."""
+    found = newest_output(ontology_dir)
+    if found is None:
+        raise FileNotFoundError(f"No combined ontology in {ontology_dir}")
+    fmt, path = found
+    graph = graph if graph is not None else Graph()
+    if fmt == "nt.gz":
+        with gzip.open(path, "rb") as f:
+            graph.parse(f, format="nt")
+    elif fmt == "nquads":
+        # Merge every module's named graph into the one graph
+        dataset = Dataset()
+        dataset.parse(path, format="nquads")
+        graph.addN((s, p, o, graph) for s, p, o, _ in dataset.quads((None, None, None, None)))
+    else:
+        graph.parse(path, format=fmt)
+    return graph
+
 class OntologyCombiner:
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, incremental: bool = False, max_workers: Optional[int] = None,
+                 output_formats: Optional[List[str]] = None):
         self.base_dir = Path(base_dir)
         self.ontology_dir = self.base_dir / "ontologies"
-        self.output_file = self.ontology_dir / "combined_ontology.ttl"
-        self.combined_graph = Graph()
+        self.output_formats = list(output_formats or DEFAULT_OUTPUT_FORMATS)
+        for fmt in self.output_formats:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"Unknown output format: {fmt}")
+        self.output_file = self.output_path(self.output_formats[0])
+        # One named graph per module over a single store; the default graph is
+        # their union, so serializing it gives the combined ontology
+        self.combined_graph = Dataset(default_union=True)
+        
+        # Incremental mode keeps an N-Triples snapshot per module plus a manifest
+        # of the content hashes of every file that went into each snapshot
+        self.incremental = incremental
+        self.max_workers = max_workers
+        self.cache_dir = self.ontology_dir / ".combine_cache"
+        self.manifest_file = self.cache_dir / "manifest.json"
+        self.manifest = self._read_manifest() if incremental else {}
+        self.new_manifest = {"version": MANIFEST_VERSION, "modules": {}}
+        self.stats = {"rebuilt": [], "reused": []}
         
         # Define namespaces
         self.namespaces = {
@@ -52,115 +158,234 @@ class OntologyCombiner:
 
         }
 
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def _write_manifest(self):
+        self.cache_dir.mkdir(exist_ok=True)
+        tmp_file = self.manifest_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.new_manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
+
+    def _source_record(self, file_path: Path, previous: Optional[Dict] = None) -> Dict:
+        """Fingerprint a source file, skipping the hash when its stat is unchanged."""
+        st = file_path.stat()
+        if previous and previous.get("mtime_ns") == st.st_mtime_ns and previous.get("size") == st.st_size:
+            return previous
+        return {"hash": file_digest(file_path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+    def _sources_unchanged(self, sources: Dict[str, Dict]) -> Tuple[bool, Dict[str, Dict]]:
+        """Re-fingerprint a snapshot's sources; True if every content hash still matches."""
+        current = {}
+        for rel_path, previous in sources.items():
+            file_path = self.ontology_dir / rel_path
+            if not file_path.exists():
+                return False, {}
+            current[rel_path] = self._source_record(file_path, previous)
+            if current[rel_path]["hash"] != previous.get("hash"):
+                return False, {}
+        return True, current
+
+    def _reusable_entry(self, name: str) -> Optional[Dict]:
+        """The module's manifest entry if its snapshot exists and its sources are unchanged."""
+        entry = self.manifest.get("modules", {}).get(name)
+        if not entry or not (self.cache_dir / entry["snapshot"]).exists():
+            return None
+        unchanged, sources = self._sources_unchanged(entry["sources"])
+        if not unchanged:
+            return None
+        return {**entry, "sources": sources}
+
+    def _store_module(self, module: ParsedModule):
+        """Snapshot a freshly parsed module and record its source and imports in the manifest."""
+        self.cache_dir.mkdir(exist_ok=True)
+        snapshot = f"{module.name}.nt"
+        snapshot_graph = Graph()
+        snapshot_graph.addN((s, p, o, snapshot_graph) for s, p, o in module.triples)
+        snapshot_graph.serialize(destination=self.cache_dir / snapshot, format="nt", encoding="utf-8")
+        self.new_manifest["modules"][module.name] = {
+            "snapshot": snapshot,
+            "triples": len(snapshot_graph),
+            "imports": module.imports,
+            "sources": {
+                str(module.path.relative_to(self.ontology_dir)): self._source_record(module.path)
+            }
+        }
+
+    def is_up_to_date(self, modules: List[str]) -> bool:
+        """True if the output and every module snapshot are current, so nothing needs to run."""
+        # Modules pulled in through owl:imports are in the manifest too
+        if not self.manifest or not set(modules) <= set(self.manifest.get("modules", {})):
+            return False
+        outputs = self.manifest.get("outputs", {})
+        for fmt in self.output_formats:
+            output_file = self.output_path(fmt)
+            if fmt not in outputs or not output_file.exists():
+                return False
+            st = output_file.stat()
+            if outputs[fmt].get("mtime_ns") != st.st_mtime_ns or outputs[fmt].get("size") != st.st_size:
+                return False
+        return all(
+            self._sources_unchanged(entry["sources"])[0]
+            for entry in self.manifest["modules"].values()
+        )
+
     def bind_namespaces(self):
         """Bind all namespaces to the combined graph."""
-        # Create a new graph to ensure clean namespace bindings
-        new_graph = Graph()
-        
-        # First bind our custom prov namespace to ensure it takes precedence
-        new_graph.bind("prov", Namespace("http://example.org/prov-ontology#"), override=True)
+        # Bind our custom prov namespace first to ensure it takes precedence
+        self.combined_graph.bind("prov", Namespace("http://example.org/prov-ontology#"), override=True)
         
         # Bind all other namespaces
         for prefix, uri in self.namespaces.items():
             if prefix != "prov":  # Skip prov since we already bound it
-                new_graph.bind(prefix, Namespace(uri), override=True)
+                self.combined_graph.bind(prefix, Namespace(uri), override=True)
+
+    def output_path(self, fmt: str) -> Path:
+        return self.ontology_dir / OUTPUT_FORMATS[fmt]
+
+    def write_output(self, fmt: str) -> Path:
+        """Write the combined ontology in one format, replacing the old file only once complete."""
+        output_file = self.output_path(fmt)
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        if fmt == "turtle":
+            self.combined_graph.serialize(destination=tmp_file, format="turtle")
+        elif fmt == "nt.gz":
+            with open(tmp_file, "wb") as raw:
+                # A fixed header timestamp keeps the bytes identical across runs
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+                    self._write_ntriples(f)
+        else:
+            with open(tmp_file, "wb") as f:
+                if fmt == "nquads":
+                    self._write_nquads(f)
+                else:
+                    self._write_ntriples(f)
+        os.replace(tmp_file, output_file)
+        return output_file
+
+    def _write_ntriples(self, stream: IO[bytes]):
+        """The union of all modules as N-Triples, one line per distinct triple."""
+        write_lines(stream, (ntriples_line(t) for t in self.combined_graph.triples((None, None, None))))
+
+    def _write_nquads(self, stream: IO[bytes]):
+        """Every module's triples as N-Quads, in its own named graph."""
+        # Dataset.graphs() replaces the deprecated contexts() in newer rdflib
+        graphs = getattr(self.combined_graph, "graphs", self.combined_graph.contexts)
+        for context in sorted(graphs(), key=lambda c: str(c.identifier)):
+            write_lines(stream, (ntriples_line(t, context.identifier) for t in context))
+
+    def module_graph(self, name: str) -> Graph:
+        """The named graph in the combined store that holds one module's triples."""
+        if name == "main_ontology":
+            return self.combined_graph.graph(URIRef(f"{INTERNAL_NAMESPACE}main-ontology"))
+        return self.combined_graph.graph(URIRef(f"{INTERNAL_NAMESPACE}{name}-ontology"))
+
+    def load_modules(self, roots: List[str]) -> List[str]:
+        """
+        Load the root modules and everything they owl:import, each parsed once.
+
+        Imports are resolved round by round; the modules that need parsing in a
+        round are parsed together (in parallel when large enough). Once the
+        import DAG is complete, modules are merged into their named graphs with
+        imports ahead of importers. Returns the names of the modules loaded.
+        """
+        import_graph = ImportGraph()
+        parsed: Dict[str, ParsedModule] = {}
+        reused: Dict[str, Dict] = {}
+        seen = set()
+        pending = list(roots)
+        
+        while pending:
+            to_parse = {}
+            for name in pending:
+                if name in seen:
+                    continue
+                seen.add(name)
+                path = module_file(self.ontology_dir, name)
+                if not path.exists():
+                    logger.warning(f"Ontology module not found: {path}")
+                    continue
+                entry = self._reusable_entry(name) if self.incremental else None
+                if entry is not None:
+                    reused[name] = entry
+                else:
+                    to_parse[name] = path
+            
+            for name, module in parse_modules(to_parse, self.max_workers).items():
+                if module.error:
+                    logger.error(f"Error loading {name} ontology: {module.error}")
+                else:
+                    parsed[name] = module
+            
+            round_modules = [n for n in to_parse if n in parsed] + [n for n in pending if n in reused]
+            pending = []
+            for name in round_modules:
+                imports = parsed[name].imports if name in parsed else reused[name]["imports"]
+                imports = [i for i in imports if module_file(self.ontology_dir, i).exists()]
+                import_graph.add_module(name, imports)
+                pending.extend(i for i in imports if i not in seen)
         
-        # Add all triples from the old graph to the new one
-        for s, p, o in self.combined_graph:
-            new_graph.add((s, p, o))
+        try:
+            order = import_graph.load_order()
+        except ImportCycleError as e:
+            logger.error(f"Circular owl:imports between ontology modules: {e}")
+            order = sorted(import_graph.graph.nodes)
         
-        # Replace the old graph with the new one
-        self.combined_graph = new_graph
+        loaded = []
+        for name in order:
+            if name not in parsed and name not in reused:
+                # Imported by a module that loaded, but failed to parse itself (logged above)
+                logger.warning(f"Skipping ontology module {name}: it did not load")
+                continue
+            target = self.module_graph(name)
+            if name in reused:
+                # Snapshots are N-Triples, so they carry no prefixes and can go straight into the store
+                target.parse(self.cache_dir / reused[name]["snapshot"], format="nt")
+                self.new_manifest["modules"][name] = reused[name]
+                self.stats["reused"].append(name)
+            else:
+                module = parsed[name]
+                if self.incremental:
+                    self._store_module(module)
+                    self.stats["rebuilt"].append(name)
+                # One bulk insert into the shared store instead of a Python-level add per triple
+                target.addN((s, p, o, target) for s, p, o in module.triples)
+            
+            if name == "main_ontology":
+                logger.info("Loaded main ontology")
+            elif name in roots:
+                logger.info(f"Loaded core ontology: {name}")
+            else:
+                logger.info(f"Loaded imported ontology: {name}")
+            loaded.append(name)
+        return loaded
 
     def load_core_ontology(self, domain: str) -> bool:
-        """Load a core ontology from a domain module."""
-        core_file = self.ontology_dir / domain / f"{domain}_core.ttl"
+        """Load a core ontology from a domain module, with its imports."""
+        core_file = module_file(self.ontology_dir, domain)
         if not core_file.exists():
             logger.warning(f"Core ontology not found for domain {domain}: {core_file}")
             return False
-        
-        try:
-            # Create a temporary graph to parse the file
-            temp_graph = Graph()
-            
-            # Bind the domain's namespace before parsing
-            domain_ns = f"http://example.org/{domain}-ontology#"
-            temp_graph.bind(domain, Namespace(domain_ns))
-            
-            # Parse the file
-            temp_graph.parse(core_file, format="turtle")
-            
-            # Process owl:imports statements
-            for s, p, o in temp_graph.triples((None, self.combined_graph.namespace_manager.expand_curie("owl:imports"), None)):
-                import_path = str(o)
-                if import_path.startswith("http://example.org/"):
-                    # Handle internal imports
-                    import_domain = import_path.split("/")[-1].split("#")[0].split(".")[0]
-                    import_file = self.ontology_dir / import_domain / f"{import_domain}_core.ttl"
-                    if import_file.exists():
-                        # Bind the imported domain's namespace
-                        import_ns = f"http://example.org/{import_domain}-ontology#"
-                        temp_graph.bind(import_domain, Namespace(import_ns))
-                        temp_graph.parse(import_file, format="turtle")
-                        logger.info(f"Loaded imported ontology: {import_domain}")
-            
-            # Add all triples to the combined graph
-            for s, p, o in temp_graph:
-                self.combined_graph.add((s, p, o))
-            
-            logger.info(f"Loaded core ontology: {domain}")
-            return True
-        except Exception as e:
-            logger.error(f"Error loading {domain} core ontology: {e}")
-            return False
+        return domain in self.load_modules([domain])
 
     def load_main_ontology(self) -> bool:
-        """Load the main ontology."""
-        main_file = self.ontology_dir / "main_ontology" / "ontology.ttl"
+        """Load the main ontology, with its imports."""
+        main_file = module_file(self.ontology_dir, "main_ontology")
         if not main_file.exists():
             logger.error("Main ontology not found")
             return False
-        
-        try:
-            # Create a temporary graph to parse the file
-            temp_graph = Graph()
-            
-            # Bind all namespaces before parsing
-            for prefix, uri in self.namespaces.items():
-                temp_graph.bind(prefix, Namespace(uri))
-            
-            # Parse the file
-            temp_graph.parse(main_file, format="turtle")
-            
-            # Process owl:imports statements
-            for s, p, o in temp_graph.triples((None, self.combined_graph.namespace_manager.expand_curie("owl:imports"), None)):
-                import_path = str(o)
-                if import_path.startswith("http://example.org/"):
-                    # Handle internal imports
-                    import_domain = import_path.split("/")[-1].split("#")[0].split(".")[0]
-                    import_file = self.ontology_dir / import_domain / f"{import_domain}_core.ttl"
-                    if import_file.exists():
-                        # Bind the imported domain's namespace
-                        import_ns = f"http://example.org/{import_domain}-ontology#"
-                        temp_graph.bind(import_domain, Namespace(import_ns))
-                        temp_graph.parse(import_file, format="turtle")
-                        logger.info(f"Loaded imported ontology: {import_domain}")
-            
-            # Add all triples to the combined graph
-            for s, p, o in temp_graph:
-                self.combined_graph.add((s, p, o))
-            
-            logger.info("Loaded main ontology")
-            return True
-        except Exception as e:
-            logger.error(f"Error loading main ontology: {e}")
-            return False
+        return "main_ontology" in self.load_modules(["main_ontology"])
 
     def combine_ontologies(self):
         """Combine all ontologies into a single file."""
-        # Bind namespaces first
-        self.bind_namespaces()
-        
         # Load core ontologies from each domain
         domains = [
             'clinical',
@@ -174,28 +399,56 @@ class OntologyCombiner:
             'prov',
             'treatment'
         ]
-        for domain in domains:
-            self.load_core_ontology(domain)
         
-        # Load main ontology last (it may reference core ontologies)
-        self.load_main_ontology()
+        if self.incremental and self.is_up_to_date(domains + ["main_ontology"]):
+            logger.info(f"Combined ontology is up to date: {self.output_file}")
+            return
+        
+        # Bind namespaces first
+        self.bind_namespaces()
+        
+        # Load the core ontology of each domain and the main ontology, plus
+        # anything they import, in dependency order
+        self.load_modules(domains + ["main_ontology"])
         
         # Force final prov namespace binding
         self.combined_graph.bind("prov", Namespace("http://example.org/prov-ontology#"), override=True)
         
         # Serialize the combined graph
         try:
-            self.combined_graph.serialize(destination=self.output_file, format="turtle")
-            logger.info(f"Successfully combined ontologies into: {self.output_file}")
+            self.new_manifest["outputs"] = {}
+            for fmt in self.output_formats:
+                output_file = self.write_output(fmt)
+                logger.info(f"Successfully combined ontologies into: {output_file}")
+                if fmt != "nt.gz":
+                    # .gz/.br siblings so downloads are served pre-compressed
+                    write_compressed_siblings(output_file)
+                st = output_file.stat()
+                self.new_manifest["outputs"][fmt] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+            if self.incremental:
+                self._write_manifest()
+                logger.info(f"Rebuilt modules: {self.stats['rebuilt'] or 'none'}; "
+                            f"reused: {len(self.stats['reused'])}")
         except Exception as e:
             logger.error(f"Error serializing combined ontology: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Combine the domain ontology modules into one file.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse cached snapshots of modules whose sources have not changed.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes used to parse large module sets (default: CPU count).")
+    parser.add_argument("--format", dest="formats", action="append", choices=sorted(OUTPUT_FORMATS),
+                        help="Output format; repeat to write several. Defaults to pretty Turtle; "
+                             "nt, nt.gz and nquads are streamed and much faster on large graphs.")
+    args = parser.parse_args()
+    
     # Get the project root directory
     project_root = Path(__file__).parent.parent
     
     # Create and run the combiner
-    combiner = OntologyCombiner(str(project_root))
+    combiner = OntologyCombiner(str(project_root), incremental=args.incremental, max_workers=args.workers,
+                                output_formats=args.formats)
     combiner.combine_ontologies()
 
 if __name__ == "__main__":
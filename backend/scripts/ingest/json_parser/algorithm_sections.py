@@ -0,0 +1,119 @@
+"""
+Single-pass section tokenizer for the markdown of human_readable_algorithm.
+
+Atlas prints a cohort's algorithm as markdown with one ``###`` section per
+part of the definition ("Cohort Entry Events", "Inclusion Criteria",
+"Cohort Exit", "Cohort Eras"), and ``####`` subsections for the individual
+inclusion rules. ``SectionMap`` finds every heading in one scan of the text
+and records each section as offsets into it: a section runs from the end of
+its heading line to the next heading of the same or a higher level. Nothing
+is sliced out; ``contains`` and ``finditer`` search the original string
+between the offsets (str.find and pattern.finditer with pos/endpos).
+
+Section-specific extractors are registered on a ``SectionExtractors``
+registry by title and run against the map in registration order.
+"""
+
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+
+# Starts with a literal "#" so the scan skips (in C) to candidate headings; that
+# one starts a line is checked per match, which is much cheaper than a ^ anchor
+HEADING_RE = re.compile(r"#(#{0,5})[ \t]+([^\n]*)")
+
+
+def normalize_title(title: str) -> str:
+    return title.strip().rstrip(":").casefold()
+
+
+class Section:
+    """One heading and the span of text under it: text[start:end]."""
+
+    __slots__ = ("title", "level", "heading_start", "start", "end")
+
+    def __init__(self, title: str, level: int, heading_start: int, start: int, end: int):
+        self.title = title
+        self.level = level
+        self.heading_start = heading_start
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Section({self.title!r}, level={self.level}, span=({self.start}, {self.end}))"
+
+
+class SectionMap:
+    """The sections of a markdown text, in document order, found in one pass."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sections: List[Section] = []
+        self._by_title: Dict[str, Section] = {}
+        open_sections: List[Section] = []
+        for match in HEADING_RE.finditer(text):
+            heading_start = match.start()
+            if heading_start and text[heading_start - 1] != "\n":
+                continue
+            level = len(match.group(1)) + 1
+            # A heading closes every open section at its level or deeper
+            while open_sections and open_sections[-1].level >= level:
+                open_sections.pop().end = heading_start
+            # Closing #s are optional, and the line may end in \r\n
+            title = match.group(2).rstrip().rstrip("#").rstrip()
+            section = Section(title, level, heading_start, match.end(), len(text))
+            self.sections.append(section)
+            open_sections.append(section)
+            # The first section of a title wins, as text.split(title)[1] did
+            self._by_title.setdefault(normalize_title(section.title), section)
+
+    def get(self, title: str) -> Optional[Section]:
+        return self._by_title.get(normalize_title(title))
+
+    def get_normalized(self, key: str) -> Optional[Section]:
+        """get for a title already passed through normalize_title."""
+        return self._by_title.get(key)
+
+    def subsections(self, section: Section) -> List[Section]:
+        """The sections one level below section, inside its span."""
+        return [s for s in self.sections
+                if s.level == section.level + 1 and section.start <= s.heading_start < section.end]
+
+    def contains(self, section: Section, needle: str) -> bool:
+        return self.text.find(needle, section.start, section.end) != -1
+
+    def finditer(self, section: Section, pattern: Pattern) -> Iterator["re.Match"]:
+        return pattern.finditer(self.text, section.start, section.end)
+
+    def search(self, section: Section, pattern: Pattern) -> Optional["re.Match"]:
+        return pattern.search(self.text, section.start, section.end)
+
+    def body(self, section: Section) -> str:
+        """The section's text, stripped; this one copies."""
+        return self.text[section.start:section.end].strip()
+
+
+SectionExtractor = Callable[..., Iterator]
+
+
+class SectionExtractors:
+    """Extractors registered by section title, run in registration order."""
+
+    def __init__(self):
+        # (title, normalized title, extractor)
+        self._extractors: List[Tuple[str, str, SectionExtractor]] = []
+
+    def register(self, title: str) -> Callable[[SectionExtractor], SectionExtractor]:
+        """Decorator: run the function as extractor(sections, section, *args) when title is present."""
+        def decorator(extractor: SectionExtractor) -> SectionExtractor:
+            self._extractors.append((title, normalize_title(title), extractor))
+            return extractor
+        return decorator
+
+    def titles(self) -> List[str]:
+        return [title for title, _, _ in self._extractors]
+
+    def extract(self, sections: SectionMap, *args) -> Iterator:
+        for _, key, extractor in self._extractors:
+            section = sections.get_normalized(key)
+            if section is not None:
+                yield from extractor(sections, section, *args)
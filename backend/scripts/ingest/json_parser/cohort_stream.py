@@ -0,0 +1,124 @@
+"""
+Event-based reading of large cohort definition JSON files.
+
+A cohort file is read in two passes with ijson, so the concept arrays are
+never held in memory whole:
+
+* ``read_cohort_skeleton`` collects the top-level fields and, for each
+  concept set, its scalar fields (id, name, ...) with nested containers
+  replaced by empty ones;
+* ``iter_concept_set_entries`` then yields the entries of every concept
+  set's ``expression.items`` and ``resolvedConcepts`` one at a time.
+
+Peak memory is bounded by the largest single entry. ijson is optional; only
+the streaming mode needs it.
+"""
+
+from typing import Any, Dict, Iterator, Tuple
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # pragma: no cover - depends on the environment
+    ijson = None
+
+CONCEPT_SETS = "concept_sets"
+CONCEPT_SET_PREFIX = "concept_sets.item"
+ENTRY_PREFIXES = {
+    "concept_sets.item.expression.items.item": "item",
+    "concept_sets.item.resolvedConcepts.item": "resolved",
+}
+SCALAR_EVENTS = {"string", "number", "boolean", "null"}
+EMPTY_CONTAINERS = {"start_map": dict, "start_array": list}
+
+
+def require_ijson() -> None:
+    if ijson is None:
+        raise ImportError("Streaming cohort parsing needs the ijson package: pip install ijson")
+
+
+def _events(file_path: str):
+    f = open(file_path, "rb")
+    try:
+        # use_float keeps numbers as int/float, as json.load gives them
+        yield from ijson.parse(f, use_float=True)
+    finally:
+        f.close()
+
+
+def read_cohort_skeleton(file_path: str) -> Dict[str, Any]:
+    """Top-level fields, with concept_sets reduced to each set's scalar fields."""
+    require_ijson()
+    data: Dict[str, Any] = {}
+    builder, depth, key, set_key = None, 0, None, None
+
+    events = _events(file_path)
+    for prefix, event, value in events:
+        if prefix == "" and event != "start_map":
+            raise ValueError(f"Top-level JSON value in {file_path} is not an object")
+        break
+    for prefix, event, value in events:
+        if builder is not None:
+            # Building a (small) top-level value other than concept_sets
+            builder.event(event, value)
+            depth += event in EMPTY_CONTAINERS
+            depth -= event in ("end_map", "end_array")
+            if depth == 0:
+                data[key], builder = builder.value, None
+            continue
+
+        if prefix == "" and event == "map_key":
+            key = value
+        elif prefix == key and key != CONCEPT_SETS:
+            if event in SCALAR_EVENTS:
+                data[key] = value
+            else:
+                builder, depth = ObjectBuilder(), 1
+                builder.event(event, value)
+        elif prefix == CONCEPT_SETS and event == "start_array":
+            data[CONCEPT_SETS] = []
+        elif prefix == CONCEPT_SETS and event in SCALAR_EVENTS:
+            data[CONCEPT_SETS] = value
+        elif prefix == CONCEPT_SET_PREFIX:
+            if event == "start_map":
+                data[CONCEPT_SETS].append({})
+            elif event == "map_key":
+                set_key = value
+            elif event in SCALAR_EVENTS or event in EMPTY_CONTAINERS:
+                # A concept set that is not an object (kept so validation can flag it)
+                data[CONCEPT_SETS].append(value if event in SCALAR_EVENTS else EMPTY_CONTAINERS[event]())
+        elif prefix == f"{CONCEPT_SET_PREFIX}.{set_key}" and isinstance(data[CONCEPT_SETS][-1], dict):
+            if event in SCALAR_EVENTS:
+                data[CONCEPT_SETS][-1][set_key] = value
+            elif event in EMPTY_CONTAINERS:
+                data[CONCEPT_SETS][-1][set_key] = EMPTY_CONTAINERS[event]()
+    return data
+
+
+def iter_concept_set_entries(file_path: str) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    """
+    Yield (kind, set_index, entry) for every concept set entry, in file order.
+
+    kind is "item" for expression.items entries and "resolved" for
+    resolvedConcepts entries; set_index counts concept sets from 0.
+    """
+    require_ijson()
+    set_index = -1
+    builder, depth, kind = None, 0, None
+
+    for prefix, event, value in _events(file_path):
+        if builder is not None:
+            builder.event(event, value)
+            depth += event in EMPTY_CONTAINERS
+            depth -= event in ("end_map", "end_array")
+            if depth == 0:
+                yield kind, set_index, builder.value
+                builder = None
+            continue
+
+        if prefix == CONCEPT_SET_PREFIX and event == "start_map":
+            set_index += 1
+        elif prefix in ENTRY_PREFIXES and event == "start_map":
+            kind = ENTRY_PREFIXES[prefix]
+            builder, depth = ObjectBuilder(), 1
+            builder.event(event, value)
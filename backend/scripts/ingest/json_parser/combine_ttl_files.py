@@ -2,106 +2,163 @@ import os
 import sys
 import re
 import glob
+import heapq
 import argparse
+import tempfile
+import contextlib
 
-def escape_literals(content):
-    """Escape newlines in literals to make them valid RDF."""
-    lines = content.split('\n')
-    result = []
-    in_literal = False
-    current_literal = []
-    
+from ttl_io import COMPRESSIONS, AtomicTextWriter, open_text
+
+# TTL files as the parser writes them: plain, or compressed (see ttl_io)
+TTL_PATTERNS = ['*.ttl'] + [f'*.ttl{suffix}' for suffix in COMPRESSIONS.values()]
+
+def find_ttl_files(input_dir):
+    """The TTL files of input_dir, compressed ones included, sorted by path."""
+    return sorted(path for pattern in TTL_PATTERNS for path in glob.glob(os.path.join(input_dir, pattern)))
+
+# A line in a set costs about this much beyond its characters (str header, hash slot, sort list entry)
+LINE_OVERHEAD_BYTES = 100
+# Sorted runs merged at once; more runs are merged in several passes
+MERGE_FAN_IN = 64
+
+def is_valid_triple_line(line):
+    """Whether a stripped line is a valid, complete triple."""
+    if not line:
+        return False
+    # Skip lines that start with a quote (orphaned literal)
+    if line.startswith('"'):
+        return False
+    # Skip incomplete rdfs:label lines
+    if line.endswith('rdfs:label') or line.endswith('rdfs:label '):
+        return False
+    # Only allow lines that start with a valid subject and have at least two spaces and end with a period
+    if (line.startswith(':') or line.startswith('<') or ':' in line.split(' ')[0]) and line.count(' ') >= 2 and line.endswith('.'):
+        return True
+    return False
+
+def iter_triple_lines(ttl_files, prefixes):
+    """Yield the valid triple lines of ttl_files, one file at a time, adding their @prefix lines to prefixes."""
+    for ttl_file in ttl_files:
+        with open_text(ttl_file) as f:
+            # The parser escapes literals as it serializes, so every statement is one line
+            for line in f:
+                line = line.strip()
+                if line.startswith('@prefix'):
+                    prefixes.add(line)
+                elif is_valid_triple_line(line):
+                    yield line
+
+def _write_run(path, lines):
+    with AtomicTextWriter(path, compression=None) as f:
+        f.writelines(line + '\n' for line in lines)
+    return path
+
+def _read_run(path):
+    # Only \n ends a line, as written; no newline translation
+    with open(path, 'r', encoding='utf-8', newline='\n') as f:
+        for line in f:
+            yield line[:-1]
+
+def _merge_unique(runs):
+    """Merge sorted iterables into one sorted stream, dropping duplicates."""
+    previous = None
+    for line in heapq.merge(*runs):
+        if line != previous:
+            yield line
+            previous = line
+
+def external_sorted_unique(lines, memory_budget_bytes, work_dir):
+    """
+    The distinct lines in sorted order, holding about memory_budget_bytes of them at a time.
+
+    Lines are deduplicated into a set until its estimated size reaches the
+    budget, then sorted and spilled to a run file in work_dir. The runs are
+    merged (MERGE_FAN_IN at a time, in more passes if there are more) into
+    the returned iterator, which drops the duplicates between runs as it
+    goes. The order is that of sorted(set(lines)).
+    """
+    runs = []
+    chunk, size = set(), 0
     for line in lines:
-        # Check if we're starting a literal
-        if '"' in line and not in_literal:
-            parts = line.split('"', 1)
-            result.append(parts[0])  # Add the part before the literal
-            in_literal = True
-            current_literal = [parts[1]]
-        # Check if we're ending a literal
-        elif '"' in line and in_literal:
-            parts = line.split('"', 1)
-            current_literal.append(parts[0])
-            # Join the literal parts and escape newlines
-            literal = ' '.join(current_literal).replace('\n', '\\n')
-            result.append(f'"{literal}"{parts[1]}')
-            in_literal = False
-            current_literal = []
-        # We're in the middle of a literal
-        elif in_literal:
-            current_literal.append(line)
-        # Regular line
-        else:
-            result.append(line)
-    
-    return '\n'.join(result)
+        if line not in chunk:
+            chunk.add(line)
+            size += len(line) + LINE_OVERHEAD_BYTES
+            if size >= memory_budget_bytes:
+                runs.append(_write_run(os.path.join(work_dir, f'run_{len(runs):06d}'), sorted(chunk)))
+                chunk, size = set(), 0
+    if not runs:
+        # Everything fit in the budget
+        return iter(sorted(chunk))
+    if chunk:
+        runs.append(_write_run(os.path.join(work_dir, f'run_{len(runs):06d}'), sorted(chunk)))
+    del chunk
+
+    passes = 0
+    while len(runs) > MERGE_FAN_IN:
+        passes += 1
+        merged = []
+        for start in range(0, len(runs), MERGE_FAN_IN):
+            group = runs[start:start + MERGE_FAN_IN]
+            path = os.path.join(work_dir, f'merge_{passes}_{len(merged):06d}')
+            merged.append(_write_run(path, _merge_unique([_read_run(run) for run in group])))
+            for run in group:
+                os.remove(run)
+        runs = merged
+    return _merge_unique([_read_run(run) for run in runs])
+
+def combine_ttl_files(input_dir, output_file, memory_budget_mb=None, tmp_dir=None):
+    """
+    Combine multiple TTL files into a single file.
 
-def combine_ttl_files(input_dir, output_file):
-    """Combine multiple TTL files into a single file."""
-    ttl_files = sorted(glob.glob(os.path.join(input_dir, '*.ttl')))
+    Compressed inputs (.ttl.gz, .ttl.xz) are read transparently; the output
+    is compressed when its name ends in .gz or .xz, and replaces output_file
+    only once complete.
+
+    By default every distinct triple is held in memory to be sorted. With
+    memory_budget_mb they are sorted in runs of about that size, spilled to
+    temporary files (in tmp_dir, or the system default) and merged; the
+    output is byte-identical either way.
+    """
+    ttl_files = find_ttl_files(input_dir)
     
     if not ttl_files:
         print(f"No TTL files found in {input_dir}")
         return
     
-    # Helper to check if a line is a valid, complete triple
-    def is_valid_triple_line(line):
-        line = line.strip()
-        if not line:
-            return False
-        # Skip lines that start with a quote (orphaned literal)
-        if line.startswith('"'):
-            return False
-        # Skip incomplete rdfs:label lines
-        if line.endswith('rdfs:label') or line.endswith('rdfs:label '):
-            return False
-        # Only allow lines that start with a valid subject and have at least two spaces and end with a period
-        if (line.startswith(':') or line.startswith('<') or ':' in line.split(' ')[0]) and line.count(' ') >= 2 and line.endswith('.'):
-            return True
-        return False
-    
     # Read and process all files
     all_prefixes = set()
-    all_triples = set()
-    
-    for ttl_file in ttl_files:
-        with open(ttl_file, 'r') as f:
-            content = f.read()
-            escaped_content = escape_literals(content)
-            lines = escaped_content.split('\n')
-            
-            # Collect prefixes
-            for line in lines:
-                line = line.strip()
-                if line.startswith('@prefix'):
-                    all_prefixes.add(line)
-            
-            # Collect triples
-            for line in lines:
-                line = line.strip()
-                if is_valid_triple_line(line):
-                    all_triples.add(line)
+    triple_lines = iter_triple_lines(ttl_files, all_prefixes)
     
-    # Write the combined file
-    with open(output_file, 'w') as out:
-        # Write prefixes
-        for prefix in sorted(all_prefixes):
-            out.write(prefix + '\n')
-        out.write('\n')
+    with contextlib.ExitStack() as stack:
+        if memory_budget_mb is None:
+            all_triples = sorted(set(triple_lines))
+        else:
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='combine_ttl_', dir=tmp_dir))
+            all_triples = external_sorted_unique(triple_lines, int(memory_budget_mb * 1024 * 1024), work_dir)
         
-        # Write triples
-        for triple in sorted(all_triples):
-            out.write(triple + '\n')
+        # Write the combined file
+        with AtomicTextWriter(output_file) as out:
+            # Write prefixes
+            out.writelines(prefix + '\n' for prefix in sorted(all_prefixes))
+            out.write('\n')
+            
+            # Write triples
+            out.writelines(triple + '\n' for triple in all_triples)
     
     print(f"Successfully combined TTL files into {output_file}")
 
 def main():
     """Main function to combine TTL files."""
-    input_dir = "output/ttl"
-    output_file = "output/combined_cohorts.ttl"
+    parser = argparse.ArgumentParser(description='Combine the TTL files of a directory into one file.')
+    parser.add_argument('input_dir', nargs='?', default="output/ttl")
+    parser.add_argument('output_file', nargs='?', default="output/combined_cohorts.ttl")
+    parser.add_argument('--memory-budget-mb', type=float,
+                        help='Sort the triples in runs of about this size spilled to disk, instead of all in memory')
+    parser.add_argument('--tmp-dir', help='Where to spill the sorted runs (default: the system temporary directory)')
+    args = parser.parse_args()
     
     try:
-        combine_ttl_files(input_dir, output_file)
+        combine_ttl_files(args.input_dir, args.output_file, args.memory_budget_mb, args.tmp_dir)
     except Exception as e:
         print(f"Error combining TTL files: {str(e)}")
         sys.exit(1)
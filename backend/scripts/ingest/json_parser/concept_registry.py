@@ -0,0 +1,176 @@
+"""
+Registries that let each concept's descriptive triples be emitted once.
+
+Concept sets repeat the same concepts (common SNOMED codes appear in dozens
+of sets and cohorts), and every occurrence used to re-emit the concept's
+type, label, code, domain, vocabulary, class and exactMatch triples. A
+registry records which descriptive statements (rdf_terms triples) have been
+emitted: ``claim_new`` returns the statements not seen before and marks
+them as seen, and the caller emits only those. Linking triples (inclusion
+rules, hasResolvedConcept) never go through the registry.
+
+Statements are keyed by content, so a concept that an expression item and a
+resolved concept describe differently (e.g. a different concept class)
+still gets every distinct statement, exactly as the per-occurrence output
+had them.
+
+``ConceptRegistry`` lives in memory and covers one process; it keeps the
+text keys themselves, which costs memory but no hashing per statement.
+``SQLiteConceptRegistry`` keeps the keys in a SQLite file, with the cohort
+that owns each one, so every worker of a parse run (and later incremental
+runs) can share one registry.
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import List, Optional, Sequence, Set
+
+from rdf_terms import Triple, triple_key
+
+_blake2b = hashlib.blake2b
+
+
+def statement_key(statement: Triple) -> bytes:
+    return _blake2b(triple_key(statement).encode("utf-8"), digest_size=16).digest()
+
+
+class ConceptRegistry:
+    """In-memory registry of the descriptive statements emitted so far."""
+
+    def __init__(self):
+        self._keys: Set[str] = set()
+
+    def claim_new(self, statements: Sequence[Triple]) -> List[Triple]:
+        """The statements not claimed before, now claimed."""
+        new = []
+        keys = self._keys
+        for statement in statements:
+            # triple_key, inlined: this runs for every descriptive triple
+            s, p, o = statement
+            key = f"{s.key}\x1f{p.key}\x1f{o.key}"
+            if key not in keys:
+                keys.add(key)
+                new.append(statement)
+        return new
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class SQLiteConceptRegistry:
+    """
+    Registry of emitted descriptive statements shared through a SQLite file.
+
+    Any number of processes may open the same path. Each statement has one
+    owner, the cohort whose TTL file carries it; ``uses`` records every
+    cohort that asked for it. Because the file outlives a run, an
+    incremental run can re-parse one cohort without re-describing concepts
+    that unchanged cohorts already carry.
+
+    A worker calls ``begin`` before parsing a cohort and ``finish`` after
+    (or ``forget`` when the cohort failed or its input was deleted). Both
+    return the other cohorts that used a statement the cohort no longer
+    carries; those have to be parsed again so the statement is written by
+    one of them.
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the registry in a crash only costs duplicate triples, never wrong ones
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS statements (key BLOB PRIMARY KEY, owner TEXT NOT NULL) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS statements_owner ON statements (owner);
+            CREATE TABLE IF NOT EXISTS uses (cohort TEXT, key BLOB, PRIMARY KEY (cohort, key)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS uses_key ON uses (key);
+        """)
+        self.cohort: Optional[str] = None
+        # Keys the current cohort has asked for, so it emits each statement once
+        self._seen: Set[bytes] = set()
+
+    @classmethod
+    def create(cls, path: str, **kwargs) -> "SQLiteConceptRegistry":
+        """A new, empty registry at path, replacing one left by an earlier run."""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return cls(path, **kwargs)
+
+    def begin(self, cohort: str) -> None:
+        """Start (re-)parsing cohort: its old uses are dropped, the statements it owns stay its own."""
+        self.cohort = cohort
+        self._seen = set()
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM uses WHERE cohort = ?", (cohort,))
+
+    def claim_new(self, statements: Sequence[Triple]) -> List[Triple]:
+        """
+        The statements the current cohort has to emit, each once: unowned ones, now its own, and those it already owns.
+        """
+        if self.cohort is None:
+            raise RuntimeError("SQLiteConceptRegistry.begin must be called before claim_new")
+        if not statements:
+            return []
+        new = []
+        cohort, seen = self.cohort, self._seen
+        # One write transaction per concept occurrence rather than per statement
+        with self._conn:
+            execute = self._conn.execute
+            execute("BEGIN IMMEDIATE")
+            for statement in statements:
+                key = statement_key(statement)
+                if key in seen:
+                    continue
+                seen.add(key)
+                execute("INSERT OR IGNORE INTO uses (cohort, key) VALUES (?, ?)", (cohort, key))
+                # rowcount is 1 when the row is inserted or already belongs to this cohort
+                if execute("INSERT INTO statements (key, owner) VALUES (?, ?) "
+                           "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner WHERE owner = excluded.owner",
+                           (key, cohort)).rowcount == 1:
+                    new.append(statement)
+        return new
+
+    def finish(self) -> List[str]:
+        """
+        End the current cohort: statements it owns but did not use this time are dropped.
+
+        Returns the other cohorts that use a dropped statement.
+        """
+        cohort, self.cohort, self._seen = self.cohort, None, set()
+        return self._drop_owned(
+            cohort, "AND key NOT IN (SELECT key FROM uses WHERE cohort = :cohort)")
+
+    def forget(self, cohort: str) -> List[str]:
+        """
+        Drop everything of cohort (failed, or its input deleted): its uses and the statements it owns.
+
+        Returns the other cohorts that use one of those statements.
+        """
+        if self.cohort == cohort:
+            self.cohort = None
+        return self._drop_owned(cohort, "", forget_uses=True)
+
+    def _drop_owned(self, cohort: str, condition: str, forget_uses: bool = False) -> List[str]:
+        params = {"cohort": cohort}
+        with self._conn:
+            execute = self._conn.execute
+            execute("BEGIN IMMEDIATE")
+            if forget_uses:
+                execute("DELETE FROM uses WHERE cohort = :cohort", params)
+            execute("CREATE TEMP TABLE IF NOT EXISTS dropped (key BLOB PRIMARY KEY) WITHOUT ROWID")
+            execute("DELETE FROM temp.dropped")
+            execute(f"INSERT INTO temp.dropped SELECT key FROM statements WHERE owner = :cohort {condition}", params)
+            execute("DELETE FROM statements WHERE key IN (SELECT key FROM temp.dropped)")
+            rows = execute("SELECT DISTINCT cohort FROM uses WHERE key IN (SELECT key FROM temp.dropped) "
+                           "AND cohort != :cohort ORDER BY cohort", params).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM statements").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,120 @@
+"""
+Single-pass matcher for the extraction_patterns in extraction_rules.yaml.
+
+All patterns of all rules are compiled into one regex, so a description is
+scanned once rather than once per pattern. The regex has two parts:
+
+* a lookahead over the alternation of every pattern, which lets the scan skip
+  (in C) every position where no pattern can start;
+* one optional lookahead per pattern, each wrapping the pattern in its own
+  named group, which records where every pattern matches at that position.
+
+Because matches are captured inside lookaheads they can overlap, exactly as
+when each pattern ran on its own. Per pattern, a match is kept only if it
+starts at or after the end of the previous one, which is what finditer did.
+Named groups inside a pattern are renamed to stay unique and a pattern's
+groups are addressed by offset from its wrapper group, so ``(?P<value>...)``
+and plain ``(...)`` captures mean what they did before.
+
+The compiled engine is cached with the rest of the parser's state by
+parser_context; ENGINE_VERSION is part of that cache's key.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ENGINE_VERSION = 1
+
+_GROUP_NAME_RE = re.compile(r"\(\?P<(\w+)>")
+_GROUP_REF_RE = re.compile(r"\(\?P=(\w+)\)")
+
+
+@dataclass
+class CompiledPattern:
+    """Where one rule pattern's groups sit in the combined regex."""
+    rule_index: int
+    pattern_index: int
+    name: str
+    predicate: str
+    group: int
+    value_group: Optional[int]
+    first_group: int
+
+
+@dataclass
+class ExtractionMatch:
+    """One match of a rule pattern; value is the captured text, stripped."""
+    pattern: CompiledPattern
+    start: int
+    value: str
+
+
+def _rename_groups(pattern: str, suffix: str) -> str:
+    pattern = _GROUP_NAME_RE.sub(lambda m: f"(?P<{m.group(1)}{suffix}>", pattern)
+    return _GROUP_REF_RE.sub(lambda m: f"(?P={m.group(1)}{suffix})", pattern)
+
+
+def compile_layout(rules: Dict[str, Any], flags: int = re.IGNORECASE) -> Tuple[str, List[CompiledPattern]]:
+    """Build the combined regex source and the group layout for each pattern."""
+    sources = []
+    for rule_index, rule in enumerate(rules.get("extraction_patterns", [])):
+        for pattern_index, pattern in enumerate(rule["patterns"]):
+            sources.append((rule_index, pattern_index, rule, pattern, re.compile(pattern, flags)))
+    if not sources:
+        return "", []
+
+    prefilter = "|".join(f"(?:{_rename_groups(pattern, f'__f{i}')})"
+                         for i, (_, _, _, pattern, _) in enumerate(sources))
+    next_group = 1 + sum(compiled.groups for *_, compiled in sources)
+    parts, patterns = [f"(?=(?:{prefilter}))"], []
+    for i, (rule_index, pattern_index, rule, pattern, compiled) in enumerate(sources):
+        value_relative = compiled.groupindex.get("value")
+        patterns.append(CompiledPattern(
+            rule_index=rule_index,
+            pattern_index=pattern_index,
+            name=rule.get("name", ""),
+            predicate=rule["predicate"],
+            group=next_group,
+            value_group=next_group + value_relative if value_relative else None,
+            # A pattern without groups captures its whole match
+            first_group=next_group + 1 if compiled.groups else next_group,
+        ))
+        parts.append(f"(?:(?=(?P<p{i}>{_rename_groups(pattern, f'__p{i}')})))?")
+        next_group += 1 + compiled.groups
+    return "".join(parts), patterns
+
+
+class ExtractionEngine:
+    """All extraction patterns compiled into one regex."""
+
+    def __init__(self, source: str, patterns: List[CompiledPattern], flags: int = re.IGNORECASE):
+        self.source = source
+        self.patterns = patterns
+        self.flags = flags
+        self.regex = re.compile(source, flags) if patterns else None
+
+    @classmethod
+    def from_rules(cls, rules: Dict[str, Any], flags: int = re.IGNORECASE) -> "ExtractionEngine":
+        source, patterns = compile_layout(rules, flags)
+        return cls(source, patterns, flags)
+
+    def finditer(self, text: str) -> Iterator[ExtractionMatch]:
+        """Every pattern's matches, as re.finditer would give them, from one scan of text."""
+        if self.regex is None:
+            return
+        resume = [0] * len(self.patterns)
+        for match in self.regex.finditer(text):
+            position = match.start()
+            for i, pattern in enumerate(self.patterns):
+                start, end = match.span(pattern.group)
+                if start < 0 or start < resume[i]:
+                    continue
+                # An empty match must not repeat at the same position
+                resume[i] = end if end > start else start + 1
+                group = pattern.value_group if pattern.value_group is not None else pattern.first_group
+                yield ExtractionMatch(pattern, position, match.group(group).strip())
+
+    def extract(self, text: str) -> List[ExtractionMatch]:
+        """Matches ordered by rule, then pattern, then position, like the old per-pattern loops."""
+        return sorted(self.finditer(text), key=lambda m: (m.pattern.rule_index, m.pattern.pattern_index, m.start))
@@ -0,0 +1,128 @@
+"""
+Manifest of what an earlier run_all_parsers run produced, for incremental runs.
+
+For every input cohort JSON the manifest records its size, mtime and
+content hash, and the TTL file (with triple and validation-error counts)
+parsed from it. The manifest also records a parser version: the hashes of
+extraction_rules.yaml, core_base.json and the parser sources. A later run
+then only parses inputs that are new or whose content changed, drops the
+outputs of inputs that are gone, and starts over when the version differs.
+
+Inputs are keyed by file name, as they all live in one directory.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """blake2b hex digest of the file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parser_version(paths: Iterable[str]) -> Dict[str, str]:
+    """file name -> digest for each file the parser output depends on; "missing" for absent ones."""
+    return {os.path.basename(path): file_digest(path) if os.path.exists(path) else "missing"
+            for path in paths}
+
+
+@dataclass
+class ManifestEntry:
+    """What was produced from one input file."""
+    size: int
+    mtime_ns: int
+    digest: str
+    output_file: Optional[str] = None
+    triple_count: int = 0
+    validation_errors: int = 0
+
+
+@dataclass
+class IngestPlan:
+    """What an incremental run has to do; changed and unchanged hold input paths, deleted holds names."""
+    rebuild: bool
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestManifest:
+    version: Dict[str, str] = field(default_factory=dict)
+    entries: Dict[str, ManifestEntry] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "IngestManifest":
+        """The manifest at path; an empty one if it is missing, unreadable or from another format version."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("manifest_version") != MANIFEST_VERSION:
+                return cls()
+            return cls(data["version"], {name: ManifestEntry(**entry) for name, entry in data["entries"].items()})
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+
+    def save(self, path: str) -> None:
+        """Write the manifest to a temporary file, then move it into place."""
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        os.replace(tmp_file, path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "manifest_version": MANIFEST_VERSION,
+            "version": self.version,
+            "entries": {name: asdict(entry) for name, entry in self.entries.items()},
+        }
+
+    def plan(self, input_files: List[str], version: Dict[str, str], full: bool = False) -> IngestPlan:
+        """
+        Sort input_files into changed and unchanged, and find the names of deleted inputs.
+
+        An input whose size and mtime match its entry is taken as unchanged
+        without reading it; otherwise its content hash decides (and a
+        matching hash refreshes the entry's size and mtime). An input whose
+        output TTL has gone missing counts as changed. With full, or a
+        different parser version, every input is changed.
+        """
+        names = {os.path.basename(path) for path in input_files}
+        plan = IngestPlan(rebuild=full or version != self.version)
+        plan.deleted = sorted(name for name in self.entries if name not in names)
+        if plan.rebuild:
+            plan.changed = list(input_files)
+            return plan
+
+        for path in input_files:
+            entry = self.entries.get(os.path.basename(path))
+            if entry is None or (entry.output_file and not os.path.exists(entry.output_file)):
+                plan.changed.append(path)
+                continue
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+                if file_digest(path) != entry.digest:
+                    plan.changed.append(path)
+                    continue
+                entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+            plan.unchanged.append(path)
+        return plan
+
+    def record(self, input_file: str, output_file: Optional[str], triple_count: int,
+               validation_errors: int) -> ManifestEntry:
+        """Record the output just parsed from input_file."""
+        stat = os.stat(input_file)
+        entry = ManifestEntry(stat.st_size, stat.st_mtime_ns, file_digest(input_file),
+                              output_file, triple_count, validation_errors)
+        self.entries[os.path.basename(input_file)] = entry
+        return entry
@@ -0,0 +1,233 @@
+"""
+Explicit, lazily loaded parser state for unified_parser.
+
+Importing unified_parser used to configure logging (opening
+cohort_parser.log), read core_base.json and parse extraction_rules.yaml
+with PyYAML, so every subprocess, test and notebook paid for them. Now a
+``ParserContext`` holds that state and loads it on first use: the
+extraction rules, the core ontology, its ``ClassIndex`` and the compiled
+``ExtractionEngine``.
+
+Loading goes through a pickle cache keyed by the content hash of both source
+files (and the cache format), so a warm start neither imports yaml nor
+rebuilds the class closure or the combined regex. The cache lives in the
+parser's own .cache directory and is only ever read from there.
+
+``setup_logging`` is the logging configuration the scripts used to apply at
+import; their main functions now call it.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+from functools import cached_property
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from extraction_engine import ENGINE_VERSION, ExtractionEngine
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pickled layout changes
+CONTEXT_VERSION = 1
+PARSER_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(PARSER_DIR, ".cache")
+DEFAULT_RULES_PATH = os.path.join(PARSER_DIR, 'extraction_rules.yaml')
+DEFAULT_CORE_BASE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(PARSER_DIR))),
+                                      'ontologies', 'metadata', 'core_base.json')
+LOG_FILE = 'cohort_parser.log'
+EMPTY_ONTOLOGY = {"classes": [], "semantic_domains": []}
+
+
+def setup_logging(log_file: Optional[str] = LOG_FILE, level: int = logging.INFO) -> None:
+    """Log to stderr and, with log_file, to that file; does nothing if logging is already configured."""
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+
+class ClassIndex:
+    """
+    Lookup structures for the core ontology classes, built once at load.
+
+    Holds an id -> class dict and, for every class, the frozen set of all its
+    transitive superclasses, so validity and subsumption checks are O(1).
+    """
+
+    def __init__(self, classes: List[Dict[str, Any]]):
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        for cls in classes:
+            # First definition wins, as with the old linear scan
+            self.classes.setdefault(cls["id"], cls)
+        self.superclasses: Dict[str, frozenset] = self._build_closure()
+
+    def _parents(self, class_id: str) -> List[str]:
+        return self.classes[class_id].get("subClassOf", [])
+
+    def _build_closure(self) -> Dict[str, frozenset]:
+        """Transitive superclasses of every class via one memoized depth-first pass."""
+        closure: Dict[str, frozenset] = {}
+        incomplete = set()
+        for root in self.classes:
+            if root in closure:
+                continue
+            stack = [(root, iter(self._parents(root)))]
+            on_stack = {root}
+            while stack:
+                node, parents = stack[-1]
+                for parent in parents:
+                    if parent in self.classes and parent not in closure and parent not in on_stack:
+                        on_stack.add(parent)
+                        stack.append((parent, iter(self._parents(parent))))
+                        break
+                else:
+                    stack.pop()
+                    on_stack.discard(node)
+                    ancestors = set(self._parents(node))
+                    for parent in self._parents(node):
+                        if parent in on_stack or parent in incomplete:
+                            # Part of a subClassOf cycle; finished below
+                            incomplete.add(node)
+                        ancestors.update(closure.get(parent, ()))
+                    closure[node] = frozenset(ancestors)
+        for node in incomplete:
+            ancestors, queue = set(), list(self._parents(node))
+            while queue:
+                parent = queue.pop()
+                if parent not in ancestors:
+                    ancestors.add(parent)
+                    queue.extend(self._parents(parent) if parent in self.classes else ())
+            closure[node] = frozenset(ancestors)
+        return closure
+
+    def get(self, class_id: str) -> Optional[Dict[str, Any]]:
+        return self.classes.get(class_id)
+
+    def __contains__(self, class_id: str) -> bool:
+        return class_id in self.classes
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def is_subclass_of(self, sub_class_id: str, super_class_id: str) -> bool:
+        if sub_class_id == super_class_id:
+            return True
+        return super_class_id in self.superclasses.get(sub_class_id, ())
+
+
+class LoadedRules(NamedTuple):
+    """Everything ParserContext loads, pickled as one unit."""
+    rules: Dict[str, Any]
+    core_ontology: Dict[str, Any]
+    class_index: ClassIndex
+    engine: ExtractionEngine
+
+
+def _read_source(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _load_core_ontology(source: Optional[bytes]) -> Dict[str, Any]:
+    if source is None:
+        logger.error("core_base.json not found. Ontology-aware validation will be skipped.")
+        return dict(EMPTY_ONTOLOGY)
+    try:
+        return json.loads(source)
+    except json.JSONDecodeError:
+        logger.error("Error decoding core_base.json. Ontology-aware validation will be skipped.")
+        return dict(EMPTY_ONTOLOGY)
+
+
+class ParserContext:
+    """
+    The rules and ontology unified_parser works with, loaded on first access.
+
+    cache_dir=None turns the pickle cache off.
+    """
+
+    def __init__(self, rules_path: str = DEFAULT_RULES_PATH, core_base_path: str = DEFAULT_CORE_BASE_PATH,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.rules_path = rules_path
+        self.core_base_path = core_base_path
+        self.cache_dir = cache_dir
+
+    @cached_property
+    def _loaded(self) -> LoadedRules:
+        rules_source = _read_source(self.rules_path)
+        if rules_source is None:
+            raise FileNotFoundError(f"Extraction rules not found: {self.rules_path}")
+        core_source = _read_source(self.core_base_path)
+        if not self.cache_dir:
+            return self._build(rules_source, core_source)
+
+        digest = hashlib.blake2b(f"{CONTEXT_VERSION}:{ENGINE_VERSION}:".encode(), digest_size=16)
+        for source in (rules_source, core_source):
+            digest.update(b"\0" if source is None else hashlib.blake2b(source, digest_size=16).digest())
+        cache_file = os.path.join(self.cache_dir, f"parser_context.{digest.hexdigest()}.pickle")
+        try:
+            with open(cache_file, 'rb') as f:
+                loaded = pickle.load(f)
+            if isinstance(loaded, LoadedRules):
+                return loaded
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parser context cache {cache_file}: {e}")
+
+        loaded = self._build(rules_source, core_source)
+        self._write_cache(cache_file, loaded)
+        return loaded
+
+    def _build(self, rules_source: bytes, core_source: Optional[bytes]) -> LoadedRules:
+        # PyYAML is only needed when the cache misses
+        import yaml
+        rules = yaml.safe_load(rules_source)
+        core_ontology = _load_core_ontology(core_source)
+        return LoadedRules(rules, core_ontology, ClassIndex(core_ontology.get("classes", [])),
+                           ExtractionEngine.from_rules(rules))
+
+    def _write_cache(self, cache_file: str, loaded: LoadedRules) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(loaded, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+            # Entries for earlier versions of the sources are never read again
+            for stale in glob.glob(os.path.join(self.cache_dir, "parser_context.*.pickle")):
+                if stale != cache_file:
+                    os.remove(stale)
+        except OSError as e:
+            logger.warning(f"Could not cache parser context: {e}")
+
+    def load(self) -> "ParserContext":
+        """Load everything now rather than on first use (e.g. in a pool initializer)."""
+        self._loaded
+        return self
+
+    @property
+    def rules(self) -> Dict[str, Any]:
+        return self._loaded.rules
+
+    @property
+    def core_ontology(self) -> Dict[str, Any]:
+        return self._loaded.core_ontology
+
+    @property
+    def class_index(self) -> ClassIndex:
+        return self._loaded.class_index
+
+    @property
+    def engine(self) -> ExtractionEngine:
+        return self._loaded.engine
@@ -0,0 +1,194 @@
+"""
+Serializers for the triples of rdf_terms.
+
+Every backend takes the same (subject, predicate, object) tuples of Terms
+and does its escaping exactly once, here:
+
+* ``TurtleSerializer``: one statement per line after the @prefix block,
+  prefixed names kept as they are;
+* ``NTriplesSerializer``: prefixed names expanded to full IRIs;
+* ``NQuadsSerializer``: N-Triples plus a graph IRI on every line;
+* ``RDFLibSink``: straight into an rdflib Graph, or a Graph over any
+  Store, with no text in between.
+
+``SERIALIZERS`` maps the format names used by combine_ontologies ("turtle",
+"nt", "nquads") to the text backends.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Optional, TextIO
+
+from rdf_terms import INTERN_CACHE_SIZE, IRI, NAME, Term, Triple
+
+_STRING_ESCAPES = str.maketrans({
+    "\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f",
+})
+# Statements joined into one string per write call
+WRITE_BATCH_SIZE = 4096
+# Characters IRIREF does not allow; they are percent-encoded
+_IRI_UNSAFE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+
+def escape_string(value: str) -> str:
+    """value escaped for the inside of a Turtle / N-Triples "..." string."""
+    return value.translate(_STRING_ESCAPES)
+
+
+def escape_iri(value: str) -> str:
+    """value with the characters IRIREF forbids percent-encoded."""
+    return _IRI_UNSAFE.sub(lambda m: "".join(f"%{b:02X}" for b in m.group().encode("utf-8")), value)
+
+
+class TripleSerializer(ABC):
+    """Base for the text backends: a header, then one statement per line."""
+
+    format = ""
+    extension = ""
+
+    def header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def term(self, term: Term) -> str:
+        """term in this backend's syntax."""
+
+    def statement(self, t: Triple) -> str:
+        term = self.term
+        return f"{term(t[0])} {term(t[1])} {term(t[2])} ."
+
+    def write(self, triples: Iterable[Triple], f: TextIO) -> int:
+        """Write the header, then the triples in batches as they come; returns the count."""
+        f.write(self.header())
+        count = 0
+        triples, statement = iter(triples), self.statement
+        while True:
+            batch = [statement(t) for t in islice(triples, WRITE_BATCH_SIZE)]
+            if not batch:
+                return count
+            count += len(batch)
+            # One write per batch; a text file's write costs far more per call than per character
+            batch.append("")
+            f.write("\n".join(batch))
+
+
+class TurtleSerializer(TripleSerializer):
+    format = "turtle"
+    extension = ".ttl"
+
+    def __init__(self, prefixes: str):
+        self.prefixes = prefixes
+
+    def header(self) -> str:
+        return self.prefixes
+
+    def statement(self, t: Triple) -> str:
+        # Names (most terms) are written as they are; only the rest goes through term()
+        s, p, o = t
+        return (f"{s.value if s.kind == NAME else self.term(s)} {p.value if p.kind == NAME else self.term(p)} "
+                f"{o.value if o.kind == NAME else self.term(o)} .")
+
+    def term(self, term: Term) -> str:
+        kind = term.kind
+        if kind == NAME:
+            return term.value
+        if kind == IRI:
+            return f"<{escape_iri(term.value)}>"
+        text = term.value.translate(_STRING_ESCAPES)
+        return f'"{text}"^^{term.datatype.value}' if term.datatype is not None else f'"{text}"'
+
+
+class NTriplesSerializer(TripleSerializer):
+    format = "nt"
+    extension = ".nt"
+
+    def __init__(self, namespaces: Dict[str, str]):
+        self.namespaces = namespaces
+        self._expand = lru_cache(maxsize=INTERN_CACHE_SIZE)(self._expand_name)
+
+    def _expand_name(self, pname: str) -> str:
+        prefix, _, local = pname.partition(":")
+        if prefix not in self.namespaces:
+            raise ValueError(f"Unknown prefix in {pname!r}")
+        return f"<{escape_iri(self.namespaces[prefix] + local)}>"
+
+    def term(self, term: Term) -> str:
+        if term.kind == NAME:
+            return self._expand(term.value)
+        if term.kind == IRI:
+            return f"<{escape_iri(term.value)}>"
+        text = f'"{escape_string(term.value)}"'
+        return f"{text}^^{self._expand(term.datatype.value)}" if term.datatype is not None else text
+
+
+class NQuadsSerializer(NTriplesSerializer):
+    format = "nquads"
+    extension = ".nq"
+
+    def __init__(self, namespaces: Dict[str, str], graph_iri: str):
+        super().__init__(namespaces)
+        self.graph = f"<{escape_iri(graph_iri)}>"
+
+    def statement(self, t: Triple) -> str:
+        return f"{self.term(t[0])} {self.term(t[1])} {self.term(t[2])} {self.graph} ."
+
+
+SERIALIZERS = {
+    TurtleSerializer.format: TurtleSerializer,
+    NTriplesSerializer.format: NTriplesSerializer,
+    NQuadsSerializer.format: NQuadsSerializer,
+}
+
+
+def make_serializer(fmt: str, prefixes: str, namespaces: Dict[str, str],
+                    graph_iri: Optional[str] = None) -> TripleSerializer:
+    """The text backend for fmt ("turtle", "nt" or "nquads")."""
+    if fmt == TurtleSerializer.format:
+        return TurtleSerializer(prefixes)
+    if fmt == NTriplesSerializer.format:
+        return NTriplesSerializer(namespaces)
+    if fmt == NQuadsSerializer.format:
+        if not graph_iri:
+            raise ValueError("N-Quads output needs a graph IRI")
+        return NQuadsSerializer(namespaces, graph_iri)
+    raise ValueError(f"Unknown output format {fmt!r}; expected one of {', '.join(SERIALIZERS)}")
+
+
+class RDFLibSink:
+    """Adds triples to an rdflib graph directly, converting each distinct name once."""
+
+    def __init__(self, graph, namespaces: Dict[str, str]):
+        from rdflib import Literal, URIRef
+        self.graph = graph
+        self.namespaces = namespaces
+        self._literal = Literal
+        self._uri = lru_cache(maxsize=INTERN_CACHE_SIZE)(URIRef)
+        self._expand = lru_cache(maxsize=INTERN_CACHE_SIZE)(self._expand_name)
+
+    def _expand_name(self, pname: str):
+        prefix, _, local = pname.partition(":")
+        if prefix not in self.namespaces:
+            raise ValueError(f"Unknown prefix in {pname!r}")
+        return self._uri(escape_iri(self.namespaces[prefix] + local))
+
+    def term(self, term: Term):
+        if term.kind == NAME:
+            return self._expand(term.value)
+        if term.kind == IRI:
+            # Escaped like the text backends, so every backend yields the same IRIs
+            return self._uri(escape_iri(term.value))
+        datatype = self._expand(term.datatype.value) if term.datatype is not None else None
+        return self._literal(term.value, datatype=datatype)
+
+    def add(self, triples: Iterable[Triple]) -> int:
+        """Add the triples to the graph in batches, one addN per batch; returns the count."""
+        count = 0
+        triples, term, graph = iter(triples), self.term, self.graph
+        while True:
+            batch = [(term(s), term(p), term(o), graph) for s, p, o in islice(triples, WRITE_BATCH_SIZE)]
+            if not batch:
+                return count
+            count += len(batch)
+            graph.addN(batch)
@@ -0,0 +1,97 @@
+"""
+Compact term model for parser output.
+
+The parser emits triples as tuples of three ``Term`` objects rather than as
+Turtle text, so nothing has to be escaped (or un-escaped) until a
+serializer in rdf_serializers writes them out. A term is one of:
+
+* a prefixed name such as ``rdf:type`` or ``:Cohort10616`` (``NAME``);
+* an absolute IRI such as an Atlas edit URL (``IRI``);
+* a literal with an optional datatype, itself a prefixed name (``LITERAL``).
+
+Names and IRIs repeat constantly (every predicate, every shared concept), so
+``name`` and ``iri`` intern them through a bounded cache; literals are
+built fresh.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+NAME = "name"
+IRI = "iri"
+LITERAL = "literal"
+
+# Bounded so interning never grows with the size of a run
+INTERN_CACHE_SIZE = 1 << 16
+
+
+class Term:
+    """
+    One RDF term: kind is NAME, IRI or LITERAL; datatype is a NAME term or None.
+
+    key identifies the term as one string (kind, value and datatype), built
+    once so that equality, hashing and triple_key stay cheap.
+    """
+
+    __slots__ = ("kind", "value", "datatype", "key")
+
+    def __init__(self, kind: str, value: str, datatype: Optional["Term"] = None):
+        self.kind = kind
+        self.value = value
+        self.datatype = datatype
+        self.key = f"{kind[0]}{value}" if datatype is None else f"{kind[0]}{value}\x1e{datatype.value}"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Term) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"Term({self.kind!r}, {self.value!r}{f', {self.datatype!r}' if self.datatype else ''})"
+
+
+Triple = Tuple[Term, Term, Term]
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def name(pname: str) -> Term:
+    """The interned term for a prefixed name like "rdf:type" or ":Cohort1"."""
+    return Term(NAME, pname)
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def iri(value: str) -> Term:
+    """The interned term for an absolute IRI."""
+    return Term(IRI, value)
+
+
+def literal(value, datatype: Union[str, Term, None] = None) -> Term:
+    """A literal; value is converted with str(), datatype is a prefixed name like "xsd:integer" or its term."""
+    if datatype is not None and datatype.__class__ is str:
+        datatype = name(datatype)
+    return Term(LITERAL, value if value.__class__ is str else str(value), datatype)
+
+
+def triple(subject: Union[str, Term], predicate: Union[str, Term], obj: Union[str, Term]) -> Triple:
+    """A triple; plain strings are taken as prefixed names."""
+    return (
+        name(subject) if subject.__class__ is str else subject,
+        name(predicate) if predicate.__class__ is str else predicate,
+        name(obj) if obj.__class__ is str else obj,
+    )
+
+
+def triple_key(t: Triple) -> str:
+    """A text key that identifies a triple independently of any serialization."""
+    return f"{t[0].key}\x1f{t[1].key}\x1f{t[2].key}"
+
+
+def parse_prefixes(prefix_block: str) -> Dict[str, str]:
+    """prefix -> namespace for every "@prefix p: <ns> ." line of a Turtle header."""
+    namespaces = {}
+    for line in prefix_block.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and parts[0] == "@prefix" and parts[1].endswith(":"):
+            namespaces[parts[1][:-1]] = parts[2].strip("<>")
+    return namespaces
@@ -1,134 +1,345 @@
 import os
 import sys
+import time
+import argparse
 import logging
 import subprocess
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 import glob
+import json
 import concurrent.futures
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('cohort_parser.log'),
-        logging.StreamHandler()
-    ]
-)
+from combine_ttl_files import find_ttl_files
+from concept_registry import SQLiteConceptRegistry
+from ingest_manifest import IngestManifest, parser_version
+from parser_context import LOG_FILE, setup_logging
+from stage_profiler import NULL_PROFILER, BatchProfile, StageProfiler
+from ttl_io import COMPRESSIONS, AtomicTextWriter, open_text
+from ttl_validation import StatementValidator, validate_turtle_text
+
+# Logging is configured by main (and, through log_file, in the pool workers), not on import
 logger = logging.getLogger(__name__)
 
+@dataclass
+class FileResult:
+    """Outcome of parsing one cohort JSON file."""
+    input_file: str
+    success: bool
+    output_file: Optional[str] = None
+    triple_count: int = 0
+    validation_errors: int = 0
+    syntax_errors: List[Dict[str, Any]] = field(default_factory=list)
+    error_type: Optional[str] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+    # Other cohorts (input file names) that must be parsed again to describe concepts this one no longer does
+    dependents: List[str] = field(default_factory=list)
+    # StageProfiler.to_dict() of the parse; empty unless profiling
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# Per-process state set up once by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(output_dir: str, registry_path: Optional[str] = None, log_file: Optional[str] = None,
+                 profile: bool = False, compression: Optional[str] = None) -> None:
+    """Import unified_parser and load its context (rules, core_base.json) once per worker process."""
+    if log_file:
+        # A no-op when the worker was forked from a process that already set logging up
+        setup_logging(log_file)
+    import unified_parser
+    unified_parser.get_context().load()
+    _worker_state["parser"] = unified_parser
+    _worker_state["output_dir"] = output_dir
+    # Shared by every worker, so each concept is described once per run
+    _worker_state["registry"] = SQLiteConceptRegistry(registry_path) if registry_path else None
+    _worker_state["profile"] = profile
+    _worker_state["compression"] = compression
+
+def validate_ttl_file(ttl_file: str) -> int:
+    """Validate a TTL file on disk and return its error count."""
+    with open_text(ttl_file) as f:
+        issues = validate_turtle_text(f.read())
+    for issue in issues:
+        logger.error(f"{ttl_file}:{issue.line}:{issue.column}: {issue.message}")
+    return len(issues)
+
+def parse_file(json_file_path: str, output_dir: Optional[str] = None) -> FileResult:
+    """Parse one cohort JSON in this process, write its TTL and validate it."""
+    if "parser" not in _worker_state:
+        _init_worker(output_dir)
+    parser = _worker_state["parser"]
+    registry = _worker_state.get("registry")
+    output_dir = output_dir or _worker_state["output_dir"]
+    file_name = os.path.basename(json_file_path)
+    compression = _worker_state.get("compression")
+    output_ttl_file = os.path.join(output_dir, os.path.splitext(file_name)[0] + ".ttl" +
+                                   (COMPRESSIONS[compression] if compression else ""))
+    started = time.perf_counter()
+    result = FileResult(input_file=json_file_path, success=False)
+    profiler = StageProfiler() if _worker_state.get("profile") else NULL_PROFILER
+
+    try:
+        logger.info(f"Processing {json_file_path}...")
+        if registry is not None:
+            registry.begin(file_name)
+        # The parse stages nest in "format", which keeps only the formatting time
+        statements = profiler.wrap("format", (parser.format_triple(triple) for triple in
+                                              parser.iter_cohort_triples(json_file_path, registry=registry,
+                                                                         profiler=profiler)))
+        # Validate the text on its way to the file, a chunk at a time, rather than re-reading the file
+        validator = StatementValidator(parser.PREFIXES, profiler=profiler)
+        written = 0
+
+        def lines():
+            nonlocal written
+            for statement in statements:
+                validator.add(statement)
+                written += 1
+                yield statement + '\n'
+
+        with profiler.stage("write"), AtomicTextWriter(output_ttl_file, compression) as f:
+            f.write(parser.PREFIXES)
+            f.writelines(lines())
+            issues = validator.close()
+            if not written:
+                f.discard()
+        if written:
+            for issue in issues:
+                logger.error(f"{output_ttl_file}:{issue.line}:{issue.column}: {issue.message}")
+            result.output_file = output_ttl_file
+            result.triple_count = written
+            result.validation_errors = len(issues)
+            result.syntax_errors = [issue.to_dict() for issue in issues]
+        else:
+            logger.warning(f"No triples generated for {json_file_path}.")
+            # Don't leave the output of an earlier run behind
+            if os.path.exists(output_ttl_file):
+                os.remove(output_ttl_file)
+        if registry is not None:
+            result.dependents = registry.finish()
+        result.success = True
+        logger.info(f"Successfully parsed {file_name}")
+    except Exception as e:
+        if registry is not None:
+            # Nothing new of this cohort is written, so its concepts have to be described elsewhere
+            result.dependents = registry.forget(file_name)
+        # CohortParserError and its subclasses name what went wrong; keep the cause too
+        cause = f" ({e.__cause__})" if e.__cause__ else ""
+        result.error_type = type(e).__name__
+        result.error = f"{e}{cause}"
+        logger.error(f"Parsing {file_name} failed: {result.error_type}: {result.error}")
+    result.duration = time.perf_counter() - started
+    if profiler is not NULL_PROFILER:
+        result.stages = profiler.to_dict()
+    return result
+
+def parse_batch(json_files: List[str], output_dir: str, max_workers: Optional[int] = None,
+                chunksize: Optional[int] = None, registry_path: Optional[str] = None,
+                reuse_registry: bool = False, log_file: Optional[str] = None,
+                profile: bool = False, compression: Optional[str] = None) -> List[FileResult]:
+    """
+    Parse many cohort JSON files on a process pool, one FileResult per file in input order.
+
+    Each worker imports unified_parser once through the pool initializer, and
+    files are handed out in chunks to keep inter-process overhead low. With
+    registry_path, a fresh SQLiteConceptRegistry there is shared by all
+    workers, so each concept's descriptive triples appear in only one TTL
+    file of the batch; with reuse_registry the registry of an earlier batch
+    is kept, so they appear in only one TTL file of the output directory.
+    A result's dependents name the files to parse again for that to hold.
+    With profile, each result carries the timings of its parse stages.
+    With compression ("gzip" or "lzma"), the TTL files are written compressed.
+    """
+    if not json_files:
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(json_files) // (workers * 4))
+    if registry_path and not reuse_registry:
+        SQLiteConceptRegistry.create(registry_path).close()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(output_dir, registry_path, log_file, profile, compression)
+    ) as executor:
+        return list(executor.map(parse_file, json_files, chunksize=chunksize))
+
+# Parser sources whose changes invalidate every TTL file of an incremental run
+PARSER_SOURCES = ('unified_parser.py', 'parser_context.py', 'extraction_engine.py', 'algorithm_sections.py',
+                  'cohort_stream.py', 'concept_registry.py', 'rdf_terms.py', 'rdf_serializers.py',
+                  'ttl_io.py')
+
 class ParserRunner:
-    def __init__(self):
+    def __init__(self, full: bool = False, log_file: Optional[str] = None, profile: bool = False,
+                 compression: Optional[str] = None, combine_memory_mb: Optional[float] = None):
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
         self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(self.script_dir)))
         
-        self.unified_parser_script = os.path.join(self.script_dir, 'unified_parser.py')
         self.input_dir = os.path.join(self.project_root, 'example_input/cohortDefinitionOutputs')
         self.output_dir = os.path.join(self.script_dir, 'output/ttl/unified')
+        self.registry_path = os.path.join(self.output_dir, '.concept_registry.sqlite')
+        self.manifest_path = os.path.join(self.output_dir, '.ingest_manifest.json')
+        self.combined_ttl_path = os.path.join(self.project_root, 'output/combined_cohorts.ttl')
+        self.profile_path = os.path.join(self.output_dir, 'parse_profile.json')
+        # What the parser output depends on besides the input itself
+        self.version_files = [
+            os.path.join(self.script_dir, 'extraction_rules.yaml'),
+            os.path.join(self.project_root, 'ontologies/metadata/core_base.json'),
+        ] + [os.path.join(self.script_dir, name) for name in PARSER_SOURCES]
+        # Re-parse every input even when the manifest says it is unchanged
+        self.full = full
+        # Where the pool workers log, when they don't inherit the parent's logging
+        self.log_file = log_file
+        # Time the stages of every parse and report them per batch
+        self.profile = profile
+        self.batch_profile = BatchProfile()
+        # Write the per-cohort TTL files gzip or lzma compressed
+        self.compression = compression
+        # Memory budget of combine_ttl_files' external sort; None sorts in memory
+        self.combine_memory_mb = combine_memory_mb
         os.makedirs(self.output_dir, exist_ok=True)
         
+        self.results: List[FileResult] = []
         self.stats = {
             'total_files': 0,
             'successful': 0,
+            'unchanged': 0,
+            'deleted': 0,
             'failed': 0,
             'validation_errors': 0
         }
 
     def validate_ttl_file(self, ttl_file: str) -> int:
-        """Validate a TTL file using rapper and return error count."""
-        try:
-            result = subprocess.run(
-                ['rapper', '-i', 'turtle', ttl_file, '-c'],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.stdout:
-                logger.info(f"Rapper validation output for {ttl_file}:\n{result.stdout}")
-            if result.stderr:
-                logger.error(f"Rapper validation errors for {ttl_file}:\n{result.stderr}")
-            
-            if result.returncode == 0:
-                logger.info(f"TTL file {ttl_file} validated successfully")
-                return 0
-            else:
-                logger.error(f"TTL file {ttl_file} failed validation")
-                # A simple way to count errors: count lines in stderr
-                return len(result.stderr.splitlines())
-                
-        except Exception as e:
-            logger.error(f"Error running rapper validation on {ttl_file}: {str(e)}")
-            return 1 # Count as one error for the file
+        """Validate a TTL file and return its error count."""
+        return validate_ttl_file(ttl_file)
 
     def run_parser_for_file(self, json_file_path: str) -> Tuple[bool, int]:
         """Run the unified parser for a single JSON file and validate its output."""
-        file_name = os.path.basename(json_file_path)
-        output_ttl_file = os.path.join(self.output_dir, os.path.splitext(file_name)[0] + ".ttl")
-        validation_errors = 0
+        result = parse_file(json_file_path, self.output_dir)
+        return result.success, result.validation_errors if result.success else 1
 
-        try:
-            logger.info(f"Processing {json_file_path}...")
-            result = subprocess.run(
-                ['python3', self.unified_parser_script, json_file_path, self.output_dir],
-                capture_output=True,
-                text=True,
-                cwd=self.project_root
-            )
-            
-            if result.stdout:
-                logger.info(f"Parser output for {file_name}:\n{result.stdout}")
-            if result.stderr:
-                logger.error(f"Parser errors for {file_name}:\n{result.stderr}")
-            
-            if result.returncode == 0:
-                logger.info(f"Successfully parsed {file_name}")
-                # Validate the generated TTL file
-                validation_errors = self.validate_ttl_file(output_ttl_file)
-                return True, validation_errors
+    def _remove_output(self, output_file: Optional[str]) -> None:
+        if output_file and os.path.exists(output_file):
+            os.remove(output_file)
+
+    def parse_inputs(self, json_files: List[str]) -> bool:
+        """
+        Parse the inputs that are new or changed since the last run and drop the outputs of deleted ones.
+
+        Updates the manifest, self.results and self.stats; returns whether
+        any TTL file changed, i.e. whether the combined output is stale.
+        """
+        manifest = IngestManifest.load(self.manifest_path)
+        version = parser_version(self.version_files)
+        # Switching compression renames every output, so it starts over like a new parser version
+        version['compression'] = self.compression or 'none'
+        plan = manifest.plan(json_files, version, full=self.full)
+        paths = {os.path.basename(path): path for path in json_files}
+
+        if plan.rebuild:
+            logger.info("Parser version changed or full run requested; parsing every input.")
+            # Start from an empty output directory and registry, so nothing of the old version survives
+            for ttl_file in find_ttl_files(self.output_dir):
+                os.remove(ttl_file)
+            SQLiteConceptRegistry.create(self.registry_path).close()
+            manifest = IngestManifest(version=version)
+        logger.info(f"{len(plan.changed)} new or changed, {len(plan.unchanged)} unchanged, "
+                    f"{len(plan.deleted)} deleted input files.")
+
+        pending = set(plan.changed)
+        if plan.deleted and not plan.rebuild:
+            registry = SQLiteConceptRegistry(self.registry_path)
+            try:
+                for name in plan.deleted:
+                    self._remove_output(manifest.entries.pop(name).output_file)
+                    pending.update(paths[dependent] for dependent in registry.forget(name) if dependent in paths)
+            finally:
+                registry.close()
+        self.stats['deleted'] = len(plan.deleted)
+
+        results: Dict[str, FileResult] = {}
+        while pending:
+            batch = sorted(pending)
+            pending = set()
+            for result in parse_batch(batch, self.output_dir, registry_path=self.registry_path, reuse_registry=True,
+                                      log_file=self.log_file, profile=self.profile,
+                                      compression=self.compression):
+                name = os.path.basename(result.input_file)
+                results[name] = result
+                if result.success:
+                    manifest.record(result.input_file, result.output_file, result.triple_count,
+                                    result.validation_errors)
+                else:
+                    # Retried on the next run; its old output would be stale
+                    entry = manifest.entries.pop(name, None)
+                    self._remove_output(entry.output_file if entry else None)
+                # Cohorts that now have to describe concepts this one no longer does
+                pending.update(paths[dependent] for dependent in result.dependents if dependent in paths)
+        manifest.save(self.manifest_path)
+
+        self.results = [results[name] for name in sorted(results)]
+        if self.profile:
+            self.batch_profile = BatchProfile()
+            for result in self.results:
+                self.batch_profile.add(os.path.basename(result.input_file), result.stages)
+            self.write_profile()
+        for result in self.results:
+            if result.success:
+                self.stats['successful'] += 1
+                self.stats['validation_errors'] += result.validation_errors
             else:
-                logger.error(f"Parsing {file_name} failed with return code {result.returncode}")
-                return False, 1 # Count as one parsing error
-                
-        except Exception as e:
-            logger.error(f"Error processing {json_file_path}: {str(e)}")
-            return False, 1
+                self.stats['failed'] += 1
+                self.stats['validation_errors'] += 1 # Count as one parsing error
+        for path in plan.unchanged:
+            name = os.path.basename(path)
+            if name not in results:
+                self.stats['unchanged'] += 1
+                self.stats['validation_errors'] += manifest.entries[name].validation_errors
+        return bool(results or plan.deleted or plan.rebuild)
 
     def run_all_parsers(self) -> None:
         """Run all parsers in parallel and report performance."""
         logger.info("Starting parser execution sequence...")
 
-        json_files = glob.glob(os.path.join(self.input_dir, '*.json'))
+        json_files = sorted(glob.glob(os.path.join(self.input_dir, '*.json')))
         self.stats['total_files'] = len(json_files)
 
         if not json_files:
             logger.warning("No JSON files found to process.")
             return
 
-        with concurrent.futures.ProcessPoolExecutor() as executor:
-            future_to_file = {executor.submit(self.run_parser_for_file, file_path): file_path for file_path in json_files}
-            for future in concurrent.futures.as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    success, validation_errors = future.result()
-                    if success:
-                        self.stats['successful'] += 1
-                    else:
-                        self.stats['failed'] += 1
-                    self.stats['validation_errors'] += validation_errors
-                except Exception as exc:
-                    logger.error(f'{file_path} generated an exception: {exc}')
-                    self.stats['failed'] += 1
+        try:
+            outputs_changed = self.parse_inputs(json_files)
+        except Exception as exc:
+            # The pool itself broke (e.g. a worker died); per-file errors come back as results.
+            # The registry may be ahead of the outputs now, so the next run starts over.
+            logger.error(f'Batch parsing failed: {exc}')
+            self._remove_output(self.manifest_path)
+            self.results = []
+            self.stats['failed'] += len(json_files)
+            outputs_changed = True
+
+        combined_ttl_path = self.combined_ttl_path
+        if not outputs_changed and os.path.exists(combined_ttl_path):
+            logger.info("No TTL file changed; keeping the combined output.")
+            self.report()
+            return
 
         logger.info("\nCombining all generated TTL files...")
-        combined_ttl_path = os.path.join(self.project_root, 'output/combined_cohorts.ttl')
         combine_script_path = os.path.join(self.script_dir, 'combine_ttl_files.py')
         
         # Ensure the output directory for combined TTL exists
         os.makedirs(os.path.dirname(combined_ttl_path), exist_ok=True)
 
+        combine_command = ['python3', combine_script_path, self.output_dir, combined_ttl_path]
+        if self.combine_memory_mb is not None:
+            combine_command += ['--memory-budget-mb', str(self.combine_memory_mb)]
         result = subprocess.run(
-            ['python3', combine_script_path, self.output_dir, combined_ttl_path],
+            combine_command,
             capture_output=True,
             text=True,
             cwd=self.project_root
@@ -151,18 +362,48 @@ class ParserRunner:
                 self.stats['validation_errors'] += len(validation_result.stderr.splitlines())
         else:
             logger.error(f"Failed to combine TTL files:\n{result.stderr}")
+            # Make the next run combine again even if no input changes
+            self._remove_output(combined_ttl_path)
             self.stats['failed'] += self.stats['total_files'] # If combining fails, all files effectively failed
+        self.report()
+
+    def write_profile(self) -> None:
+        """Write the batch profile as JSON next to the TTL output."""
+        with open(self.profile_path, 'w', encoding='utf-8') as f:
+            json.dump(self.batch_profile.to_dict(), f, indent=2)
+        logger.info(f"Stage profile written to {self.profile_path}")
 
+    def report(self) -> None:
         logger.info("\n--- Performance Report ---")
-        success_rate = (self.stats['successful'] / self.stats['total_files']) * 100 if self.stats['total_files'] > 0 else 0
+        succeeded = self.stats['successful'] + self.stats['unchanged']
+        success_rate = (succeeded / self.stats['total_files']) * 100 if self.stats['total_files'] > 0 else 0
         logger.info(f"Overall Success Rate: {success_rate:.2f}%")
         logger.info(f"Total Files Processed: {self.stats['total_files']}")
         logger.info(f"Successfully Parsed: {self.stats['successful']}")
+        logger.info(f"Unchanged Since Last Run: {self.stats['unchanged']}")
+        logger.info(f"Deleted Since Last Run: {self.stats['deleted']}")
         logger.info(f"Failed to Parse: {self.stats['failed']}")
         logger.info(f"Total Validation Errors: {self.stats['validation_errors']}")
+        for result in self.results:
+            if not result.success:
+                logger.info(f"  {os.path.basename(result.input_file)}: {result.error_type}: {result.error}")
+        for line in self.batch_profile.report_lines():
+            logger.info(line)
 
 def main():
-    runner = ParserRunner()
+    parser = argparse.ArgumentParser(description='Parse all cohort JSON files, combine and validate the TTL output.')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-parse every input, not only those new or changed since the last run')
+    parser.add_argument('--compress', choices=list(COMPRESSIONS),
+                        help='Write the per-cohort TTL files compressed; combining reads them either way')
+    parser.add_argument('--combine-memory-mb', type=float,
+                        help='Combine with a bounded-memory external sort using about this many MB')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each parse stage and report p50/p95/max per stage (also written as JSON)')
+    args = parser.parse_args()
+    setup_logging(LOG_FILE)
+    runner = ParserRunner(full=args.full, log_file=LOG_FILE, profile=args.profile, compression=args.compress,
+                          combine_memory_mb=args.combine_memory_mb)
     runner.run_all_parsers()
 
 if __name__ == "__main__":
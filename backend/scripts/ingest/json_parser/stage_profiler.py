@@ -0,0 +1,200 @@
+"""
+Opt-in per-stage timing for cohort parsing.
+
+A ``StageProfiler`` collects, per named stage, the wall time spent in it and
+the number of triples it emitted:
+
+* ``stage(name)`` is a context manager for plain code (reading, validation);
+* ``wrap(name, iterable)`` times each step of a triple generator and counts
+  what it yields, so only the producer's time is counted, not that of
+  whoever consumes the triples;
+* ``timed(name)`` is the decorator form of ``stage``.
+
+Stages may nest (the title stage pulls from the clinical description
+stage); each stage is charged its own time only, so the stage times of a
+cohort add up to the profiled total.
+
+Parsing code takes ``NULL_PROFILER`` when profiling is off, whose methods
+do nothing and add no per-triple cost.
+
+``BatchProfile`` aggregates the profiles of many cohorts: p50/p95/max of
+the time and triple count of every stage, and the cohorts whose total is an
+outlier.
+"""
+
+import math
+import statistics
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# A cohort is an outlier when its profiled total exceeds this many times the median
+OUTLIER_FACTOR = 3.0
+MAX_OUTLIERS = 10
+
+
+class StageProfiler:
+    """Self time, triple count and call count of each stage of one cohort; clock returns seconds."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.seconds: Dict[str, float] = {}
+        self.triples: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self._stack: List[str] = []
+
+    def _charge(self, name: str, elapsed: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+        # The enclosing stage keeps only its own time
+        if self._stack:
+            parent = self._stack[-1]
+            self.seconds[parent] = self.seconds.get(parent, 0.0) - elapsed
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self._stack.append(name)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            self._stack.pop()
+            self._charge(name, elapsed)
+
+    def wrap(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from iterable, charging the time of each step and each item to name."""
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.triples.setdefault(name, 0)
+        iterator = iter(iterable)
+        clock, stack = self.clock, self._stack
+        while True:
+            stack.append(name)
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                self._charge(name, elapsed)
+            self.triples[name] += 1
+            yield item
+
+    def timed(self, name: str) -> Callable:
+        """Decorator: run the function as stage name."""
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """stage -> {"seconds", "triples", "calls"}, in the order stages first ran."""
+        return {
+            name: {
+                "seconds": max(self.seconds.get(name, 0.0), 0.0),
+                "triples": self.triples.get(name, 0),
+                "calls": self.calls[name],
+            }
+            for name in self.calls
+        }
+
+
+class NullProfiler:
+    """StageProfiler's interface, doing nothing."""
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def wrap(self, name: str, iterable: Iterable) -> Iterable:
+        return iterable
+
+    def timed(self, name: str) -> Callable:
+        return lambda function: function
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (fraction in (0, 1])."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": max(values)}
+
+
+class BatchProfile:
+    """Stage profiles of many cohorts, keyed by cohort name."""
+
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        # cohort -> StageProfiler.to_dict()
+        self.profiles: Dict[str, Dict[str, Dict[str, Any]]] = dict(profiles or {})
+
+    def add(self, cohort: str, stages: Dict[str, Dict[str, Any]]) -> None:
+        if stages:
+            self.profiles[cohort] = stages
+
+    def stage_names(self) -> List[str]:
+        names: Dict[str, None] = {}
+        for stages in self.profiles.values():
+            names.update(dict.fromkeys(stages))
+        return list(names)
+
+    def totals(self) -> Dict[str, float]:
+        return {cohort: sum(s["seconds"] for s in stages.values()) for cohort, stages in self.profiles.items()}
+
+    def outliers(self) -> List[Tuple[str, float]]:
+        """(cohort, total seconds) of the cohorts over OUTLIER_FACTOR times the median total, slowest first."""
+        totals = self.totals()
+        if len(totals) < 2:
+            return []
+        threshold = OUTLIER_FACTOR * statistics.median(totals.values())
+        slow = sorted(((c, t) for c, t in totals.items() if t > threshold), key=lambda item: item[1], reverse=True)
+        return slow[:MAX_OUTLIERS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages = {}
+        for name in self.stage_names():
+            # A cohort that skipped a stage counts as zero for it
+            entries = [s.get(name, {"seconds": 0.0, "triples": 0}) for s in self.profiles.values()]
+            stages[name] = {
+                "seconds": _summary([e["seconds"] for e in entries]),
+                "triples": _summary([e["triples"] for e in entries]),
+                "total_seconds": sum(e["seconds"] for e in entries),
+                "total_triples": sum(e["triples"] for e in entries),
+            }
+        totals = self.totals()
+        return {
+            "cohorts": len(self.profiles),
+            "total_seconds": _summary(list(totals.values())) if totals else {},
+            "stages": stages,
+            "outliers": [{"cohort": cohort, "seconds": seconds, "stages": self.profiles[cohort]}
+                         for cohort, seconds in self.outliers()],
+        }
+
+    def report_lines(self) -> List[str]:
+        """The aggregate as aligned text lines, for a log report."""
+        data = self.to_dict()
+        if not data["cohorts"]:
+            return []
+        lines = [f"Stage timings over {data['cohorts']} cohorts (ms: p50 / p95 / max; triples total):"]
+        width = max(len(name) for name in data["stages"])
+        for name, stage in data["stages"].items():
+            s = stage["seconds"]
+            lines.append(f"  {name:<{width}}  {s['p50'] * 1000:9.2f} {s['p95'] * 1000:9.2f} {s['max'] * 1000:9.2f}"
+                         f"  {stage['total_triples']:>9}")
+        for outlier in data["outliers"]:
+            slowest = max(outlier["stages"].items(), key=lambda item: item[1]["seconds"])[0]
+            lines.append(f"  Outlier: {outlier['cohort']} {outlier['seconds'] * 1000:.2f} ms (mostly {slowest})")
+        return lines
@@ -0,0 +1,142 @@
+"""
+Reading and writing (optionally compressed) TTL and N-Triples text files.
+
+``AtomicTextWriter`` writes through a large buffer into a temporary file
+next to the target, and moves it over the target only once the writer is
+closed without an error; a parse that fails or a process that dies part-way
+leaves the old file (or none) rather than a truncated one for
+combine_ttl_files to pick up. It can compress with the stdlib codecs:
+
+* ``gzip``: ``.gz``, with a fixed header timestamp so equal text gives equal bytes;
+* ``lzma``: ``.xz``, smaller and slower.
+
+``open_text`` opens a file for reading whatever its compression, which it
+tells from the first bytes rather than the name, and ``compression_for``
+picks the compression a file name asks for.
+"""
+
+import gzip
+import io
+import lzma
+import os
+from itertools import islice
+from typing import IO, Iterable, Optional
+
+# Compression -> file suffix
+COMPRESSIONS = {"gzip": ".gz", "lzma": ".xz"}
+# Magic bytes -> compression
+_MAGIC = {b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "lzma"}
+WRITE_BUFFER_SIZE = 1 << 20
+# Lines joined into one string per write by AtomicTextWriter.writelines
+WRITE_BATCH_SIZE = 4096
+GZIP_LEVEL = 6
+
+
+def compression_for(path: str) -> Optional[str]:
+    """The compression path's suffix names (None for plain text)."""
+    for compression, suffix in COMPRESSIONS.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+def strip_compression_suffix(path: str) -> str:
+    compression = compression_for(path)
+    return path[:-len(COMPRESSIONS[compression])] if compression else path
+
+
+def sniff_compression(path: str) -> Optional[str]:
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, compression in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_text(path: str, encoding: str = "utf-8") -> IO[str]:
+    """path opened for reading as text, decompressed if it is gzip or xz."""
+    compression = sniff_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding=encoding)
+    if compression == "lzma":
+        return lzma.open(path, "rt", encoding=encoding)
+    return open(path, "r", encoding=encoding)
+
+
+class AtomicTextWriter:
+    """
+    A text file written to a temporary sibling and renamed over path on a clean close.
+
+    Use as a context manager; an exception inside the block discards the
+    temporary file and leaves path untouched. compression is None, "gzip"
+    or "lzma"; by default it follows path's suffix.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = "auto", encoding: str = "utf-8",
+                 buffer_size: int = WRITE_BUFFER_SIZE):
+        if compression == "auto":
+            compression = compression_for(path)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {', '.join(COMPRESSIONS)}")
+        self.path = path
+        self.compression = compression
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._raw = open(self.tmp_path, "wb", buffering=buffer_size)
+        try:
+            if compression == "gzip":
+                # No file name or timestamp in the header, so equal text gives equal bytes
+                self._codec = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0,
+                                            compresslevel=GZIP_LEVEL)
+            elif compression == "lzma":
+                self._codec = lzma.LZMAFile(self._raw, "wb")
+            else:
+                self._codec = None
+            # Text is encoded in chunks into the codec, or straight into the large raw buffer
+            self._text = io.TextIOWrapper(self._codec or self._raw, encoding=encoding, newline="\n")
+        except Exception:
+            self._raw.close()
+            os.remove(self.tmp_path)
+            raise
+
+    def write(self, text: str) -> int:
+        return self._text.write(text)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        """Write lines (each with its own line ending), joined in batches: one write call per batch."""
+        lines = iter(lines)
+        while True:
+            batch = list(islice(lines, WRITE_BATCH_SIZE))
+            if not batch:
+                return
+            self._text.write("".join(batch))
+
+    def close(self) -> None:
+        """Flush everything and move the file into place."""
+        if self._raw.closed:
+            return
+        self._text.close()
+        if self._codec is not None:
+            self._raw.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self) -> None:
+        """Drop what was written; path keeps its old content."""
+        if self._raw.closed:
+            return
+        try:
+            self._text.close()
+            if self._codec is not None:
+                self._raw.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+    def __enter__(self) -> "AtomicTextWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
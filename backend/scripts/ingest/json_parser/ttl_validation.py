@@ -0,0 +1,133 @@
+"""
+In-process Turtle syntax validation for parser output.
+
+Validates the text the parser is about to write, with rdflib, and reports
+each problem with its line and column. rdflib stops at the first error, so
+a failing document is split in halves (each half with the prefix block)
+until every bad statement is found, not just the first.
+
+``StatementValidator`` does the same for statements as they stream past on
+their way to the file, a fixed-size chunk at a time, so a cohort never has
+to be held in memory whole to be validated.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from rdflib import Graph
+
+from stage_profiler import NULL_PROFILER
+
+# Statements parsed together by StatementValidator
+VALIDATION_CHUNK_SIZE = 4096
+
+
+@dataclass
+class SyntaxIssue:
+    """One Turtle syntax error; line and column are 1-based, None if unknown."""
+    line: Optional[int]
+    column: Optional[int]
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _issue_from_exception(exc: Exception) -> SyntaxIssue:
+    # notation3.BadSyntax carries the 0-based line and the byte offset into the source
+    lines = getattr(exc, "lines", None)
+    offset = getattr(exc, "_i", None)
+    source = getattr(exc, "_str", None)
+    why = getattr(exc, "_why", None)
+    if lines is None or offset is None or source is None:
+        message = str(exc).strip()
+        return SyntaxIssue(None, None, message.splitlines()[0] if message else type(exc).__name__)
+    line_start = source.rfind(b"\n", 0, offset) + 1
+    column = len(source[line_start:offset].decode("utf-8", errors="replace")) + 1
+    return SyntaxIssue(lines + 1, column, why or str(exc).strip())
+
+
+def validate_turtle_text(text: str) -> List[SyntaxIssue]:
+    """The first syntax error in a Turtle document, or [] if it parses."""
+    try:
+        Graph().parse(data=text, format="turtle")
+    except Exception as e:
+        return [_issue_from_exception(e)]
+    return []
+
+
+def validate_statements(prefixes: str, statements: List[str], first_line: Optional[int] = None) -> List[SyntaxIssue]:
+    """
+    Every syntax error in prefixes followed by statements, one per line.
+
+    Line numbers refer to the document prefixes + "\n".join(statements) + "\n",
+    i.e. what the parser writes; with first_line, to a document in which the
+    statements start after that many lines instead (a later chunk of it).
+    Failing documents are bisected, so finding k bad statements out of n
+    costs O(k log n) parses rather than n.
+    """
+    prefix_lines = prefixes.count("\n")
+    # Line on which each statement starts
+    starts, line = [], prefix_lines if first_line is None else first_line
+    for statement in statements:
+        starts.append(line)
+        line += statement.count("\n") + 1
+
+    def check(lo: int, hi: int) -> List[SyntaxIssue]:
+        issues = validate_turtle_text(prefixes + "".join(s + "\n" for s in statements[lo:hi]))
+        if not issues:
+            return []
+        if hi - lo == 1:
+            # Shift from the one-statement document to the statement's place in the full one
+            issue = issues[0]
+            if issue.line is not None:
+                issue.line += starts[lo] - prefix_lines
+            return [issue]
+        mid = (lo + hi) // 2
+        return check(lo, mid) + check(mid, hi)
+
+    prefix_issues = validate_turtle_text(prefixes)
+    if prefix_issues:
+        return prefix_issues
+    return check(0, len(statements)) if statements else []
+
+
+class StatementValidator:
+    """
+    Validates statements added one at a time, chunk_size at a time.
+
+    Collects the issues of the prefix block, then of each chunk, with line
+    numbers in the document prefixes followed by every statement added;
+    call close once the last one is in. Chunks are validated as the
+    profiler's "ttl_validation" stage.
+    """
+
+    def __init__(self, prefixes: str, chunk_size: int = VALIDATION_CHUNK_SIZE, profiler=NULL_PROFILER):
+        self.prefixes = prefixes
+        self.chunk_size = chunk_size
+        self.profiler = profiler
+        self.issues = validate_turtle_text(prefixes)
+        # Statements are only worth checking against a prefix block that parses
+        self._skip = bool(self.issues)
+        self._line = prefixes.count("\n")
+        self._chunk: List[str] = []
+
+    def add(self, statement: str) -> None:
+        if self._skip:
+            return
+        self._chunk.append(statement)
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Validate the statements added since the last flush."""
+        if not self._chunk:
+            return
+        with self.profiler.stage("ttl_validation"):
+            self.issues.extend(validate_statements(self.prefixes, self._chunk, first_line=self._line))
+        self._line += sum(statement.count("\n") + 1 for statement in self._chunk)
+        self._chunk = []
+
+    def close(self) -> List[SyntaxIssue]:
+        self.flush()
+        return self.issues
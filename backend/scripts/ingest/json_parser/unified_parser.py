@@ -9,17 +9,18 @@ from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 import unicodedata
-import yaml
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('cohort_parser.log'),
-        logging.StreamHandler()
-    ]
-)
+
+from algorithm_sections import SectionExtractors, SectionMap
+from cohort_stream import ijson, iter_concept_set_entries, read_cohort_skeleton
+from concept_registry import ConceptRegistry
+# ClassIndex is re-exported for existing callers
+from parser_context import ClassIndex, ParserContext, setup_logging
+from rdf_serializers import RDFLibSink, TurtleSerializer, make_serializer
+from rdf_terms import iri, literal, name, parse_prefixes, triple
+from stage_profiler import NULL_PROFILER, StageProfiler
+from ttl_io import COMPRESSIONS, AtomicTextWriter
+
+# Logging is configured by main (or the embedding application), not on import
 logger = logging.getLogger(__name__)
 
 class CohortParserError(Exception):
@@ -336,44 +337,45 @@ def log_perspective_issues(context: PerspectiveContext):
     else:
         logger.info(f"Perspective validation passed for {context.field_name} in cohort {context.cohort_id}")
 
-# Load core_base.json for ontology-aware validation
-try:
-    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'ontologies/metadata/core_base.json'), 'r') as f:
-        CORE_ONTOLOGY = json.load(f)
-except FileNotFoundError:
-    logger.error("core_base.json not found. Ontology-aware validation will be skipped.")
-    CORE_ONTOLOGY = {"classes": [], "semantic_domains": []}
-except json.JSONDecodeError:
-    logger.error("Error decoding core_base.json. Ontology-aware validation will be skipped.")
-    CORE_ONTOLOGY = {"classes": [], "semantic_domains": []}
+# Rules and core ontology, loaded on first use rather than on import
+_context: Optional[ParserContext] = None
+
+def get_context() -> ParserContext:
+    """The ParserContext the parse functions use; a default one is created on first call."""
+    global _context
+    if _context is None:
+        _context = ParserContext()
+    return _context
+
+def set_context(context: Optional[ParserContext]) -> None:
+    """Make the parse functions use context (None: a default one on next use)."""
+    global _context
+    _context = context
+
+# The module-level names the loaded state used to have, resolved lazily
+_CONTEXT_ATTRIBUTES = {
+    "CORE_ONTOLOGY": "core_ontology",
+    "CLASS_INDEX": "class_index",
+    "EXTRACTION_RULES": "rules",
+    "EXTRACTION_ENGINE": "engine",
+}
+
+def __getattr__(attr: str) -> Any:
+    if attr in _CONTEXT_ATTRIBUTES:
+        return getattr(get_context(), _CONTEXT_ATTRIBUTES[attr])
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
 
 def _get_class_info(class_id: str) -> Optional[Dict[str, Any]]:
     """Retrieves class information from the loaded ontology."""
-    for cls in CORE_ONTOLOGY.get("classes", []):
-        if cls["id"] == class_id:
-            return cls
-    return None
+    return get_context().class_index.get(class_id)
 
 def _is_valid_class(class_id: str) -> bool:
     """Checks if a given class_id exists in the ontology."""
-    return _get_class_info(class_id) is not None
+    return class_id in get_context().class_index
 
 def _is_subclass_of(sub_class_id: str, super_class_id: str) -> bool:
     """Checks if sub_class_id is a subclass of super_class_id."""
-    if sub_class_id == super_class_id:
-        return True
-    
-    current_class = _get_class_info(sub_class_id)
-    if not current_class:
-        return False
-    
-    for parent_id in current_class.get("subClassOf", []):
-        if parent_id == super_class_id:
-            return True
-        # Recursively check superclasses
-        if _is_subclass_of(parent_id, super_class_id):
-            return True
-    return False
+    return get_context().class_index.is_subclass_of(sub_class_id, super_class_id)
 
 # Namespace prefixes
 PREFIXES = """@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
@@ -416,48 +418,43 @@ PREFIXES = """@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
 def is_nonempty_literal(val):
     return val is not None and str(val).strip() != ''
 
+LOCAL_NAME_UNSAFE = re.compile(r'[^A-Za-z0-9_\-]')
+
 def sanitize_local_name(name):
     """Replace illegal Turtle local name characters with underscores."""
     if not isinstance(name, str):
         return name
     # Replace /, \, space, :, and other non-alphanum (except - and _) with _
-    return re.sub(r'[^A-Za-z0-9_\-]', '_', name)
-
+    return LOCAL_NAME_UNSAFE.sub('_', name)
 
-# Load extraction rules
-with open(os.path.join(os.path.dirname(__file__), 'extraction_rules.yaml'), 'r') as f:
-    EXTRACTION_RULES = yaml.safe_load(f)
 
 def get_vocabulary_prefix(vocabulary_id):
-    return EXTRACTION_RULES['vocabularies'].get(vocabulary_id, ':')
+    return get_context().rules['vocabularies'].get(vocabulary_id, ':')
+
+# Predicates whose extracted values must name a core ontology class
+CLASS_VALUED_PREDICATES = {
+    "disease:hasInflammationCharacteristic": "inflammation characteristic",
+    "disease:affectsAnatomicalSite": "anatomical site",
+    "disease:hasPhenotype": "phenotype",
+    "disease:hasRiskFactor": "risk factor",
+}
 
 def parse_clinical_description(description, disease_uri):
-    triples = []
-    for rule in EXTRACTION_RULES['extraction_patterns']:
-        for pattern in rule['patterns']:
-            for match in re.finditer(pattern, description, re.IGNORECASE):
-                if 'value' in match.groupdict():
-                    value = match.group('value').strip()
-                    # Ontology-aware validation for extracted values
-                    if rule['predicate'] == "disease:hasInflammationCharacteristic" and not _is_valid_class(f"disease:{value.replace(' ', '')}"):
-                        logger.warning(f"Invalid class for inflammation characteristic: disease:{value.replace(' ', '')}")
-                        continue
-                    if rule['predicate'] == "disease:affectsAnatomicalSite" and not _is_valid_class(f"disease:{value.replace(' ', '')}"):
-                        logger.warning(f"Invalid class for anatomical site: disease:{value.replace(' ', '')}")
-                        continue
-                    if rule['predicate'] == "disease:hasPhenotype" and not _is_valid_class(f"disease:{value.replace(' ', '')}"):
-                        logger.warning(f"Invalid class for phenotype: disease:{value.replace(' ', '')}")
-                        continue
-                    if rule['predicate'] == "disease:hasRiskFactor" and not _is_valid_class(f"disease:{value.replace(' ', '')}"):
-                        logger.warning(f"Invalid class for risk factor: disease:{value.replace(' ', '')}")
-                        continue
+    # Every extraction pattern compiled into one regex, so descriptions are scanned once
+    for match in get_context().engine.extract(description):
+        predicate = match.pattern.predicate
+        value = match.value
+        if match.pattern.value_group is not None:
+            # Ontology-aware validation for extracted values
+            class_id = f"disease:{value.replace(' ', '')}"
+            if predicate in CLASS_VALUED_PREDICATES and not _is_valid_class(class_id):
+                logger.warning(f"Invalid class for {CLASS_VALUED_PREDICATES[predicate]}: {class_id}")
+                continue
 
-                    triples.append(f"{disease_uri} {rule['predicate']} disease:{sanitize_local_name(value)} .")
-                else:
-                    # Handle patterns that don't have a named group
-                    value = match.group(1).strip()
-                    triples.append(f"{disease_uri} {rule['predicate']} \"{sanitize_local_name(value)}\"^^xsd:string .")
-    return triples
+            yield triple(disease_uri, predicate, f"disease:{sanitize_local_name(value)}")
+        else:
+            # Handle patterns that don't have a named group
+            yield triple(disease_uri, predicate, literal(sanitize_local_name(value), "xsd:string"))
 
 
 def parse_title(title):
@@ -486,16 +483,14 @@ def parse_evaluation_summary(summary, cohort_uri):
     """
     Parse evaluation summary into RDF triples capturing cohort development and validation details.
     """
-    triples = []
-    
     # Add the full summary as a property
-    triples.append(f"{cohort_uri} :hasEvaluationSummary \"{summary}\" .")
+    yield triple(cohort_uri, ":hasEvaluationSummary", literal(summary))
     
     # Create a validation activity
     validation_activity = f":ValidationActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{validation_activity} rdf:type prov:Activity .")
-    triples.append(f"{validation_activity} rdfs:label \"Cohort Validation Activity\" .")
-    triples.append(f"{cohort_uri} prov:wasGeneratedBy {validation_activity} .")
+    yield triple(validation_activity, "rdf:type", "prov:Activity")
+    yield triple(validation_activity, "rdfs:label", literal("Cohort Validation Activity"))
+    yield triple(cohort_uri, "prov:wasGeneratedBy", validation_activity)
     
     # Extract development details
     if "developed" in summary:
@@ -503,320 +498,546 @@ def parse_evaluation_summary(summary, cohort_uri):
         cohort_type_match = re.search(r'(\w+) cohort', summary)
         if cohort_type_match:
             cohort_type = cohort_type_match.group(1)
-            triples.append(f"{cohort_uri} :hasCohortType \"{cohort_type}\" .")
+            yield triple(cohort_uri, ":hasCohortType", literal(cohort_type))
             
             # Create development activity
             dev_activity = f":DevelopmentActivity_{cohort_uri.split(':')[1]}"
-            triples.append(f"{dev_activity} rdf:type prov:Activity .")
-            triples.append(f"{dev_activity} rdfs:label \"Cohort Development Activity\" .")
-            triples.append(f"{cohort_uri} prov:wasGeneratedBy {dev_activity} .")
+            yield triple(dev_activity, "rdf:type", "prov:Activity")
+            yield triple(dev_activity, "rdfs:label", literal("Cohort Development Activity"))
+            yield triple(cohort_uri, "prov:wasGeneratedBy", dev_activity)
     
     # Extract concept set details
     concept_set_match = re.search(r'concept set of (\d+) concepts', summary)
     if concept_set_match:
         num_concepts = concept_set_match.group(1)
-        triples.append(f"{cohort_uri} :hasConceptSetSize \"{num_concepts}\"^^xsd:integer .")
+        yield triple(cohort_uri, ":hasConceptSetSize", literal(num_concepts, "xsd:integer"))
     
     # Extract database coverage
     db_match = re.search(r'from all (\d+) databases', summary)
     if db_match:
         num_dbs = db_match.group(1)
-        triples.append(f"{cohort_uri} :hasDatabaseCoverage \"{num_dbs}\"^^xsd:integer .")
+        yield triple(cohort_uri, ":hasDatabaseCoverage", literal(num_dbs, "xsd:integer"))
         
         # Create database activity
         db_activity = f":DatabaseActivity_{cohort_uri.split(':')[1]}"
-        triples.append(f"{db_activity} rdf:type prov:Activity .")
-        triples.append(f"{db_activity} rdfs:label \"Database Coverage Activity\" .")
-        triples.append(f"{cohort_uri} prov:wasGeneratedBy {db_activity} .")
+        yield triple(db_activity, "rdf:type", "prov:Activity")
+        yield triple(db_activity, "rdfs:label", literal("Database Coverage Activity"))
+        yield triple(cohort_uri, "prov:wasGeneratedBy", db_activity)
     
     # Extract time period for validation
     time_period_match = re.search(r'(\d+)-(\d+) day', summary)
     if time_period_match:
         start_days = time_period_match.group(1)
         end_days = time_period_match.group(2)
-        triples.append(f"{cohort_uri} :hasValidationTimePeriodStart \"{start_days}\"^^xsd:integer .")
-        triples.append(f"{cohort_uri} :hasValidationTimePeriodEnd \"{end_days}\"^^xsd:integer .")
+        yield triple(cohort_uri, ":hasValidationTimePeriodStart", literal(start_days, "xsd:integer"))
+        yield triple(cohort_uri, ":hasValidationTimePeriodEnd", literal(end_days, "xsd:integer"))
     
     # Extract performance metrics
     if "specificity" in summary.lower() and "sensitivity" in summary.lower():
-        triples.append(f"{cohort_uri} :hasPerformanceMetrics :SpecificityAndSensitivity .")
+        yield triple(cohort_uri, ":hasPerformanceMetrics", ":SpecificityAndSensitivity")
         
         # Create performance evaluation activity
         perf_activity = f":PerformanceActivity_{cohort_uri.split(':')[1]}"
-        triples.append(f"{perf_activity} rdf:type prov:Activity .")
-        triples.append(f"{perf_activity} rdfs:label \"Performance Evaluation Activity\" .")
-        triples.append(f"{cohort_uri} prov:wasGeneratedBy {perf_activity} .")
+        yield triple(perf_activity, "rdf:type", "prov:Activity")
+        yield triple(perf_activity, "rdfs:label", literal("Performance Evaluation Activity"))
+        yield triple(cohort_uri, "prov:wasGeneratedBy", perf_activity)
     
     # Extract validation tool
     if "PheValuator" in summary:
-        triples.append(f"{cohort_uri} :validatedBy :PheValuator .")
+        yield triple(cohort_uri, ":validatedBy", ":PheValuator")
         
         # Create PheValuator agent
         phevaluator_agent = ":PheValuatorAgent"
-        triples.append(f"{phevaluator_agent} rdf:type prov:Agent .")
-        triples.append(f"{phevaluator_agent} rdfs:label \"PheValuator Validation Tool\" .")
-        triples.append(f"{validation_activity} prov:wasAssociatedWith {phevaluator_agent} .")
-    
-    return triples
+        yield triple(phevaluator_agent, "rdf:type", "prov:Agent")
+        yield triple(phevaluator_agent, "rdfs:label", literal("PheValuator Validation Tool"))
+        yield triple(validation_activity, "prov:wasAssociatedWith", phevaluator_agent)
+
+# Section extractors for the algorithm's markdown, run in this order
+ALGORITHM_SECTIONS = SectionExtractors()
+ENTRY_CONDITION_RE = re.compile(r"condition occurrence of '([^']+)'")
+ERA_WINDOW_RE = re.compile(r"within (\d+) days")
+# "#### 1. Age over 18": the rule's number and name
+INCLUSION_RULE_TITLE_RE = re.compile(r"(\d+)\.\s*(.*)")
 
 def parse_human_readable_algorithm(algorithm, cohort_uri):
     """
     Parse human readable algorithm into PROV-O activities and relationships.
     """
-    triples = []
-    
+    cohort_id = cohort_uri.split(':')[1]
     # Create algorithm development activity
-    algo_activity = f":AlgorithmActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{algo_activity} rdf:type prov:Activity .")
-    triples.append(f"{algo_activity} rdfs:label \"Cohort Algorithm Development\" .")
-    triples.append(f"{cohort_uri} prov:wasGeneratedBy {algo_activity} .")
+    algo_activity = f":AlgorithmActivity_{cohort_id}"
+    yield triple(algo_activity, "rdf:type", "prov:Activity")
+    yield triple(algo_activity, "rdfs:label", literal("Cohort Algorithm Development"))
+    yield triple(cohort_uri, "prov:wasGeneratedBy", algo_activity)
     
     # Add the full algorithm text
-    triples.append(f"{cohort_uri} :hasAlgorithm \"{algorithm}\" .")
-    
-    # Parse entry events section
-    if "Cohort Entry Events" in algorithm:
-        entry_activity = f":EntryEventActivity_{cohort_uri.split(':')[1]}"
-        triples.append(f"{entry_activity} rdf:type prov:Activity .")
-        triples.append(f"{entry_activity} rdfs:label \"Entry Event Definition\" .")
-        triples.append(f"{algo_activity} prov:wasDerivedFrom {entry_activity} .")
-        
-        # Extract entry conditions
-        entry_section = algorithm.split("Cohort Entry Events")[1].split("###")[0]
-        conditions = re.findall(r"condition occurrence of '([^']+)'", entry_section)
-        for i, condition in enumerate(conditions, 1):
-            condition_uri = f":EntryCondition_{cohort_uri.split(':')[1]}_{i}"
-            triples.append(f"{condition_uri} rdf:type :EntryCondition .")
-            triples.append(f"{condition_uri} rdfs:label \"{condition}\" .")
-            triples.append(f"{entry_activity} :definesCondition {condition_uri} .")
-        
-        # Extract time constraints
-        if "first time in the person's history" in entry_section:
-            triples.append(f"{entry_activity} :hasTimeConstraint :FirstOccurrence .")
-            triples.append(f":FirstOccurrence rdf:type :TimeConstraint .")
-            triples.append(f":FirstOccurrence rdfs:label \"First occurrence in history\" .")
-        
-        # Extract event limiting
-        if "earliest event per person" in entry_section:
-            triples.append(f"{entry_activity} :hasEventLimit :EarliestEvent .")
-            triples.append(f":EarliestEvent rdf:type :EventLimit .")
-            triples.append(f":EarliestEvent rdfs:label \"Earliest event per person\" .")
-    
-    # Parse exit criteria section
-    if "Cohort Exit" in algorithm:
-        exit_activity = f":ExitCriteriaActivity_{cohort_uri.split(':')[1]}"
-        triples.append(f"{exit_activity} rdf:type prov:Activity .")
-        triples.append(f"{exit_activity} rdfs:label \"Exit Criteria Definition\" .")
-        triples.append(f"{algo_activity} prov:wasDerivedFrom {exit_activity} .")
-        
-        exit_section = algorithm.split("Cohort Exit")[1].split("###")[0]
-        if "end of continuous observation" in exit_section:
-            triples.append(f"{exit_activity} :hasExitCriteria :EndOfObservation .")
-            triples.append(f":EndOfObservation rdf:type :ExitCriteria .")
-            triples.append(f":EndOfObservation rdfs:label \"End of continuous observation\" .")
-    
-    # Parse cohort eras section
-    if "Cohort Eras" in algorithm:
-        era_activity = f":EraDefinitionActivity_{cohort_uri.split(':')[1]}"
-        triples.append(f"{era_activity} rdf:type prov:Activity .")
-        triples.append(f"{era_activity} rdfs:label \"Cohort Era Definition\" .")
-        triples.append(f"{algo_activity} prov:wasDerivedFrom {era_activity} .")
-        
-        era_section = algorithm.split("Cohort Eras")[1]
-        if "within" in era_section and "days of each other" in era_section:
-            days_match = re.search(r"within (\d+) days", era_section)
-            if days_match:
-                days = days_match.group(1)
-                triples.append(f"{era_activity} :hasEraWindow \"{days}\"^^xsd:integer .")
-                triples.append(f"{era_activity} :hasEraWindowUnit \"days\" .")
+    yield triple(cohort_uri, ":hasAlgorithm", literal(algorithm))
+
+    # One scan finds every section; the extractors search within their spans
+    yield from ALGORITHM_SECTIONS.extract(SectionMap(algorithm), cohort_id, algo_activity)
+
+@ALGORITHM_SECTIONS.register("Cohort Entry Events")
+def entry_event_triples(sections, section, cohort_id, algo_activity):
+    entry_activity = f":EntryEventActivity_{cohort_id}"
+    yield triple(entry_activity, "rdf:type", "prov:Activity")
+    yield triple(entry_activity, "rdfs:label", literal("Entry Event Definition"))
+    yield triple(algo_activity, "prov:wasDerivedFrom", entry_activity)
+    
+    # Extract entry conditions
+    for i, match in enumerate(sections.finditer(section, ENTRY_CONDITION_RE), 1):
+        condition_uri = f":EntryCondition_{cohort_id}_{i}"
+        yield triple(condition_uri, "rdf:type", ":EntryCondition")
+        yield triple(condition_uri, "rdfs:label", literal(match.group(1)))
+        yield triple(entry_activity, ":definesCondition", condition_uri)
+    
+    # Extract time constraints
+    if sections.contains(section, "first time in the person's history"):
+        yield triple(entry_activity, ":hasTimeConstraint", ":FirstOccurrence")
+        yield triple(":FirstOccurrence", "rdf:type", ":TimeConstraint")
+        yield triple(":FirstOccurrence", "rdfs:label", literal("First occurrence in history"))
     
-    return triples
+    # Extract event limiting
+    if sections.contains(section, "earliest event per person"):
+        yield triple(entry_activity, ":hasEventLimit", ":EarliestEvent")
+        yield triple(":EarliestEvent", "rdf:type", ":EventLimit")
+        yield triple(":EarliestEvent", "rdfs:label", literal("Earliest event per person"))
 
-def parse_concept_sets(concept_sets, cohort_uri):
-    """
-    Parse concept sets into PROV-O activities and relationships.
-    """
-    triples = []
+@ALGORITHM_SECTIONS.register("Inclusion Criteria")
+def inclusion_criteria_triples(sections, section, cohort_id, algo_activity):
+    inclusion_activity = f":InclusionCriteriaActivity_{cohort_id}"
+    yield triple(inclusion_activity, "rdf:type", "prov:Activity")
+    yield triple(inclusion_activity, "rdfs:label", literal("Inclusion Criteria Definition"))
+    yield triple(algo_activity, "prov:wasDerivedFrom", inclusion_activity)
+
+    # Each "#### n. name" subsection is one rule; an unnumbered one is ordered
+    # by its position but named from its own counter, so it cannot take the
+    # URI of a numbered rule
+    unnumbered = 0
+    for position, rule in enumerate(sections.subsections(section), 1):
+        match = INCLUSION_RULE_TITLE_RE.match(rule.title)
+        if match:
+            order, rule_name = int(match.group(1)), match.group(2)
+            rule_uri = f":InclusionRule_{cohort_id}_{order}"
+        else:
+            unnumbered += 1
+            order, rule_name = position, rule.title
+            rule_uri = f":InclusionRule_{cohort_id}_unnumbered_{unnumbered}"
+        yield triple(rule_uri, "rdf:type", ":InclusionRule")
+        if is_nonempty_literal(rule_name):
+            yield triple(rule_uri, "rdfs:label", literal(rule_name))
+        yield triple(rule_uri, ":hasRuleOrder", literal(order, "xsd:integer"))
+        description = sections.body(rule)
+        if description:
+            yield triple(rule_uri, ":hasRuleDescription", literal(description))
+        yield triple(inclusion_activity, ":definesInclusionRule", rule_uri)
+
+@ALGORITHM_SECTIONS.register("Cohort Exit")
+def exit_criteria_triples(sections, section, cohort_id, algo_activity):
+    exit_activity = f":ExitCriteriaActivity_{cohort_id}"
+    yield triple(exit_activity, "rdf:type", "prov:Activity")
+    yield triple(exit_activity, "rdfs:label", literal("Exit Criteria Definition"))
+    yield triple(algo_activity, "prov:wasDerivedFrom", exit_activity)
     
-    # Create concept set development activity
-    concept_activity = f":ConceptSetActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{concept_activity} rdf:type prov:Activity .")
-    triples.append(f"{concept_activity} rdfs:label \"Concept Set Development\" .")
-    triples.append(f"{cohort_uri} prov:wasGeneratedBy {concept_activity} .")
+    if sections.contains(section, "end of continuous observation"):
+        yield triple(exit_activity, ":hasExitCriteria", ":EndOfObservation")
+        yield triple(":EndOfObservation", "rdf:type", ":ExitCriteria")
+        yield triple(":EndOfObservation", "rdfs:label", literal("End of continuous observation"))
+
+@ALGORITHM_SECTIONS.register("Cohort Eras")
+def cohort_era_triples(sections, section, cohort_id, algo_activity):
+    era_activity = f":EraDefinitionActivity_{cohort_id}"
+    yield triple(era_activity, "rdf:type", "prov:Activity")
+    yield triple(era_activity, "rdfs:label", literal("Cohort Era Definition"))
+    yield triple(algo_activity, "prov:wasDerivedFrom", era_activity)
     
+    if sections.contains(section, "within") and sections.contains(section, "days of each other"):
+        days_match = sections.search(section, ERA_WINDOW_RE)
+        if days_match:
+            days = days_match.group(1)
+            yield triple(era_activity, ":hasEraWindow", literal(days, "xsd:integer"))
+            yield triple(era_activity, ":hasEraWindowUnit", literal("days"))
+
+def concept_set_activity_uri(cohort_uri):
+    return f":ConceptSetActivity_{cohort_uri.split(':')[1]}"
+
+def concept_set_uri(concept_set):
+    return f":ConceptSet_{sanitize_local_name(concept_set.get('id', ''))}"
+
+def iter_concept_set_activity_triples(cohort_uri):
+    """PROV-O activities behind a cohort's concept sets."""
+    # Create concept set development activity
+    concept_activity = concept_set_activity_uri(cohort_uri)
+    yield triple(concept_activity, "rdf:type", "prov:Activity")
+    yield triple(concept_activity, "rdfs:label", literal("Concept Set Development"))
+    yield triple(cohort_uri, "prov:wasGeneratedBy", concept_activity)
+
     # Create literature review activity
     lit_activity = f":LiteratureReviewActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{lit_activity} rdf:type prov:Activity .")
-    triples.append(f"{lit_activity} rdfs:label \"Literature Review\" .")
-    triples.append(f"{concept_activity} prov:wasDerivedFrom {lit_activity} .")
-    
+    yield triple(lit_activity, "rdf:type", "prov:Activity")
+    yield triple(lit_activity, "rdfs:label", literal("Literature Review"))
+    yield triple(concept_activity, "prov:wasDerivedFrom", lit_activity)
+
     # Create PHOEBE analysis activity
     phoebe_activity = f":PHOEBEAnalysisActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{phoebe_activity} rdf:type prov:Activity .")
-    triples.append(f"{phoebe_activity} rdfs:label \"PHOEBE Analysis\" .")
-    triples.append(f"{concept_activity} prov:wasDerivedFrom {phoebe_activity} .")
-    
+    yield triple(phoebe_activity, "rdf:type", "prov:Activity")
+    yield triple(phoebe_activity, "rdfs:label", literal("PHOEBE Analysis"))
+    yield triple(concept_activity, "prov:wasDerivedFrom", phoebe_activity)
+
     # Create orphan concept analysis activity
     orphan_activity = f":OrphanConceptActivity_{cohort_uri.split(':')[1]}"
-    triples.append(f"{orphan_activity} rdf:type prov:Activity .")
-    triples.append(f"{orphan_activity} rdfs:label \"Orphan Concept Analysis\" .")
-    triples.append(f"{concept_activity} prov:wasDerivedFrom {orphan_activity} .")
+    yield triple(orphan_activity, "rdf:type", "prov:Activity")
+    yield triple(orphan_activity, "rdfs:label", literal("Orphan Concept Analysis"))
+    yield triple(concept_activity, "prov:wasDerivedFrom", orphan_activity)
+
+def iter_concept_set_header_triples(concept_set, cohort_uri):
+    """A concept set entity and its development activity."""
+    concept_activity = concept_set_activity_uri(cohort_uri)
+    set_id = concept_set.get('id', '')
+    set_name = concept_set.get('name', '')
+
+    # Create concept set entity
+    set_uri = concept_set_uri(concept_set)
+    yield triple(set_uri, "rdf:type", ":ConceptSet")
+    if is_nonempty_literal(set_name):
+        yield triple(set_uri, "rdfs:label", literal(sanitize_local_name(set_name)))
+    yield triple(cohort_uri, ":hasConceptSet", set_uri)
+
+    # Link concept set to its development activity
+    set_dev_activity = f":ConceptSetDevActivity_{sanitize_local_name(set_id)}"
+    yield triple(set_dev_activity, "rdf:type", "prov:Activity")
+    yield triple(set_dev_activity, "rdfs:label", literal(f"Concept Set {sanitize_local_name(set_id)} Development"))
+    yield triple(set_uri, "prov:wasGeneratedBy", set_dev_activity)
+    yield triple(concept_activity, "prov:wasDerivedFrom", set_dev_activity)
+
+# Terms of the per-concept triples, built once since they run for every concept
+RDF_TYPE = name("rdf:type")
+RDFS_LABEL = name("rdfs:label")
+CONCEPT = name(":Concept")
+HAS_CONCEPT_CODE = name(":hasConceptCode")
+HAS_DOMAIN = name(":hasDomain")
+HAS_VOCABULARY = name(":hasVocabulary")
+HAS_CONCEPT_CLASS = name(":hasConceptClass")
+SKOS_EXACT_MATCH = name("skos:exactMatch")
+VALID_FROM = name(":validFrom")
+VALID_TO = name(":validTo")
+HAS_RESOLVED_CONCEPT = name(":hasResolvedConcept")
+XSD_DATETIME = name("xsd:dateTime")
+
+def concept_description_triples(concept, vocab_prefix, concept_name, code, domain_id, vocabulary_id, concept_class):
+    """
+    The triples describing a concept (a name term) itself, as (head, tail).
+
+    head comes before an occurrence's linking triples and tail (the
+    skos:exactMatch, if any) after them.
+    """
+    head = [(concept, RDF_TYPE, CONCEPT)]
+    if is_nonempty_literal(concept_name):
+        head.append((concept, RDFS_LABEL, literal(sanitize_local_name(concept_name))))
+    head.append((concept, HAS_CONCEPT_CODE, literal(sanitize_local_name(code))))
+    head.append((concept, HAS_DOMAIN, literal(sanitize_local_name(domain_id))))
+    head.append((concept, HAS_VOCABULARY, literal(sanitize_local_name(vocabulary_id))))
+    head.append((concept, HAS_CONCEPT_CLASS, literal(sanitize_local_name(concept_class))))
+
+    # Add skos:exactMatch to the concept in its native vocabulary
+    tail = []
+    if vocab_prefix != ':':
+        tail.append((concept, SKOS_EXACT_MATCH, name(f"{vocab_prefix}{sanitize_local_name(code)}")))
+    return head, tail
+
+def new_description_triples(registry, statements):
+    """statements not yet emitted: all of them without a registry."""
+    return statements if registry is None else registry.claim_new(statements)
+
+def iter_concept_item_triples(item, set_id, set_uri, registry=None):
+    """A concept from a set's expression and the inclusion rule that applies it."""
+    concept = item.get('concept', {})
+    concept_id = concept.get('CONCEPT_ID', '')
+    concept_name = concept.get('CONCEPT_NAME', '')
+    concept_code = concept.get('CONCEPT_CODE', '')
+    domain_id = concept.get('DOMAIN_ID', '')
+    vocabulary_id = concept.get('VOCABULARY_ID', '')
+    concept_class = concept.get('CONCEPT_CLASS_ID', '')
+    is_excluded = item.get('isExcluded', False)
+    include_descendants = item.get('includeDescendants', False)
+    include_mapped = item.get('includeMapped', False)
+
+    # Get the appropriate vocabulary prefix
+    vocab_prefix = get_vocabulary_prefix(vocabulary_id)
+
+    # Create concept URI
+    concept_uri = f"{vocab_prefix}{sanitize_local_name(concept_code)}"
+
+    # Add concept triples not already emitted
+    head, tail = concept_description_triples(name(concept_uri), vocab_prefix, concept_name, concept_code,
+                                             domain_id, vocabulary_id, concept_class)
+    yield from new_description_triples(registry, head)
+
+    # Create concept inclusion rule
+    rule_uri = f":ConceptRule_{sanitize_local_name(set_id)}_{sanitize_local_name(concept_id)}"
+    yield triple(rule_uri, "rdf:type", ":ConceptInclusionRule")
+    yield triple(set_uri, ":hasInclusionRule", rule_uri)
+    yield triple(rule_uri, ":appliesToConcept", concept_uri)
+
+    # Add rule properties
+    yield triple(rule_uri, ":isExcluded", literal(str(is_excluded).lower(), "xsd:boolean"))
+    yield triple(rule_uri, ":includeDescendants", literal(str(include_descendants).lower(), "xsd:boolean"))
+    yield triple(rule_uri, ":includeMapped", literal(str(include_mapped).lower(), "xsd:boolean"))
+
+    # Add rule descriptions
+    if is_excluded:
+        yield triple(rule_uri, "rdfs:comment", literal("Excludes concept and its descendants from the cohort"))
+    else:
+        yield triple(rule_uri, "rdfs:comment", literal("Includes concept in the cohort"))
+
+    if include_descendants:
+        yield triple(rule_uri, "rdfs:comment", literal("Includes all descendant concepts in the hierarchy"))
+
+    if include_mapped:
+        yield triple(rule_uri, "rdfs:comment", literal("Includes mapped concepts from other vocabularies"))
+
+    yield from new_description_triples(registry, tail)
+
+def iter_resolved_concept_triples(resolved, set_uri, registry=None):
+    """A resolved (descendant) concept of a set."""
+    concept_id = resolved.get('conceptId', '')
+    concept_name = resolved.get('conceptName', '')
+    concept_code = resolved.get('conceptCode', '')
+    domain_id = resolved.get('domainId', '')
+    vocabulary_id = resolved.get('vocabularyId', '')
+    concept_class = resolved.get('conceptClassId', '')
+    valid_start = resolved.get('validStartDate', '')
+    valid_end = resolved.get('validEndDate', '')
+
+    # Get the appropriate vocabulary prefix
+    vocab_prefix = get_vocabulary_prefix(vocabulary_id)
+
+    # Create concept URI
+    concept_uri = f"{vocab_prefix}{sanitize_local_name(concept_code)}"
+
+    # Add concept triples not already emitted
+    head, tail = concept_description_triples(name(concept_uri), vocab_prefix, concept_name, concept_code,
+                                             domain_id, vocabulary_id, concept_class)
+    yield from new_description_triples(registry, head)
+
+    # Add validity period
+    concept = head[0][0]
+    validity = []
+    if valid_start:
+        validity.append((concept, VALID_FROM, literal(valid_start, XSD_DATETIME)))
+    if valid_end:
+        validity.append((concept, VALID_TO, literal(valid_end, XSD_DATETIME)))
+    yield from new_description_triples(registry, validity)
+
+    # Link to concept set as resolved concept
+    yield (name(set_uri), HAS_RESOLVED_CONCEPT, concept)
+
+    yield from new_description_triples(registry, tail)
+
+def iter_concept_set_triples(concept_sets, cohort_uri, registry=None):
+    """
+    Parse concept sets into PROV-O activities and relationships.
+    """
+    yield from iter_concept_set_activity_triples(cohort_uri)
     
     # Process each concept set
     for concept_set in concept_sets:
         set_id = concept_set.get('id', '')
-        set_name = concept_set.get('name', '')
-        
-        # Create concept set entity
-        set_uri = f":ConceptSet_{sanitize_local_name(set_id)}"
-        triples.append(f"{set_uri} rdf:type :ConceptSet .")
-        if is_nonempty_literal(set_name):
-            triples.append(f"{set_uri} rdfs:label \"{sanitize_local_name(set_name)}\" .")
-        triples.append(f"{cohort_uri} :hasConceptSet {set_uri} .")
-        
-        # Link concept set to its development activity
-        set_dev_activity = f":ConceptSetDevActivity_{sanitize_local_name(set_id)}"
-        triples.append(f"{set_dev_activity} rdf:type prov:Activity .")
-        triples.append(f"{set_dev_activity} rdfs:label \"Concept Set {sanitize_local_name(set_id)} Development\" .")
-        triples.append(f"{set_uri} prov:wasGeneratedBy {set_dev_activity} .")
-        triples.append(f"{concept_activity} prov:wasDerivedFrom {set_dev_activity} .")
+        set_uri = concept_set_uri(concept_set)
+        yield from iter_concept_set_header_triples(concept_set, cohort_uri)
         
         # Process concepts in the set
         for item in concept_set.get('expression', {}).get('items', []):
-            concept = item.get('concept', {})
-            concept_id = concept.get('CONCEPT_ID', '')
-            concept_name = concept.get('CONCEPT_NAME', '')
-            concept_code = concept.get('CONCEPT_CODE', '')
-            domain_id = concept.get('DOMAIN_ID', '')
-            vocabulary_id = concept.get('VOCABULARY_ID', '')
-            concept_class = concept.get('CONCEPT_CLASS_ID', '')
-            is_excluded = item.get('isExcluded', False)
-            include_descendants = item.get('includeDescendants', False)
-            include_mapped = item.get('includeMapped', False)
-            
-            # Get the appropriate vocabulary prefix
-            vocab_prefix = get_vocabulary_prefix(vocabulary_id)
-            
-            # Create concept URI
-            concept_uri = f"{vocab_prefix}{sanitize_local_name(concept_code)}"
-            
-            # Add concept triples
-            triples.append(f"{concept_uri} rdf:type :Concept .")
-            if is_nonempty_literal(concept_name):
-                triples.append(f"{concept_uri} rdfs:label \"{sanitize_local_name(concept_name)}\" .")
-            triples.append(f"{concept_uri} :hasConceptCode \"{sanitize_local_name(concept_code)}\" .")
-            triples.append(f"{concept_uri} :hasDomain \"{sanitize_local_name(domain_id)}\" .")
-            triples.append(f"{concept_uri} :hasVocabulary \"{sanitize_local_name(vocabulary_id)}\" .")
-            triples.append(f"{concept_uri} :hasConceptClass \"{sanitize_local_name(concept_class)}\" .")
-            
-            # Create concept inclusion rule
-            rule_uri = f":ConceptRule_{sanitize_local_name(set_id)}_{sanitize_local_name(concept_id)}"
-            triples.append(f"{rule_uri} rdf:type :ConceptInclusionRule .")
-            triples.append(f"{set_uri} :hasInclusionRule {rule_uri} .")
-            triples.append(f"{rule_uri} :appliesToConcept {concept_uri} .")
-            
-            # Add rule properties
-            triples.append(f"{rule_uri} :isExcluded \"{str(is_excluded).lower()}\"^^xsd:boolean .")
-            triples.append(f"{rule_uri} :includeDescendants \"{str(include_descendants).lower()}\"^^xsd:boolean .")
-            triples.append(f"{rule_uri} :includeMapped \"{str(include_mapped).lower()}\"^^xsd:boolean .")
-            
-            # Add rule descriptions
-            if is_excluded:
-                triples.append(f"{rule_uri} rdfs:comment \"Excludes concept and its descendants from the cohort\" .")
-            else:
-                triples.append(f"{rule_uri} rdfs:comment \"Includes concept in the cohort\" .")
-            
-            if include_descendants:
-                triples.append(f"{rule_uri} rdfs:comment \"Includes all descendant concepts in the hierarchy\" .")
-            
-            if include_mapped:
-                triples.append(f"{rule_uri} rdfs:comment \"Includes mapped concepts from other vocabularies\" .")
-            
-            # Add skos:exactMatch to the concept in its native vocabulary
-            if vocab_prefix != ':':
-                triples.append(f"{concept_uri} skos:exactMatch {vocab_prefix}{sanitize_local_name(concept_code)} .")
+            yield from iter_concept_item_triples(item, set_id, set_uri, registry)
         
         # Process resolved concepts (descendants)
         for resolved in concept_set.get('resolvedConcepts', []):
-            concept_id = resolved.get('conceptId', '')
-            concept_name = resolved.get('conceptName', '')
-            concept_code = resolved.get('conceptCode', '')
-            domain_id = resolved.get('domainId', '')
-            vocabulary_id = resolved.get('vocabularyId', '')
-            concept_class = resolved.get('conceptClassId', '')
-            valid_start = resolved.get('validStartDate', '')
-            valid_end = resolved.get('validEndDate', '')
-            
-            # Get the appropriate vocabulary prefix
-            vocab_prefix = get_vocabulary_prefix(vocabulary_id)
-            
-            # Create concept URI
-            concept_uri = f"{vocab_prefix}{sanitize_local_name(concept_code)}"
-            
-            # Add concept triples
-            triples.append(f"{concept_uri} rdf:type :Concept .")
-            if is_nonempty_literal(concept_name):
-                triples.append(f"{concept_uri} rdfs:label \"{sanitize_local_name(concept_name)}\" .")
-            triples.append(f"{concept_uri} :hasConceptCode \"{sanitize_local_name(concept_code)}\" .")
-            triples.append(f"{concept_uri} :hasDomain \"{sanitize_local_name(domain_id)}\" .")
-            triples.append(f"{concept_uri} :hasVocabulary \"{sanitize_local_name(vocabulary_id)}\" .")
-            triples.append(f"{concept_uri} :hasConceptClass \"{sanitize_local_name(concept_class)}\" .")
-            
-            # Add validity period
-            if valid_start:
-                triples.append(f"{concept_uri} :validFrom \"{valid_start}\"^^xsd:dateTime .")
-            if valid_end:
-                triples.append(f"{concept_uri} :validTo \"{valid_end}\"^^xsd:dateTime .")
-            
-            # Link to concept set as resolved concept
-            triples.append(f"{set_uri} :hasResolvedConcept {concept_uri} .")
-            
-            # Add skos:exactMatch to the concept in its native vocabulary
-            if vocab_prefix != ':':
-                triples.append(f"{concept_uri} skos:exactMatch {vocab_prefix}{sanitize_local_name(concept_code)} .")
-    
-    return triples
-
-def escape_literal(s):
-    """Escape newlines and carriage returns in a string literal for TTL output."""
-    if not isinstance(s, str):
-        return s
-    return s.replace('"', '\"').replace('\n', '\n').replace('\r', '\r')
-
-def write_triples_to_file(triples, output_file):
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(PREFIXES)
-        for triple in triples:
-            # Escape all literals in the triple
-            # If the triple contains a quoted string, escape it
-            if '"' in triple:
-                parts = triple.split('"')
-                for i in range(1, len(parts), 2):
-                    parts[i] = escape_literal(parts[i])
-                triple = '"'.join(parts)
-            f.write(triple + '\n')
-
-def parse_cohort_json(file_path):
-    """Parse a cohort definition JSON file and extract triples."""
+            yield from iter_resolved_concept_triples(resolved, set_uri, registry)
+
+def iter_streamed_concept_set_triples(file_path, concept_sets, cohort_uri, registry=None):
+    """
+    iter_concept_set_triples for a file read with cohort_stream.
+
+    concept_sets are the skeletons from read_cohort_skeleton; the entries of
+    each set are read from the file one at a time.
+    """
+    yield from iter_concept_set_activity_triples(cohort_uri)
+    
+    current = -1
+    for kind, set_index, entry in iter_concept_set_entries(file_path):
+        # Open every set up to this one, including sets with no entries
+        while current < set_index:
+            current += 1
+            yield from iter_concept_set_header_triples(concept_sets[current], cohort_uri)
+        concept_set = concept_sets[current]
+        if kind == "item":
+            yield from iter_concept_item_triples(entry, concept_set.get('id', ''), concept_set_uri(concept_set), registry)
+        else:
+            yield from iter_resolved_concept_triples(entry, concept_set_uri(concept_set), registry)
+    while current < len(concept_sets) - 1:
+        current += 1
+        yield from iter_concept_set_header_triples(concept_sets[current], cohort_uri)
+
+def parse_concept_sets(concept_sets, cohort_uri):
+    """
+    Parse concept sets into PROV-O activities and relationships.
+    """
+    return list(iter_concept_set_triples(concept_sets, cohort_uri))
+
+NAMESPACES = parse_prefixes(PREFIXES)
+TURTLE = TurtleSerializer(PREFIXES)
+# Graph IRI for N-Quads output
+COHORT_GRAPH = "http://example.org/cohort/graph"
+
+def get_serializer(fmt="turtle"):
+    """The serializer for fmt: "turtle", "nt" or "nquads"."""
+    return TURTLE if fmt == "turtle" else make_serializer(fmt, PREFIXES, NAMESPACES, COHORT_GRAPH)
+
+def format_triple(t):
+    """A triple as the Turtle statement written to the TTL file."""
+    return TURTLE.statement(t)
+
+def write_triples_to_file(triples, output_file, serializer=None, compression="auto"):
+    """
+    Write triples with serializer (Turtle by default) as they are produced; returns the count.
+
+    triples may be any iterable, so a generator pipeline is written out
+    without ever being held in memory. The text goes through a large buffer
+    into a temporary file that replaces output_file only once every triple
+    is written, so a failure part-way never leaves a truncated file behind.
+    compression ("gzip", "lzma" or None) follows output_file's suffix
+    (.gz, .xz) by default; see ttl_io.
+    """
+    with AtomicTextWriter(output_file, compression) as f:
+        return (serializer or TURTLE).write(triples, f)
+
+def add_triples_to_graph(triples, graph):
+    """Add triples to an rdflib Graph (or a Graph over any Store) without going through text."""
+    return RDFLibSink(graph, NAMESPACES).add(triples)
+
+# Files at least this large are streamed (when ijson is installed)
+STREAMING_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+def use_streaming(file_path, streaming=None):
+    """Whether to stream file_path: as asked, or by size when streaming is None."""
+    if streaming is None:
+        return ijson is not None and os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES
+    return streaming
+
+def read_cohort_data(file_path, streaming=False):
+    """The cohort JSON, or with streaming its skeleton (concept set entries left on disk)."""
     try:
+        if streaming:
+            return read_cohort_skeleton(file_path)
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON file {file_path}: {str(e)}")
-        raise CohortParserError(f"Invalid JSON format in {file_path}") from e
+        if not isinstance(data, dict):
+            raise ValueError(f"Top-level JSON value in {file_path} is not an object")
+        return data
+    except ImportError:
+        raise
     except UnicodeDecodeError as e:
         logger.error(f"Failed to decode file {file_path}: {str(e)}")
         raise CohortParserError(f"File encoding error in {file_path}") from e
+    except (json.JSONDecodeError, ValueError) as e:
+        # ijson reports malformed documents as ValueError subclasses
+        logger.error(f"Failed to parse JSON file {file_path}: {str(e)}")
+        raise CohortParserError(f"Invalid JSON format in {file_path}") from e
     except Exception as e:
         logger.error(f"Unexpected error reading file {file_path}: {str(e)}")
         raise CohortParserError(f"Error reading file {file_path}") from e
+
+def iter_cohort_info_triples(cohort_uri, cohort_id, cohort_name, edit_url):
+    """The cohort's type, label, identifier and Atlas provenance."""
+    # Basic cohort information
+    yield triple(cohort_uri, "rdf:type", ":Cohort")
+    if is_nonempty_literal(cohort_name):
+        yield triple(cohort_uri, "rdfs:label", literal(sanitize_text(cohort_name)))
+    
+    # Add ID as a data property
+    if cohort_id != 'Unknown':
+        yield triple(cohort_uri, "dct:identifier", literal(cohort_id, "xsd:integer"))
+    
+    # Add edit URL as source
+    if edit_url:
+        yield triple(cohort_uri, "dct:source", iri(edit_url))
+        
+        # Create Atlas agent
+        atlas_agent = ":AtlasAgent"
+        yield triple(atlas_agent, "rdf:type", "prov:Agent")
+        yield triple(atlas_agent, "rdfs:label", literal("OHDSI Atlas"))
+        
+        # Create Atlas activity
+        atlas_activity = f":AtlasActivity_{cohort_id}"
+        yield triple(atlas_activity, "rdf:type", "prov:Activity")
+        yield triple(atlas_activity, "rdfs:label", literal("Atlas Cohort Definition Activity"))
+        yield triple(cohort_uri, "prov:wasGeneratedBy", atlas_activity)
+        yield triple(atlas_activity, "prov:wasAssociatedWith", atlas_agent)
+
+def iter_title_triples(cohort_uri, cohort_id, cohort_name, clinical_desc, profiler=NULL_PROFILER):
+    """The disease and temporal constraint named in the title, and the disease's clinical description."""
+    try:
+        disease, temporal = parse_title(cohort_name)
+        
+        # Add disease entity if found
+        if disease:
+            disease_uri = f":Disease_{sanitize_local_name(disease.replace(' ', '_'))}"
+            yield triple(disease_uri, "rdf:type", ":Disease")
+            if is_nonempty_literal(disease):
+                yield triple(disease_uri, "rdfs:label", literal(sanitize_text(disease)))
+            yield triple(cohort_uri, ":hasDisease", disease_uri)
+            
+            # Parse clinical description into detailed triples
+            if clinical_desc:
+                try:
+                    yield from profiler.wrap("clinical_description",
+                                             parse_clinical_description(clinical_desc, disease_uri))
+                except Exception as e:
+                    logger.error(f"Error parsing clinical description for cohort {cohort_id}: {str(e)}")
+                    raise TextProcessingError(f"Failed to parse clinical description in cohort {cohort_id}") from e
+        
+        # Add temporal constraint if found
+        if temporal:
+            temporal_uri = f":Temporal_{sanitize_local_name(temporal.replace(' ', '_'))}"
+            yield triple(temporal_uri, "rdf:type", "time:TemporalEntity")
+            if is_nonempty_literal(temporal):
+                yield triple(temporal_uri, "rdfs:label", literal(sanitize_text(temporal)))
+            yield triple(cohort_uri, ":hasTemporalConstraint", temporal_uri)
+    except Exception as e:
+        logger.error(f"Error parsing title components for cohort {cohort_id}: {str(e)}")
+        raise TextProcessingError(f"Failed to parse title components in cohort {cohort_id}") from e
+
+def iter_cohort_triples(file_path, streaming=None, registry=None, profiler=None):
+    """
+    Parse a cohort definition JSON file and yield its triples.
+
+    With streaming (the default for files of STREAMING_THRESHOLD_BYTES or
+    more), concept set entries are read from the file one at a time rather
+    than loaded with the rest of the document.
+
+    A concept's descriptive triples are emitted only the first time registry
+    (see concept_registry) sees them; pass one registry to every cohort of a
+    run to describe each concept once per run. Without one, concepts are
+    described once per cohort.
+
+    With a stage_profiler.StageProfiler as profiler, the time and triple
+    count of each stage (read, validation, cohort, evaluation_summary,
+    algorithm, concept_sets, title, clinical_description) are recorded in it.
+    """
+    if profiler is None:
+        profiler = NULL_PROFILER
+    streaming = use_streaming(file_path, streaming)
+    if registry is None:
+        registry = ConceptRegistry()
+    with profiler.stage("read"):
+        data = read_cohort_data(file_path, streaming)
     
     # Get cohort ID for validation context
     cohort_id = str(data.get('id', 'Unknown'))
     
     # Validate required fields
-    validation_results = validate_required_fields(data, cohort_id)
-    log_validation_results(validation_results)
+    with profiler.stage("validation"):
+        validation_results = validate_required_fields(data, cohort_id)
+        log_validation_results(validation_results)
     
     # Check for critical validation errors
     has_critical_errors = any(
@@ -838,40 +1059,13 @@ def parse_cohort_json(file_path):
     # Define the cohort URI
     cohort_uri = f":Cohort{cohort_id}"
     
-    # Output triples
-    triples = []
-    
     try:
-        # Basic cohort information
-        triples.append(f"{cohort_uri} rdf:type :Cohort .")
-        if is_nonempty_literal(cohort_name):
-            triples.append(f"{cohort_uri} rdfs:label \"{sanitize_text(cohort_name)}\" .")
-        
-        # Add ID as a data property
-        if cohort_id != 'Unknown':
-            triples.append(f"{cohort_uri} dct:identifier \"{cohort_id}\"^^xsd:integer .")
-        
-        # Add edit URL as source
-        if edit_url:
-            triples.append(f"{cohort_uri} dct:source <{edit_url}> .")
-            
-            # Create Atlas agent
-            atlas_agent = ":AtlasAgent"
-            triples.append(f"{atlas_agent} rdf:type prov:Agent .")
-            triples.append(f"{atlas_agent} rdfs:label \"OHDSI Atlas\" .")
-            
-            # Create Atlas activity
-            atlas_activity = f":AtlasActivity_{cohort_id}"
-            triples.append(f"{atlas_activity} rdf:type prov:Activity .")
-            triples.append(f"{atlas_activity} rdfs:label \"Atlas Cohort Definition Activity\" .")
-            triples.append(f"{cohort_uri} prov:wasGeneratedBy {atlas_activity} .")
-            triples.append(f"{atlas_activity} prov:wasAssociatedWith {atlas_agent} .")
+        yield from profiler.wrap("cohort", iter_cohort_info_triples(cohort_uri, cohort_id, cohort_name, edit_url))
         
         # Parse evaluation summary
         if evaluation_summary:
             try:
-                eval_triples = parse_evaluation_summary(evaluation_summary, cohort_uri)
-                triples.extend(eval_triples)
+                yield from profiler.wrap("evaluation_summary", parse_evaluation_summary(evaluation_summary, cohort_uri))
             except Exception as e:
                 logger.error(f"Error parsing evaluation summary for cohort {cohort_id}: {str(e)}")
                 raise TextProcessingError(f"Failed to parse evaluation summary in cohort {cohort_id}") from e
@@ -879,8 +1073,8 @@ def parse_cohort_json(file_path):
         # Parse human readable algorithm
         if human_readable_algorithm:
             try:
-                algo_triples = parse_human_readable_algorithm(human_readable_algorithm, cohort_uri)
-                triples.extend(algo_triples)
+                yield from profiler.wrap("algorithm",
+                                         parse_human_readable_algorithm(human_readable_algorithm, cohort_uri))
             except Exception as e:
                 logger.error(f"Error parsing human readable algorithm for cohort {cohort_id}: {str(e)}")
                 raise TextProcessingError(f"Failed to parse human readable algorithm in cohort {cohort_id}") from e
@@ -888,57 +1082,62 @@ def parse_cohort_json(file_path):
         # Parse concept sets
         if concept_sets:
             try:
-                concept_triples = parse_concept_sets(concept_sets, cohort_uri)
-                triples.extend(concept_triples)
+                if streaming:
+                    concept_set_triples = iter_streamed_concept_set_triples(file_path, concept_sets, cohort_uri,
+                                                                            registry)
+                else:
+                    concept_set_triples = iter_concept_set_triples(concept_sets, cohort_uri, registry)
+                yield from profiler.wrap("concept_sets", concept_set_triples)
             except Exception as e:
                 logger.error(f"Error parsing concept sets for cohort {cohort_id}: {str(e)}")
                 raise ConceptSetError(f"Failed to parse concept sets in cohort {cohort_id}") from e
         
         # Parse title into components
-        try:
-            disease, temporal = parse_title(cohort_name)
-            
-            # Add disease entity if found
-            if disease:
-                disease_uri = f":Disease_{sanitize_local_name(disease.replace(' ', '_'))}"
-                triples.append(f"{disease_uri} rdf:type :Disease .")
-                if is_nonempty_literal(disease):
-                    triples.append(f"{disease_uri} rdfs:label \"{sanitize_text(disease)}\" .")
-                triples.append(f"{cohort_uri} :hasDisease {disease_uri} .")
-                
-                # Parse clinical description into detailed triples
-                if clinical_desc:
-                    try:
-                        clinical_triples = parse_clinical_description(clinical_desc, disease_uri)
-                        triples.extend(clinical_triples)
-                    except Exception as e:
-                        logger.error(f"Error parsing clinical description for cohort {cohort_id}: {str(e)}")
-                        raise TextProcessingError(f"Failed to parse clinical description in cohort {cohort_id}") from e
-            
-            # Add temporal constraint if found
-            if temporal:
-                temporal_uri = f":Temporal_{sanitize_local_name(temporal.replace(' ', '_'))}"
-                triples.append(f"{temporal_uri} rdf:type time:TemporalEntity .")
-                if is_nonempty_literal(temporal):
-                    triples.append(f"{temporal_uri} rdfs:label \"{sanitize_text(temporal)}\" .")
-                triples.append(f"{cohort_uri} :hasTemporalConstraint {temporal_uri} .")
-        except Exception as e:
-            logger.error(f"Error parsing title components for cohort {cohort_id}: {str(e)}")
-            raise TextProcessingError(f"Failed to parse title components in cohort {cohort_id}") from e
-        
-        return triples
+        yield from profiler.wrap("title",
+                                 iter_title_triples(cohort_uri, cohort_id, cohort_name, clinical_desc, profiler))
         
     except Exception as e:
         logger.error(f"Error processing cohort {cohort_id}: {str(e)}")
         raise CohortParserError(f"Failed to process cohort {cohort_id}") from e
 
 
+def parse_cohort_json(file_path, streaming=None, registry=None, profiler=None):
+    """Parse a cohort definition JSON file and extract triples."""
+    return list(iter_cohort_triples(file_path, streaming, registry, profiler))
+
+def write_cohort_ttl(file_path, output_file, streaming=None, registry=None, serializer=None, profiler=None):
+    """
+    Parse file_path straight into output_file; returns the number of triples.
+
+    serializer picks the output syntax (see get_serializer); Turtle by default.
+
+    Triples go from the emitters to the file as they are produced. As with
+    write_triples_to_file, output_file is only replaced once the whole
+    cohort has parsed, so a failure part-way never leaves a truncated TTL
+    behind.
+    """
+    triples = iter_cohort_triples(file_path, streaming, registry, profiler)
+    return write_triples_to_file(triples, output_file, serializer)
+
 def main():
     """Main function to parse a single cohort JSON file to TTL."""
     parser = argparse.ArgumentParser(description="Parse a single cohort definition JSON file to TTL.")
     parser.add_argument("input_file", help="Path to the input cohort definition JSON file.")
     parser.add_argument("output_dir", help="Directory to write the TTL file to.")
+    parser.add_argument("--stream", dest="streaming", action="store_const", const=True, default=None,
+                        help="Stream concept sets from the file with ijson (default: only for large files).")
+    parser.add_argument("--no-stream", dest="streaming", action="store_const", const=False,
+                        help="Always load the whole file with json.load.")
+    parser.add_argument("--format", default="turtle", choices=["turtle", "nt", "nquads"],
+                        help="Output syntax (default: turtle).")
+    parser.add_argument("--compress", choices=list(COMPRESSIONS),
+                        help="Compress the output (adds .gz or .xz to the file name).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Log the time and triple count of each parsing stage.")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="Run under cProfile and dump the stats to FILE (read them with pstats or snakeviz).")
     args = parser.parse_args()
+    setup_logging()
 
     if not os.path.isfile(args.input_file):
         logger.error(f"Input file not found: {args.input_file}")
@@ -949,13 +1148,32 @@ def main():
 
     logger.info(f"Parsing {args.input_file}...")
     try:
-        triples = parse_cohort_json(args.input_file)
-        if triples:
-            output_filename = os.path.splitext(os.path.basename(args.input_file))[0] + ".ttl"
-            output_file_path = os.path.join(args.output_dir, output_filename)
-            write_triples_to_file(triples, output_file_path)
+        serializer = get_serializer(args.format)
+        output_filename = os.path.splitext(os.path.basename(args.input_file))[0] + serializer.extension
+        if args.compress:
+            output_filename += COMPRESSIONS[args.compress]
+        output_file_path = os.path.join(args.output_dir, output_filename)
+        profiler = StageProfiler() if args.profile else None
+        cprofile = None
+        if args.cprofile:
+            import cProfile
+            cprofile = cProfile.Profile()
+            cprofile.enable()
+        try:
+            count = write_cohort_ttl(args.input_file, output_file_path, args.streaming, serializer=serializer,
+                                     profiler=profiler)
+        finally:
+            if cprofile is not None:
+                cprofile.disable()
+                cprofile.dump_stats(args.cprofile)
+                logger.info(f"cProfile stats written to {args.cprofile}")
+        if profiler is not None:
+            for stage, timing in profiler.to_dict().items():
+                logger.info(f"  {stage}: {timing['seconds'] * 1000:.2f} ms, {timing['triples']} triples")
+        if count:
             logger.info(f"Successfully wrote triples to {output_file_path}")
         else:
+            os.remove(output_file_path)
             logger.warning(f"No triples generated for {args.input_file}.")
     except CohortParserError as e:
         logger.error(f"Could not parse {args.input_file}: {e}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+In-process syntax and structure checks for the ontology TTL files.
+
+These are the checks behind tests/test_ttl_syntax.py and /api/validate. Each
+file is loaded at most once per run and every check for that file runs
+against the same graph. Callers that already hold parsed graphs (the API
+server's ontology cache) pass their own ``load_graph`` so nothing is re-parsed.
+"""
+
+import json
+import logging
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from rdflib import Graph
+from rdflib.namespace import OWL, RDF
+
+logger = logging.getLogger(__name__)
+
+MAIN_ONTOLOGY = Path("main_ontology") / "ontology.ttl"
+INTERNAL_NAMESPACE = "http://example.org/"
+
+
+@dataclass
+class CheckResult:
+    """Outcome of a single check on a file"""
+    name: str
+    passed: bool
+    message: Optional[str] = None
+
+
+@dataclass
+class FileValidationResult:
+    """All check outcomes for one TTL file"""
+    path: str
+    module: str
+    kind: str
+    triple_count: int = 0
+    checks: List[CheckResult] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return all(check.passed for check in self.checks)
+
+    @property
+    def errors(self) -> List[str]:
+        return [f"{check.name}: {check.message}" for check in self.checks if not check.passed]
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), "passed": self.passed}
+
+
+@dataclass
+class ValidationReport:
+    """Per-file results for a whole validation run"""
+    files: List[FileValidationResult]
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.files)
+
+    def get(self, path: Path) -> Optional[FileValidationResult]:
+        for result in self.files:
+            if result.path == str(path):
+                return result
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "success": self.passed,
+            "total_files": len(self.files),
+            "failed_files": sum(1 for result in self.files if not result.passed),
+            "files": [result.to_dict() for result in self.files],
+        }
+
+
+def discover_ttl_files(ontologies_dir: Path) -> List[Path]:
+    """The main ontology (if present) followed by every *_core.ttl module."""
+    ontologies_dir = Path(ontologies_dir)
+    ttl_files = []
+    main_ontology = ontologies_dir / MAIN_ONTOLOGY
+    if main_ontology.exists():
+        ttl_files.append(main_ontology)
+    ttl_files.extend(sorted(ontologies_dir.rglob("*_core.ttl")))
+    return ttl_files
+
+
+def parse_graph(ttl_path: Path) -> Graph:
+    g = Graph()
+    g.parse(ttl_path, format="turtle")
+    return g
+
+
+def _resolve_import(ontologies_dir: Path, import_iri: str) -> Optional[Path]:
+    """Map an internal owl:imports IRI to its module's *_core.ttl, if one exists."""
+    domain = import_iri.rstrip("/#").split("/")[-1].split("#")[0].split(".")[0]
+    domain = domain.replace("-ontology", "")
+    core_file = ontologies_dir / domain / f"{domain}_core.ttl"
+    return core_file if core_file.exists() else None
+
+
+def check_file(ttl_path: Path, ontologies_dir: Path,
+               load_graph: Callable[[Path], Graph] = parse_graph) -> FileValidationResult:
+    """Run the syntax and structure checks that apply to one file."""
+    ttl_path = Path(ttl_path)
+    ontologies_dir = Path(ontologies_dir)
+    is_main = ttl_path == ontologies_dir / MAIN_ONTOLOGY
+    result = FileValidationResult(
+        path=str(ttl_path),
+        module="main_ontology" if is_main else ttl_path.parent.name,
+        kind="main" if is_main else "core",
+    )
+
+    try:
+        g = load_graph(ttl_path)
+    except Exception as e:
+        result.checks.append(CheckResult("syntax", False, f"Invalid TTL file {ttl_path}: {e}"))
+        return result
+    result.checks.append(CheckResult("syntax", True))
+    result.triple_count = len(g)
+    result.checks.append(CheckResult(
+        "non_empty", len(g) > 0, None if len(g) > 0 else f"TTL file {ttl_path} is empty"
+    ))
+
+    if is_main:
+        unresolved = [
+            str(o) for o in g.objects(None, OWL.imports)
+            if str(o).startswith(INTERNAL_NAMESPACE) and _resolve_import(ontologies_dir, str(o)) is None
+        ]
+        result.checks.append(CheckResult(
+            "imports", not unresolved,
+            f"Unresolvable imports: {', '.join(unresolved)}" if unresolved else None
+        ))
+    else:
+        has_prefixes = next(iter(g.namespaces()), None) is not None
+        result.checks.append(CheckResult(
+            "prefixes", has_prefixes, None if has_prefixes else f"No prefix declarations found in {ttl_path}"
+        ))
+        has_classes = next(iter(g.subjects(RDF.type, OWL.Class)), None) is not None
+        result.checks.append(CheckResult(
+            "classes", has_classes, None if has_classes else f"No class definitions found in {ttl_path}"
+        ))
+
+    return result
+
+
+def validate_ontologies(ontologies_dir: Path,
+                        load_graph: Callable[[Path], Graph] = parse_graph,
+                        on_result: Optional[Callable[[FileValidationResult], None]] = None,
+                        files: Optional[List[Path]] = None) -> ValidationReport:
+    """
+    Check every discovered TTL file, loading each exactly once.
+
+    on_result is called as each file finishes, for progress reporting.
+    """
+    results = []
+    for ttl_path in files if files is not None else discover_ttl_files(ontologies_dir):
+        result = check_file(ttl_path, ontologies_dir, load_graph)
+        if not result.passed:
+            logger.error(f"Validation failed for {ttl_path}: {'; '.join(result.errors)}")
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return ValidationReport(results)
+
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) != 2:
+        print("Usage: python ttl_checks.py <ontology_directory>")
+        sys.exit(1)
+
+    report = validate_ontologies(Path(sys.argv[1]))
+    print(json.dumps(report.to_dict(), indent=2))
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import gzip
+import lzma
 import rdflib
 from rdflib.namespace import OWL, RDF, RDFS
 import sys
@@ -6,10 +8,24 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Magic bytes of the compressions the TTL writers produce (see json_parser/ttl_io.py)
+COMPRESSED_OPENERS = {b'\x1f\x8b': gzip.open, b'\xfd7zXZ\x00': lzma.open}
+
+def parse_ontology_file(g, ontology_path):
+    """Parse a TTL file into g, decompressing it first if it is gzip or xz."""
+    with open(ontology_path, 'rb') as f:
+        head = f.read(6)
+    for magic, opener in COMPRESSED_OPENERS.items():
+        if head.startswith(magic):
+            with opener(ontology_path, 'rb') as f:
+                g.parse(f, format='ttl')
+            return
+    g.parse(ontology_path, format='ttl')
+
 def validate_ontology_integrity(ontology_path):
     g = rdflib.Graph()
     try:
-        g.parse(ontology_path, format='ttl')
+        parse_ontology_file(g, ontology_path)
     except Exception as e:
         logger.error(f"Failed to parse ontology file {ontology_path}: {e}")
         sys.exit(1)
@@ -0,0 +1,74 @@
+"""
+Pre-compressed siblings (file.gz, file.br) of generated files, for serving
+with Content-Encoding instead of compressing on every request.
+
+Brotli is optional: without the ``brotli`` package only .gz siblings are written.
+"""
+import gzip
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content-Encoding token -> sibling file suffix
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+SIBLING_MODE = 0o644
+
+
+def available_encodings():
+    """Encodings this environment can produce, best first."""
+    return [encoding for encoding in ENCODING_SUFFIXES if encoding != "br" or brotli is not None]
+
+
+def sibling_path(path: Path, encoding: str) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+
+
+def fresh_sibling(path: Path, encoding: str) -> Optional[Path]:
+    """The encoded sibling of path, if it exists and is not older than path."""
+    sibling = sibling_path(path, encoding)
+    try:
+        return sibling if sibling.stat().st_mtime_ns >= Path(path).stat().st_mtime_ns else None
+    except FileNotFoundError:
+        return None
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=9)
+    # mtime=0 keeps the bytes (and so the ETag) stable across rebuilds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def write_compressed_siblings(path: Path) -> Dict[str, Path]:
+    """Write every available encoded sibling of path; returns encoding -> sibling path."""
+    path = Path(path)
+    data = path.read_bytes()
+    written = {}
+    for encoding in available_encodings():
+        sibling = sibling_path(path, encoding)
+        # A temp file of its own per call: concurrent downloads may rebuild the same sibling
+        fd, tmp_file = tempfile.mkstemp(dir=sibling.parent, prefix=sibling.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_compress(data, encoding))
+            # mkstemp creates the file private to its owner
+            os.chmod(tmp_file, SIBLING_MODE)
+            os.replace(tmp_file, sibling)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+        written[encoding] = sibling
+    if brotli is None:
+        logger.debug(f"brotli not installed; wrote only gzip sibling for {path.name}")
+    return written
@@ -6,6 +6,8 @@ from rdflib import Graph
 import pyshacl
 import logging
 
+from combine_ontologies import load_combined_ontology, newest_output
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,14 +20,16 @@ class OntologyValidator:
         self.graph = Graph()
 
     def load_combined_ontology(self) -> bool:
-        """Load the combined ontology file."""
-        if not self.combined_file.exists():
+        """Load the combined ontology, from whichever output format was written last."""
+        found = newest_output(self.ontology_dir)
+        if found is None:
             logger.error(f"Combined ontology not found: {self.combined_file}")
             return False
+        self.combined_file = found[1]
         
         try:
-            self.graph.parse(self.combined_file, format="turtle")
-            logger.info("Loaded combined ontology")
+            load_combined_ontology(self.ontology_dir, self.graph)
+            logger.info(f"Loaded combined ontology from {self.combined_file.name}")
             return True
         except Exception as e:
             logger.error(f"Error loading combined ontology: {e}")
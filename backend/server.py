@@ -1,14 +1,15 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 import os
+import re
 import subprocess
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 import tempfile
-from rdflib import Graph
+import threading
 import sys
 
 # Configure logging
@@ -36,138 +37,303 @@ OUTPUT_DIR = BASE_DIR / "output"
 TESTS_DIR = BASE_DIR / "tests"
 SCRIPTS_DIR = BASE_DIR / "scripts"
 
+from ontology_cache import OntologyCache
+from ontology_index import ContentReader, OntologyPathIndex, iter_json_content
+from executor import BlockingExecutor, WorkTimeoutError
+from jobs import JobManager, format_sse
+
+sys.path.append(str(SCRIPTS_DIR))
+from ontology_validation.ttl_checks import validate_ontologies as run_ttl_checks
+from combine_ontologies import OUTPUT_FORMATS as COMBINED_OUTPUT_FORMATS
+from utils.compression import write_compressed_siblings
+from downloads import is_not_modified, select_variant, stale_encodings
+
+# Media types for each combined ontology output format
+COMBINED_MEDIA_TYPES = {
+    "turtle": "text/turtle",
+    "nt": "application/n-triples",
+    "nt.gz": "application/gzip",
+    "nquads": "application/n-quads",
+}
+
+# Parsed-ontology cache shared by the listing and stats endpoints
+ontology_cache = OntologyCache(ONTOLOGIES_DIR)
+
+# File name -> path for /api/ontology/{name}, refreshed in the background
+ontology_index = OntologyPathIndex(
+    ONTOLOGIES_DIR, poll_interval=float(os.environ.get("ONTOLOGY_INDEX_POLL_INTERVAL", "5"))
+)
+
+# Blocking work (parsing, subprocesses, file I/O) runs here, off the event loop
+executor = BlockingExecutor.from_env()
+
+async def run_blocking(endpoint_class: str, func, *args, **kwargs):
+    """Run blocking work on the executor, mapping timeouts to 504."""
+    try:
+        return await executor.run(endpoint_class, func, *args, **kwargs)
+    except WorkTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+# Validation and combine runs are submitted as background jobs
+job_manager = JobManager(executor, result_ttl=float(os.environ.get("JOBS_RESULT_TTL", "3600")))
+
+@app.on_event("startup")
+def start_ontology_index():
+    ontology_index.start()
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    ontology_index.stop()
+    executor.shutdown()
+
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "dMaster Ontology System"}
+    return {"status": "healthy", "service": "dMaster Ontology System", "executor": executor.stats()}
 
 @app.get("/api/ontologies")
 async def get_ontologies():
     """Get list of all ontology files and their status."""
     try:
         ontologies = []
-        for root, dirs, files in os.walk(ONTOLOGIES_DIR):
-            for file in files:
-                if file.endswith('.ttl'):
-                    file_path = Path(root) / file
-                    relative_path = file_path.relative_to(ONTOLOGIES_DIR)
-                    
-                    # Check if file is valid
-                    is_valid = False
-                    error_msg = None
-                    triple_count = 0
-                    
-                    try:
-                        g = Graph()
-                        g.parse(file_path, format="turtle")
-                        is_valid = True
-                        triple_count = len(g)
-                    except Exception as e:
-                        error_msg = str(e)
-                    
-                    ontologies.append({
-                        "name": file,
-                        "path": str(relative_path),
-                        "full_path": str(file_path),
-                        "is_valid": is_valid,
-                        "error": error_msg,
-                        "triple_count": triple_count,
-                        "size": file_path.stat().st_size
-                    })
+        for file_path, parsed in await run_blocking("parse", ontology_cache.scan):
+            relative_path = file_path.relative_to(ONTOLOGIES_DIR)
+            ontologies.append({
+                "name": file_path.name,
+                "path": str(relative_path),
+                "full_path": str(file_path),
+                "is_valid": parsed.is_valid,
+                "error": parsed.error,
+                "triple_count": parsed.triple_count,
+                "class_count": parsed.class_count,
+                "property_count": parsed.property_count,
+                "size": parsed.size
+            })
         
         return {"ontologies": ontologies}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting ontologies: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/ontology/{ontology_name}")
-async def get_ontology_content(ontology_name: str):
-    """Get content of a specific ontology file."""
+async def get_ontology_content(ontology_name: str, offset: int = 0, limit: Optional[int] = None,
+                               unit: str = "lines", raw: bool = False):
+    """
+    Get content of a specific ontology file, streamed in chunks.
+
+    offset/limit page through the file by lines (or bytes with unit=bytes);
+    paged responses carry next_offset and has_more. raw=true streams the
+    text itself instead of the JSON wrapper.
+    """
     try:
-        file_path = None
-        for root, dirs, files in os.walk(ONTOLOGIES_DIR):
-            if ontology_name in files:
-                file_path = Path(root) / ontology_name
-                break
+        file_path = await run_blocking("light", ontology_index.lookup, ontology_name)
         
         if not file_path or not file_path.exists():
             raise HTTPException(status_code=404, detail="Ontology file not found")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        try:
+            reader = ContentReader(file_path, unit=unit, offset=offset, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return {"name": ontology_name, "content": content}
+        if raw:
+            return StreamingResponse(iter(reader), media_type="text/turtle; charset=utf-8")
+        return StreamingResponse(iter_json_content(ontology_name, reader), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting ontology content: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/validate")
+# Per-module progress lines in combine_ontologies.py output
+COMBINE_PROGRESS_RE = re.compile(
+    r"Loaded (?:core ontology: (?P<core>\w+)|imported ontology: (?P<imported>\w+)|(?P<main>main) ontology)"
+    r"|Error loading (?P<failed>\w+)"
+)
+
+def _stream_subprocess(args: List[str], on_line) -> Dict[str, Any]:
+    """Run a subprocess, feeding each output line to on_line as it arrives."""
+    timeout = executor.classes["process"].timeout
+    proc = subprocess.Popen(
+        args, cwd=BASE_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    # Kill the process rather than orphan it when it overruns the job budget
+    timer = threading.Timer(timeout, proc.kill) if timeout else None
+    if timer:
+        timer.start()
+    stderr_lines = []
+
+    def read_stderr():
+        # Logging output (combine progress) arrives on stderr
+        for line in proc.stderr:
+            stderr_lines.append(line)
+            on_line(line)
+
+    stderr_reader = threading.Thread(target=read_stderr, daemon=True)
+    stderr_reader.start()
+    stdout_lines = []
+    try:
+        for line in proc.stdout:
+            stdout_lines.append(line)
+            on_line(line)
+        proc.wait()
+        stderr_reader.join()
+    finally:
+        if timer:
+            timer.cancel()
+    return {
+        "success": proc.returncode == 0,
+        "stdout": "".join(stdout_lines),
+        "stderr": "".join(stderr_lines),
+        "return_code": proc.returncode
+    }
+
+def _cached_graph(file_path: Path):
+    """Graph loader for the validation checks, from the ontology cache's graph LRU."""
+    return ontology_cache.graph(file_path)
+
+def _run_validation(report) -> Dict[str, Any]:
+    def on_result(result):
+        report({
+            "module": result.module,
+            "status": "passed" if result.passed else "failed",
+            "errors": result.errors
+        })
+
+    return run_ttl_checks(ONTOLOGIES_DIR, load_graph=_cached_graph, on_result=on_result).to_dict()
+
+def _run_combine(report) -> Dict[str, Any]:
+    def on_line(line):
+        m = COMBINE_PROGRESS_RE.search(line)
+        if m:
+            if m.group("failed"):
+                report({"module": m.group("failed"), "status": "failed"})
+            else:
+                module = m.group("core") or m.group("imported") or "main_ontology"
+                report({"module": module, "status": "loaded"})
+
+    # Pretty Turtle for people and the existing tools, N-Triples for fast loading
+    result = _stream_subprocess(["python", str(SCRIPTS_DIR / "combine_ontologies.py"), "--incremental",
+                                 "--format", "turtle", "--format", "nt"], on_line)
+    combined_file = ONTOLOGIES_DIR / "combined_ontology.ttl"
+    file_exists = combined_file.exists()
+    result.update({
+        "file_created": file_exists,
+        "file_path": str(combined_file) if file_exists else None
+    })
+    return result
+
+def _job_response(job, coalesced: bool) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "coalesced": coalesced,
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events"
+    }
+
+@app.post("/api/validate", status_code=202)
 async def validate_ontologies():
-    """Run ontology validation tests."""
+    """Start an ontology validation job."""
     try:
-        # Run pytest on TTL syntax tests
-        result = subprocess.run(
-            ["python", "-m", "pytest", str(TESTS_DIR / "test_ttl_syntax.py"), "-v", "--tb=short"],
-            cwd=BASE_DIR,
-            capture_output=True,
-            text=True
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "return_code": result.returncode
-        }
+        job, coalesced = job_manager.submit("validate", _run_validation, endpoint_class="parse")
+        return _job_response(job, coalesced)
     except Exception as e:
         logger.error(f"Error running validation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/combine")
+@app.post("/api/combine", status_code=202)
 async def combine_ontologies():
-    """Combine all ontologies into a single file."""
+    """Start a job combining all ontologies into a single file."""
     try:
-        result = subprocess.run(
-            ["python", str(SCRIPTS_DIR / "combine_ontologies.py")],
-            cwd=BASE_DIR,
-            capture_output=True,
-            text=True
-        )
-        
-        combined_file = ONTOLOGIES_DIR / "combined_ontology.ttl"
-        file_exists = combined_file.exists()
-        
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "file_created": file_exists,
-            "file_path": str(combined_file) if file_exists else None
-        }
+        job, coalesced = job_manager.submit("combine", _run_combine)
+        return _job_response(job, coalesced)
     except Exception as e:
         logger.error(f"Error combining ontologies: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the status, progress and (once finished) result of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream a job's status and per-module progress as Server-Sent Events."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for event in job_manager.stream(job):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _prepare_download(file_path: Path, accept_encoding: str):
+    """Pick the variant to send, compressing first if the accepted siblings are missing or stale."""
+    if stale_encodings(file_path, accept_encoding):
+        # e.g. combined_cohorts.ttl, whose combine step does not write siblings
+        write_compressed_siblings(file_path)
+    return select_variant(file_path, accept_encoding)
+
 @app.get("/api/download/{file_type}")
-async def download_file(file_type: str):
-    """Download generated files."""
+async def download_file(file_type: str, request: Request, format: str = Query("turtle")):
+    """
+    Download generated files; the combined ontology is available in every output format.
+
+    Served pre-compressed per Accept-Encoding, with ETag/Last-Modified
+    validators (304 on a match) and byte ranges for resumable downloads.
+    """
     try:
         if file_type == "combined":
-            file_path = ONTOLOGIES_DIR / "combined_ontology.ttl"
+            if format not in COMBINED_OUTPUT_FORMATS:
+                raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+            file_path = ONTOLOGIES_DIR / COMBINED_OUTPUT_FORMATS[format]
+            media_type = COMBINED_MEDIA_TYPES[format]
+        elif file_type == "cohorts":
+            file_path = OUTPUT_DIR / "combined_cohorts.ttl"
+            media_type = "text/turtle"
         else:
             raise HTTPException(status_code=400, detail="Invalid file type")
         
-        if not file_path.exists():
+        if not await run_blocking("light", file_path.exists):
             raise HTTPException(status_code=404, detail="File not found")
         
+        # Already-gzipped outputs are sent as they are
+        accept_encoding = "" if file_path.suffix == ".gz" else request.headers.get("accept-encoding", "")
+        variant = await run_blocking("parse", _prepare_download, file_path, accept_encoding)
+        if is_not_modified(variant, request.headers.get("if-none-match"),
+                           request.headers.get("if-modified-since")):
+            return Response(status_code=304, headers=variant.headers())
+        
         return FileResponse(
-            path=str(file_path),
+            path=str(variant.path),
             filename=file_path.name,
-            media_type="text/turtle"
+            media_type=media_type,
+            headers=variant.headers()
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading file: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _save_upload(file_path: Path, content: bytes) -> None:
+    # Create uploads directory if it doesn't exist
+    file_path.parent.mkdir(exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
 @app.post("/api/upload")
 async def upload_ontology(file: UploadFile = File(...)):
     """Upload a new ontology file."""
@@ -175,34 +341,24 @@ async def upload_ontology(file: UploadFile = File(...)):
         if not file.filename.endswith('.ttl'):
             raise HTTPException(status_code=400, detail="Only .ttl files are allowed")
         
-        # Create uploads directory if it doesn't exist
-        uploads_dir = ONTOLOGIES_DIR / "uploads"
-        uploads_dir.mkdir(exist_ok=True)
-        
-        file_path = uploads_dir / file.filename
+        file_path = ONTOLOGIES_DIR / "uploads" / file.filename
         
         # Save the file
-        with open(file_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
+        content = await file.read()
+        await run_blocking("light", _save_upload, file_path, content)
         
         # Validate the uploaded file
-        is_valid = False
-        error_msg = None
-        try:
-            g = Graph()
-            g.parse(file_path, format="turtle")
-            is_valid = True
-        except Exception as e:
-            error_msg = str(e)
+        parsed = await run_blocking("parse", ontology_cache.get, file_path)
         
         return {
             "success": True,
             "filename": file.filename,
             "path": str(file_path),
-            "is_valid": is_valid,
-            "error": error_msg
+            "is_valid": parsed.is_valid,
+            "error": parsed.error
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,38 +377,41 @@ async def get_system_stats():
         
         domain_stats = {}
         
-        for root, dirs, files in os.walk(ONTOLOGIES_DIR):
-            for file in files:
-                if file.endswith('.ttl'):
-                    stats["total_ontologies"] += 1
-                    file_path = Path(root) / file
-                    
-                    # Get domain from directory name
-                    domain = Path(root).name
-                    if domain not in domain_stats:
-                        domain_stats[domain] = {"count": 0, "valid": 0, "triples": 0}
-                    
-                    domain_stats[domain]["count"] += 1
-                    
-                    try:
-                        g = Graph()
-                        g.parse(file_path, format="turtle")
-                        stats["valid_ontologies"] += 1
-                        stats["total_triples"] += len(g)
-                        domain_stats[domain]["valid"] += 1
-                        domain_stats[domain]["triples"] += len(g)
-                    except Exception:
-                        stats["invalid_ontologies"] += 1
+        for file_path, parsed in await run_blocking("parse", ontology_cache.scan):
+            stats["total_ontologies"] += 1
+            
+            # Get domain from directory name
+            domain = file_path.parent.name
+            if domain not in domain_stats:
+                domain_stats[domain] = {"count": 0, "valid": 0, "triples": 0}
+            
+            domain_stats[domain]["count"] += 1
+            
+            if parsed.is_valid:
+                stats["valid_ontologies"] += 1
+                stats["total_triples"] += parsed.triple_count
+                domain_stats[domain]["valid"] += 1
+                domain_stats[domain]["triples"] += parsed.triple_count
+            else:
+                stats["invalid_ontologies"] += 1
         
         stats["ontology_domains"] = [
             {"name": domain, **data} for domain, data in domain_stats.items()
         ]
+        stats["cache"] = ontology_cache.stats()
         
         return stats
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters for the parsed-ontology cache."""
+    return ontology_cache.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,62 @@
+import re
+
+from algorithm_sections import SectionExtractors, SectionMap
+
+ALGORITHM = """### Cohort Entry Events
+
+1. condition occurrence of 'A'.
+
+### Inclusion Criteria
+
+#### 1. Adults
+
+Entry events with age >= 18.
+
+#### 2. No prior 'B'
+
+Entry events having no condition occurrences of 'B'.
+
+### Cohort Exit
+
+Cohort Entry Events are not repeated here.
+
+### Cohort Eras
+
+Within 7 days of each other.
+"""
+
+
+def test_sections_are_offsets_into_the_text():
+    sections = SectionMap(ALGORITHM)
+    assert [(s.title, s.level) for s in sections.sections] == [
+        ("Cohort Entry Events", 3), ("Inclusion Criteria", 3), ("1. Adults", 4), ("2. No prior 'B'", 4),
+        ("Cohort Exit", 3), ("Cohort Eras", 3)]
+    inclusion = sections.get("inclusion criteria")
+    # A section runs to the next heading of its level, so it covers its subsections
+    assert ALGORITHM[inclusion.start:inclusion.end].strip().startswith("#### 1. Adults")
+    assert sections.body(sections.get("Cohort Eras")) == "Within 7 days of each other."
+    assert [s.title for s in sections.subsections(inclusion)] == ["1. Adults", "2. No prior 'B'"]
+
+
+def test_headings_need_a_line_of_their_own():
+    sections = SectionMap("### Cohort Exit ##\r\nNot a # heading\r\n#### Detail\r\n")
+    assert [(s.title, s.level) for s in sections.sections] == [("Cohort Exit", 3), ("Detail", 4)]
+
+
+def test_searches_stay_within_the_section():
+    sections = SectionMap(ALGORITHM)
+    entry, exit_ = sections.get("Cohort Entry Events"), sections.get("Cohort Exit")
+    quoted = re.compile(r"'([^']+)'")
+    assert [m.group(1) for m in sections.finditer(entry, quoted)] == ["A"]
+    assert not sections.contains(entry, "age >= 18")
+    # The title appearing in another section's text does not make that a section
+    assert sections.get("Cohort Entry Events") is entry and sections.contains(exit_, "Cohort Entry Events")
+
+
+def test_extractors_run_in_registration_order():
+    extractors = SectionExtractors()
+    extractors.register("Cohort Eras")(lambda sections, section, tag: iter([(tag, section.title)]))
+    extractors.register("Missing")(lambda sections, section, tag: iter([("never", section.title)]))
+    extractors.register("Cohort Entry Events")(lambda sections, section, tag: iter([(tag, section.title)]))
+    assert list(extractors.extract(SectionMap(ALGORITHM), "x")) == [
+        ("x", "Cohort Eras"), ("x", "Cohort Entry Events")]
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("ijson")
+
+from cohort_stream import iter_concept_set_entries, read_cohort_skeleton
+from unified_parser import CohortParserError, parse_cohort_json
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'example_input', 'cohortDefinitionOutputs')
+EXAMPLE_FILE = os.path.join(EXAMPLE_DIR, 'cohort_definition_12397.json')
+
+
+def test_skeleton_leaves_concept_entries_out():
+    with open(EXAMPLE_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    skeleton = read_cohort_skeleton(EXAMPLE_FILE)
+
+    assert {k: v for k, v in skeleton.items() if k != 'concept_sets'} == \
+        {k: v for k, v in data.items() if k != 'concept_sets'}
+    assert [s['id'] for s in skeleton['concept_sets']] == [s['id'] for s in data['concept_sets']]
+    assert all(s['expression'] == {} and s.get('resolvedConcepts', []) == [] for s in skeleton['concept_sets'])
+
+
+def test_entries_are_yielded_in_file_order():
+    with open(EXAMPLE_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    expected = []
+    for i, concept_set in enumerate(data['concept_sets']):
+        expected += [("item", i, item) for item in concept_set['expression']['items']]
+        expected += [("resolved", i, r) for r in concept_set.get('resolvedConcepts', [])]
+
+    assert list(iter_concept_set_entries(EXAMPLE_FILE)) == expected
+
+
+@pytest.mark.parametrize("name", sorted(n for n in os.listdir(EXAMPLE_DIR) if n.endswith(".json")))
+def test_streaming_gives_the_same_triples(name):
+    path = os.path.join(EXAMPLE_DIR, name)
+    assert parse_cohort_json(path, streaming=True) == parse_cohort_json(path, streaming=False)
+
+
+def test_non_object_document_is_rejected(tmp_path):
+    path = tmp_path / "list.json"
+    path.write_text("[1, 2, 3]")
+    for streaming in (False, True):
+        with pytest.raises(CohortParserError):
+            parse_cohort_json(str(path), streaming=streaming)
@@ -0,0 +1,111 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from rdflib import XSD, Dataset, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from combine_ontologies import OUTPUT_FORMATS, OntologyCombiner, load_combined_ontology, ntriples_line
+
+ONTOLOGIES_DIR = Path(__file__).parent.parent / "ontologies"
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    shutil.copytree(ONTOLOGIES_DIR, tmp_path / "ontologies",
+                    ignore=shutil.ignore_patterns(".combine_cache", "combined_ontology.*"))
+    return tmp_path
+
+
+def combine(base_dir, **kwargs):
+    combiner = OntologyCombiner(str(base_dir), **kwargs)
+    combiner.combine_ontologies()
+    return combiner
+
+
+def test_incremental_output_matches_full_combine(base_dir):
+    combine(base_dir)
+    full = (base_dir / "ontologies" / "combined_ontology.ttl").read_text()
+    combine(base_dir, incremental=True)
+    assert (base_dir / "ontologies" / "combined_ontology.ttl").read_text() == full
+
+
+def test_incremental_rebuilds_only_changed_modules(base_dir):
+    first = combine(base_dir, incremental=True)
+    assert "disease" in first.stats["rebuilt"]
+    assert not first.stats["reused"]
+
+    unchanged = combine(base_dir, incremental=True)
+    assert unchanged.stats == {"rebuilt": [], "reused": []}
+
+    disease = base_dir / "ontologies" / "disease" / "disease_core.ttl"
+    disease.write_text(disease.read_text() + (
+        '\n<http://example.org/disease-ontology#Syndrome> rdf:type owl:Class .\n'
+    ))
+    changed = combine(base_dir, incremental=True)
+    assert changed.stats["rebuilt"] == ["disease"]
+    assert "clinical" in changed.stats["reused"]
+    assert "disease:Syndrome" in (base_dir / "ontologies" / "combined_ontology.ttl").read_text()
+
+
+def test_touched_but_identical_module_is_reused(base_dir):
+    combine(base_dir, incremental=True)
+    clinical = base_dir / "ontologies" / "clinical" / "clinical_core.ttl"
+    clinical.write_text(clinical.read_text())
+    (base_dir / "ontologies" / "combined_ontology.ttl").unlink()
+
+    again = combine(base_dir, incremental=True)
+    assert again.stats["rebuilt"] == []
+    assert (base_dir / "ontologies" / "combined_ontology.ttl").exists()
+
+
+def test_broken_imported_module_is_skipped(base_dir):
+    ontologies = base_dir / "ontologies"
+    clinical = ontologies / "clinical" / "clinical_core.ttl"
+    clinical.write_text(clinical.read_text() + (
+        "\n<http://example.org/clinical-ontology> owl:imports <http://example.org/disease-ontology> .\n"
+    ))
+    (ontologies / "disease" / "disease_core.ttl").write_text("this is not turtle")
+
+    combiner = OntologyCombiner(str(base_dir))
+    loaded = combiner.load_modules(["clinical"])
+    assert loaded == ["clinical"]
+
+    combine(base_dir)
+    combined = (ontologies / "combined_ontology.ttl").read_text()
+    assert "clinical:" in combined
+
+
+def test_streamed_formats_match_turtle(base_dir):
+    combine(base_dir, output_formats=list(OUTPUT_FORMATS))
+    ontologies = base_dir / "ontologies"
+    turtle = Graph().parse(ontologies / "combined_ontology.ttl", format="turtle")
+    ntriples = Graph().parse(ontologies / "combined_ontology.nt", format="nt")
+    assert isomorphic(turtle, ntriples)
+
+    nquads = Dataset()
+    nquads.parse(ontologies / "combined_ontology.nq", format="nquads")
+    graphs = {str(g.identifier) for g in nquads.graphs() if len(g)}
+    assert "http://example.org/disease-ontology" in graphs
+    assert "http://example.org/main-ontology" in graphs
+
+    (ontologies / "combined_ontology.nt").unlink()
+    (ontologies / "combined_ontology.nq").unlink()
+    assert isomorphic(turtle, load_combined_ontology(ontologies))
+
+
+def test_ntriples_lines_round_trip():
+    s, p = URIRef("http://example.org/s"), URIRef("http://example.org/p")
+    graph = URIRef("http://example.org/g")
+    triples = [(s, p, Literal('a "quoted"\\ \nmulti-line\r text')), (s, p, Literal("label", lang="en")),
+               (s, p, Literal(5)), (s, p, Literal("1.50", datatype=XSD.decimal)), (s, p, URIRef("http://example.org/o"))]
+
+    assert ntriples_line(triples[2]) == f'<{s}> <{p}> "5"^^<{XSD.integer}> .\n'
+    parsed = Graph().parse(data="".join(ntriples_line(t) for t in triples), format="nt")
+    assert set(parsed) == set(triples)
+    dataset = Dataset().parse(data="".join(ntriples_line(t, graph) for t in triples), format="nquads")
+    assert set(dataset.graph(graph)) == set(triples)
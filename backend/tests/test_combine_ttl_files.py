@@ -0,0 +1,46 @@
+import os
+import random
+
+import combine_ttl_files as combine
+from combine_ttl_files import combine_ttl_files, external_sorted_unique
+
+
+def _write_cohort_ttls(directory, count, seed=0):
+    """count TTL files whose triples overlap, as cohorts sharing concepts do."""
+    rng = random.Random(seed)
+    os.makedirs(directory)
+    for i in range(count):
+        with open(os.path.join(directory, f"cohort_{i}.ttl"), "w", encoding="utf-8") as f:
+            f.write("@prefix : <http://example.org/> .\n@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n\n")
+            for _ in range(300):
+                concept = rng.randrange(500)
+                f.write(f':Concept{concept} rdfs:label "Concept \\"{concept}\\" é" .\n')
+            f.write(f":Cohort{i} :hasConceptSet :ConceptSet_{i} .\n")
+
+
+def test_external_sort_matches_sorted_set(tmp_path, monkeypatch):
+    # Few lines per run and two runs per merge, so there are several merge passes
+    monkeypatch.setattr(combine, "MERGE_FAN_IN", 2)
+    rng = random.Random(1)
+    lines = [f":s{rng.randrange(2000)} :p :o ." for _ in range(5000)]
+
+    merged = list(external_sorted_unique(iter(lines), 20 * (combine.LINE_OVERHEAD_BYTES + 20), str(tmp_path)))
+
+    assert merged == sorted(set(lines))
+    # Each pass replaces the runs it merged; what is left came from a later pass than the first
+    names = os.listdir(tmp_path)
+    assert 0 < len(names) <= 2
+    assert all(name.startswith("merge_") and not name.startswith("merge_1_") for name in names)
+
+
+def test_bounded_memory_combine_is_byte_identical(tmp_path):
+    input_dir = str(tmp_path / "ttl")
+    _write_cohort_ttls(input_dir, 20)
+    combine_ttl_files(input_dir, str(tmp_path / "in_memory.ttl"))
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+
+    combine_ttl_files(input_dir, str(tmp_path / "bounded.ttl"), memory_budget_mb=0.01, tmp_dir=str(spill_dir))
+
+    assert (tmp_path / "bounded.ttl").read_bytes() == (tmp_path / "in_memory.ttl").read_bytes()
+    assert list(spill_dir.iterdir()) == []
@@ -0,0 +1,60 @@
+import glob
+import os
+
+from concept_registry import ConceptRegistry, SQLiteConceptRegistry
+from rdf_terms import literal, triple
+from unified_parser import parse_cohort_json
+
+INPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'example_input', 'cohortDefinitionOutputs')
+DESCRIPTION = [triple('snomed:1', 'rdf:type', ':Concept'), triple('snomed:1', 'rdfs:label', literal('One'))]
+
+
+def test_statements_are_claimed_once():
+    registry = ConceptRegistry()
+    assert registry.claim_new(DESCRIPTION) == DESCRIPTION
+    assert registry.claim_new(DESCRIPTION) == []
+    # Only the statements that differ from what was emitted come back
+    relabelled = triple('snomed:1', 'rdfs:label', literal('Uno'))
+    assert registry.claim_new([DESCRIPTION[0], relabelled]) == [relabelled]
+    assert len(registry) == 3
+
+
+def test_sqlite_registry_is_shared_and_owned(tmp_path):
+    path = str(tmp_path / 'registry.sqlite')
+    first = SQLiteConceptRegistry.create(path)
+    second = SQLiteConceptRegistry(path)
+    first.begin('a.json')
+    assert first.claim_new(DESCRIPTION) == DESCRIPTION
+    assert first.finish() == []
+    second.begin('b.json')
+    assert second.claim_new(DESCRIPTION) == []
+    assert second.finish() == []
+
+    # Re-parsing the owner emits its statements again; dropping one hands it to its users
+    first.begin('a.json')
+    assert first.claim_new(DESCRIPTION[:1]) == DESCRIPTION[:1]
+    assert first.finish() == ['b.json']
+    second.begin('b.json')
+    assert second.claim_new(DESCRIPTION) == DESCRIPTION[1:]
+    assert second.finish() == []
+
+    assert second.forget('b.json') == []
+    assert first.forget('a.json') == []
+    assert len(first) == 0
+    first.close()
+    second.close()
+    # create starts a new run from an empty registry
+    assert len(SQLiteConceptRegistry.create(path)) == 0
+
+
+def test_shared_registry_keeps_every_statement():
+    files = sorted(glob.glob(os.path.join(INPUT_DIR, '*.json')))
+    per_cohort = [t for f in files for t in parse_cohort_json(f)]
+    registry = ConceptRegistry()
+    per_run = [t for f in files for t in parse_cohort_json(f, registry=registry)]
+
+    assert set(per_run) == set(per_cohort)
+    assert len(per_run) < len(per_cohort)
+    # Every statement about a concept is emitted at most once in the run
+    described = [t for t in per_run if t[0].value.startswith('snomed:')]
+    assert len(described) == len(set(described))
@@ -0,0 +1,61 @@
+import gzip
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from downloads import accepted_encodings, is_not_modified, select_variant, stale_encodings
+from utils.compression import write_compressed_siblings
+
+
+def make_file(tmp_path):
+    path = tmp_path / "combined.ttl"
+    path.write_text("<http://example.org/a> <http://example.org/b> <http://example.org/c> .\n" * 100)
+    return path
+
+
+def test_accepted_encodings_orders_by_quality():
+    assert accepted_encodings("gzip;q=0.5, br, identity;q=0") == ["br", "gzip"]
+    assert accepted_encodings("") == []
+
+
+def test_select_variant_prefers_fresh_compressed_sibling(tmp_path):
+    path = make_file(tmp_path)
+    assert select_variant(path, "gzip").encoding is None
+
+    write_compressed_siblings(path)
+    variant = select_variant(path, "gzip")
+    assert variant.encoding == "gzip"
+    assert gzip.decompress(variant.path.read_bytes()) == path.read_bytes()
+    assert variant.etag != select_variant(path, "").etag
+
+    # A source newer than its siblings makes them stale
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert select_variant(path, "gzip").encoding is None
+    assert "gzip" in stale_encodings(path, "gzip")
+
+
+def test_not_modified_validators(tmp_path):
+    variant = select_variant(make_file(tmp_path))
+    assert is_not_modified(variant, variant.etag, None)
+    assert is_not_modified(variant, f'"other", W/{variant.etag}', None)
+    assert not is_not_modified(variant, '"other"', None)
+    assert is_not_modified(variant, None, variant.last_modified)
+    # If-None-Match wins over If-Modified-Since
+    assert not is_not_modified(variant, '"other"', variant.last_modified)
+    assert not is_not_modified(variant, None, "Thu, 01 Jan 1970 00:00:00 GMT")
+
+
+def test_concurrent_sibling_writes_do_not_collide(tmp_path):
+    """Downloads rebuilding the same stale sibling at once each publish a complete file."""
+    path = make_file(tmp_path)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: write_compressed_siblings(path), range(32)))
+
+    assert all(result["gzip"] == results[0]["gzip"] for result in results)
+    assert gzip.decompress(results[0]["gzip"].read_bytes()) == path.read_bytes()
+    assert not list(tmp_path.glob("*.tmp"))
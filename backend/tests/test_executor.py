@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from executor import BlockingExecutor, EndpointClass, WorkTimeoutError
+
+
+def make_executor(**overrides):
+    classes = {
+        "light": EndpointClass("light", concurrency=4, timeout=5.0),
+        "heavy": EndpointClass("heavy", concurrency=1, timeout=5.0),
+    }
+    classes.update(overrides)
+    return BlockingExecutor(max_workers=4, classes=classes)
+
+
+def test_run_returns_result_off_the_loop_thread():
+    executor = make_executor()
+
+    async def main():
+        return await executor.run("light", threading.get_ident)
+
+    try:
+        assert asyncio.run(main()) != threading.get_ident()
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_timeout_raises_and_is_counted():
+    executor = make_executor(heavy=EndpointClass("heavy", concurrency=1, timeout=0.05))
+
+    async def main():
+        await executor.run("heavy", time.sleep, 0.5)
+
+    try:
+        with pytest.raises(WorkTimeoutError):
+            asyncio.run(main())
+        assert executor.stats()["classes"]["heavy"]["timeouts"] == 1
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_heavy_class_does_not_block_light_class():
+    executor = make_executor()
+    release = threading.Event()
+
+    async def main():
+        heavy = [asyncio.ensure_future(executor.run("heavy", release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        # Only one heavy call may be in flight; the others queue on the class limit
+        assert executor.stats()["classes"]["heavy"]["running"] == 1
+        assert await executor.run("light", lambda: "ok") == "ok"
+        release.set()
+        await asyncio.gather(*heavy)
+
+    try:
+        asyncio.run(main())
+        assert executor.stats()["classes"]["heavy"]["completed"] == 3
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_from_env_reads_limits(monkeypatch):
+    monkeypatch.setenv("EXECUTOR_MAX_WORKERS", "3")
+    monkeypatch.setenv("EXECUTOR_PARSE_CONCURRENCY", "5")
+    monkeypatch.setenv("EXECUTOR_PROCESS_TIMEOUT", "0")
+    executor = BlockingExecutor.from_env()
+    try:
+        assert executor.max_workers == 3
+        assert executor.classes["parse"].concurrency == 5
+        assert executor.classes["process"].timeout is None
+    finally:
+        executor.shutdown()
@@ -0,0 +1,30 @@
+import re
+
+from extraction_engine import ExtractionEngine
+
+RULES = {
+    "extraction_patterns": [
+        {"name": "Age", "predicate": "ex:age", "patterns": ["age.*?(\\d+)"]},
+        {"name": "Count", "predicate": "ex:count", "patterns": ["(\\d+) cases", "(?P<value>\\d+) per"]},
+        {"name": "Site", "predicate": "ex:site", "patterns": ["affects the (?P<value>.+?)\\n"]},
+    ]
+}
+TEXT = "Average age 40, 12 cases and 7 per 1000; it affects the Colon\nAGE 3 with 9 cases\n"
+
+
+def per_pattern_matches(rules, text):
+    """What the old nested loops produced: one finditer per pattern."""
+    found = []
+    for rule in rules["extraction_patterns"]:
+        for pattern in rule["patterns"]:
+            for m in re.finditer(pattern, text, re.IGNORECASE):
+                value = m.group("value") if "value" in m.groupdict() else m.group(1)
+                found.append((rule["predicate"], m.start(), value.strip()))
+    return found
+
+
+def test_single_scan_matches_per_pattern_scans():
+    engine = ExtractionEngine.from_rules(RULES)
+    found = [(m.pattern.predicate, m.start, m.value) for m in engine.extract(TEXT)]
+    assert found == per_pattern_matches(RULES, TEXT)
+
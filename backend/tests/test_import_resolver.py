@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from combine_ontologies import OntologyCombiner
+from import_resolver import ImportCycleError, ImportGraph, module_name_for_import, parse_modules
+
+PREFIXES = """@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix ex: <http://example.org/test#> .
+"""
+
+
+def write_module(ontology_dir, name, imports=()):
+    module_dir = ontology_dir / name
+    module_dir.mkdir(parents=True, exist_ok=True)
+    lines = [PREFIXES, f"<http://example.org/{name}-ontology> a owl:Ontology ."]
+    lines += [f"<http://example.org/{name}-ontology> owl:imports <http://example.org/{i}-ontology> ."
+              for i in imports]
+    lines.append(f"ex:{name.capitalize()}Thing a owl:Class .")
+    path = module_dir / f"{name}_core.ttl"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_module_name_for_import():
+    assert module_name_for_import("http://example.org/disease-ontology") == "disease"
+    assert module_name_for_import("http://purl.org/dc/terms/") is None
+
+
+def test_load_order_puts_imports_first():
+    graph = ImportGraph()
+    graph.add_module("main_ontology", ["disease", "drug"])
+    graph.add_module("drug", ["disease"])
+    graph.add_module("disease", [])
+    assert graph.load_order() == ["disease", "drug", "main_ontology"]
+    assert graph.imports_of("main_ontology") == ["disease", "drug"]
+
+
+def test_cycle_is_reported():
+    graph = ImportGraph()
+    graph.add_module("a", ["b"])
+    graph.add_module("b", ["a"])
+    with pytest.raises(ImportCycleError) as excinfo:
+        graph.load_order()
+    assert sorted(excinfo.value.cycles[0]) == ["a", "b"]
+
+
+def test_parse_modules_reports_errors_per_module(tmp_path):
+    good = write_module(tmp_path, "good")
+    bad = tmp_path / "bad.ttl"
+    bad.write_text("this is not turtle")
+    results = parse_modules({"good": good, "bad": bad})
+    assert results["good"].error is None and results["good"].triples
+    assert results["bad"].error
+
+
+def test_shared_import_is_parsed_once(tmp_path, monkeypatch):
+    ontology_dir = tmp_path / "ontologies"
+    write_module(ontology_dir, "base")
+    write_module(ontology_dir, "left", imports=["base"])
+    write_module(ontology_dir, "right", imports=["base"])
+
+    parsed = []
+    import combine_ontologies
+
+    def counting_parse_modules(paths, max_workers=None):
+        parsed.extend(paths)
+        return parse_modules(paths, max_workers)
+
+    monkeypatch.setattr(combine_ontologies, "parse_modules", counting_parse_modules)
+    combiner = OntologyCombiner(str(tmp_path))
+    order = combiner.load_modules(["left", "right"])
+
+    assert sorted(parsed) == ["base", "left", "right"]
+    assert order[0] == "base"
+    assert len(combiner.module_graph("base")) == 2
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from executor import BlockingExecutor, EndpointClass
+from jobs import JobManager, JobStatus, format_sse
+
+
+def make_manager(result_ttl=3600.0):
+    executor = BlockingExecutor(
+        max_workers=2,
+        classes={"process": EndpointClass("process", concurrency=2, timeout=5.0)},
+    )
+    return JobManager(executor, result_ttl=result_ttl), executor
+
+
+async def wait_finished(job):
+    while not job.finished:
+        await asyncio.sleep(0.01)
+
+
+def test_identical_jobs_are_coalesced():
+    manager, executor = make_manager()
+    release = threading.Event()
+    calls = []
+
+    def work(report):
+        calls.append(1)
+        release.wait(5)
+        return {"success": True}
+
+    async def main():
+        first, coalesced_first = manager.submit("combine", work)
+        second, coalesced_second = manager.submit("combine", work)
+        other, _ = manager.submit("validate", lambda report: "ok")
+        release.set()
+        await wait_finished(first)
+        await wait_finished(other)
+        return first, coalesced_first, second, coalesced_second, other
+
+    try:
+        first, coalesced_first, second, coalesced_second, other = asyncio.run(main())
+        assert first is second
+        assert not coalesced_first and coalesced_second
+        assert other is not first
+        assert len(calls) == 1
+        assert first.status == JobStatus.SUCCEEDED
+        assert first.result == {"success": True}
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_stream_replays_progress_and_final_status():
+    manager, executor = make_manager()
+
+    def work(report):
+        for module in ("clinical", "disease"):
+            report({"module": module, "status": "loaded"})
+            time.sleep(0.01)
+        return "done"
+
+    async def main():
+        job, _ = manager.submit("combine", work)
+        return [event async for event in manager.stream(job)]
+
+    try:
+        events = asyncio.run(main())
+        assert [e.get("module") for e in events if e["type"] == "progress"] == ["clinical", "disease"]
+        assert events[-1] == {"type": "status", "status": "succeeded", "error": None}
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_failed_job_records_error():
+    manager, executor = make_manager()
+
+    def work(report):
+        raise RuntimeError("boom")
+
+    async def main():
+        job, _ = manager.submit("validate", work)
+        await wait_finished(job)
+        return job
+
+    try:
+        job = asyncio.run(main())
+        assert job.status == JobStatus.FAILED
+        assert job.error == "boom"
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_finished_jobs_expire_after_ttl():
+    manager, executor = make_manager(result_ttl=0.05)
+
+    async def main():
+        job, _ = manager.submit("validate", lambda report: "ok")
+        await wait_finished(job)
+        assert manager.get(job.id) is job
+        await asyncio.sleep(0.1)
+        return job
+
+    try:
+        job = asyncio.run(main())
+        assert manager.get(job.id) is None
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_format_sse():
+    assert format_sse({"type": "progress", "module": "x"}) == (
+        'event: progress\ndata: {"type": "progress", "module": "x"}\n\n'
+    )
@@ -0,0 +1,163 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ontology_cache
+from ontology_cache import OntologyCache
+
+VALID_TTL = """@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix : <http://example.org/test-ontology#> .
+
+:Thing rdf:type owl:Class ;
+    rdfs:label "Thing" .
+
+:relatesTo rdf:type owl:ObjectProperty .
+"""
+
+
+def write(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_repeat_lookup_is_a_hit(tmp_path):
+    ttl = write(tmp_path / "test" / "test_core.ttl", VALID_TTL)
+    cache = OntologyCache(tmp_path)
+
+    first = cache.get(ttl)
+    second = cache.get(ttl)
+
+    assert first is second
+    assert first.is_valid
+    assert first.triple_count == 3
+    assert first.class_count == 1
+    assert first.property_count == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_file_is_reparsed(tmp_path):
+    ttl = write(tmp_path / "test_core.ttl", VALID_TTL)
+    cache = OntologyCache(tmp_path)
+    cache.get(ttl)
+
+    write(ttl, VALID_TTL + ':Other rdf:type owl:Class .\n')
+    st = ttl.stat()
+    os.utime(ttl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    result = cache.get(ttl)
+    assert result.class_count == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_touched_file_with_same_content_is_not_reparsed(tmp_path):
+    ttl = write(tmp_path / "test_core.ttl", VALID_TTL)
+    cache = OntologyCache(tmp_path)
+    cache.get(ttl)
+
+    st = ttl.stat()
+    os.utime(ttl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    cache.get(ttl)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalid_file_reports_error(tmp_path):
+    ttl = write(tmp_path / "broken.ttl", "this is not turtle")
+    result = OntologyCache(tmp_path).get(ttl)
+    assert not result.is_valid
+    assert result.error
+
+
+def test_scan_prunes_deleted_files(tmp_path):
+    keep = write(tmp_path / "a" / "a_core.ttl", VALID_TTL)
+    gone = write(tmp_path / "b" / "b_core.ttl", VALID_TTL.replace("Thing", "Other"))
+    cache = OntologyCache(tmp_path)
+    assert len(cache.scan()) == 2
+
+    gone.unlink()
+    entries = cache.scan()
+    assert [path for path, _ in entries] == [keep]
+    assert cache.stats()["files"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_concurrent_lookups_parse_once(tmp_path, monkeypatch):
+    ttl = write(tmp_path / "test_core.ttl", VALID_TTL)
+    cache = OntologyCache(tmp_path)
+    release = threading.Event()
+    calls = []
+    parse = ontology_cache._parse_graph
+
+    def slow_parse(*args):
+        calls.append(args)
+        release.wait(5)
+        return parse(*args)
+
+    monkeypatch.setattr(ontology_cache, "_parse_graph", slow_parse)
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(cache.get, ttl) for _ in range(4)]
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 3
+
+
+def test_hit_is_not_blocked_by_a_parse(tmp_path, monkeypatch):
+    warm = write(tmp_path / "a_core.ttl", VALID_TTL)
+    cold = write(tmp_path / "b_core.ttl", VALID_TTL.replace("Thing", "Other"))
+    cache = OntologyCache(tmp_path)
+    cache.get(warm)
+    started, release = threading.Event(), threading.Event()
+    parse = ontology_cache._parse_graph
+
+    def slow_parse(*args):
+        started.set()
+        release.wait(5)
+        return parse(*args)
+
+    monkeypatch.setattr(ontology_cache, "_parse_graph", slow_parse)
+    with ThreadPoolExecutor(1) as pool:
+        parsing = pool.submit(cache.get, cold)
+        assert started.wait(5)
+        assert cache.get(warm).is_valid
+        assert not parsing.done()
+        release.set()
+        assert parsing.result().is_valid
+
+
+def test_graphs_are_kept_in_a_bounded_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(ontology_cache, "GRAPH_CACHE_SIZE", 2)
+    files = [write(tmp_path / f"m{i}_core.ttl", VALID_TTL.replace("Thing", f"Thing{i}")) for i in range(3)]
+    cache = OntologyCache(tmp_path)
+
+    first = cache.graph(files[0])
+    assert len(first) == 3
+    assert cache.graph(files[0]) is first
+    assert not hasattr(cache.get(files[0]), "graph")
+    for ttl in files[1:]:
+        cache.graph(ttl)
+
+    assert cache.stats()["graphs"] == 2
+    assert cache.stats()["entries"] == 3
+    assert cache.graph(files[0]) is not first
+
+
+def test_graph_of_invalid_file_raises(tmp_path):
+    ttl = write(tmp_path / "broken.ttl", "this is not turtle")
+    cache = OntologyCache(tmp_path)
+    with pytest.raises(ValueError):
+        cache.graph(ttl)
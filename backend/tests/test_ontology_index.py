@@ -0,0 +1,74 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ontology_index import ContentReader, OntologyPathIndex, iter_json_content
+
+
+def test_index_finds_files_added_after_build(tmp_path):
+    (tmp_path / "disease").mkdir()
+    (tmp_path / "disease" / "disease_core.ttl").write_text("")
+    index = OntologyPathIndex(tmp_path, poll_interval=0)
+    index.start()
+    assert index.lookup("disease_core.ttl") == tmp_path / "disease" / "disease_core.ttl"
+
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "new.ttl").write_text("")
+    assert index.lookup("new.ttl") == tmp_path / "uploads" / "new.ttl"
+    assert index.lookup("missing.ttl") is None
+
+
+def test_line_pages_cover_the_file(tmp_path):
+    path = tmp_path / "a.ttl"
+    lines = [f"line {i}\n" for i in range(10)]
+    path.write_text("".join(lines))
+
+    pages, offset = [], 0
+    while offset is not None:
+        reader = ContentReader(path, offset=offset, limit=4, chunk_size=8)
+        pages.append("".join(reader))
+        offset = reader.next_offset
+    assert pages == ["".join(lines[0:4]), "".join(lines[4:8]), "".join(lines[8:])]
+
+
+def test_byte_pages_do_not_split_characters(tmp_path):
+    path = tmp_path / "a.ttl"
+    text = 'ex:a rdfs:label "Sjögren–Larsson" .\n'
+    path.write_text(text, encoding="utf-8")
+
+    pages, offset = [], 0
+    while offset is not None:
+        reader = ContentReader(path, unit="bytes", offset=offset, limit=18, chunk_size=5)
+        pages.append("".join(reader))
+        offset = reader.next_offset
+    assert "".join(pages) == text
+    assert all("�" not in page for page in pages)
+
+
+def test_byte_pages_always_advance(tmp_path):
+    path = tmp_path / "a.ttl"
+    path.write_text("ö\U0001F600\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        ContentReader(path, unit="bytes", limit=1)
+
+    pages, offset = [], 0
+    while offset is not None:
+        reader = ContentReader(path, unit="bytes", offset=offset, limit=4, chunk_size=1)
+        pages.append("".join(reader))
+        assert reader.next_offset is None or reader.next_offset > offset
+        offset = reader.next_offset
+    assert pages == ["ö", "\U0001F600", "\n"]
+
+
+def test_json_content_stream_is_valid_json(tmp_path):
+    path = tmp_path / "a.ttl"
+    path.write_text('ex:a rdfs:comment "say \\"hi\\"" .\n')
+    body = "".join(iter_json_content("a.ttl", ContentReader(path, limit=1)))
+    assert json.loads(body) == {
+        "name": "a.ttl", "unit": "lines", "offset": 0,
+        "content": path.read_text(), "next_offset": None, "has_more": False,
+    }
@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_import_time import failures as import_failures, run as measure_import
+from parser_context import DEFAULT_CORE_BASE_PATH, DEFAULT_RULES_PATH, ParserContext
+
+
+@pytest.fixture
+def sources(tmp_path):
+    rules = tmp_path / "extraction_rules.yaml"
+    shutil.copy(DEFAULT_RULES_PATH, rules)
+    return str(rules), DEFAULT_CORE_BASE_PATH, str(tmp_path / "cache")
+
+
+def test_import_is_side_effect_free():
+    """Importing unified_parser neither loads yaml nor writes a log file."""
+    report = measure_import(runs=1)
+    assert report["lazy_modules_imported"] == []
+    assert report["files_created"] == []
+
+
+def test_import_time_is_gated_against_the_baseline():
+    baseline = {"python": "3.11.7", "median_ms": 50.0}
+    report = {"python": "3.11.7", "median_ms": 60.0, "lazy_modules_imported": [], "files_created": []}
+    assert import_failures(report, baseline=baseline, tolerance=0.25) == []
+    assert import_failures(dict(report, median_ms=63.0), baseline=baseline, tolerance=0.25)
+    assert import_failures(report, baseline=dict(baseline, python="3.12.0"))
+
+
+def test_context_loads_once_from_cache(sources, monkeypatch):
+    first = ParserContext(*sources)
+    assert "disease:InflammatoryBowelDisease" in first.class_index
+    assert len(os.listdir(sources[2])) == 1
+
+    # A warm start does not build anything
+    monkeypatch.setattr(ParserContext, "_build", lambda *args: pytest.fail("cache not used"))
+    second = ParserContext(*sources)
+    assert second.rules == first.rules
+    assert second.class_index.superclasses == first.class_index.superclasses
+    assert [m.value for m in second.engine.extract("Crohn's disease")] == \
+        [m.value for m in first.engine.extract("Crohn's disease")]
+
+
+def test_changed_rules_rebuild_the_cache(sources):
+    rules_path, _, cache_dir = sources
+    before = ParserContext(*sources).rules
+    cached_before = os.listdir(cache_dir)
+    with open(rules_path, "a", encoding="utf-8") as f:
+        f.write("\n# edited\n")
+    assert ParserContext(*sources).rules == before
+    # Only the entry for the current sources is kept
+    cached_after = os.listdir(cache_dir)
+    assert len(cached_after) == 1 and cached_after != cached_before
+
+
+def test_missing_core_base_gives_empty_ontology(sources, tmp_path):
+    context = ParserContext(sources[0], str(tmp_path / "missing.json"), cache_dir=None)
+    assert context.core_ontology["classes"] == []
+    assert len(context.class_index) == 0
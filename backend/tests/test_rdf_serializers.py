@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from rdflib import Graph, Literal, URIRef, XSD
+
+import rdf_serializers
+from rdf_serializers import (NQuadsSerializer, NTriplesSerializer, RDFLibSink, TripleSerializer, TurtleSerializer,
+                             escape_iri)
+from rdf_terms import iri, literal, name, parse_prefixes, triple
+
+PREFIXES = "@prefix : <http://example.org/cohort/> .\n@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n" \
+           "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n\n"
+NAMESPACES = parse_prefixes(PREFIXES)
+TRIPLES = [
+    triple(':Cohort1', 'rdfs:label', literal('Line one\nsaid "two"\\')),
+    triple(':Cohort1', ':hasSize', literal(12, 'xsd:integer')),
+    triple(':Cohort1', ':source', iri('https://atlas.example.org/#/cohort 1')),
+]
+
+
+def test_names_are_interned():
+    assert name(':Cohort1') is triple(':Cohort1', 'rdfs:label', ':x')[0]
+    assert literal('a') == literal('a') and literal('1', 'xsd:integer') != literal('1')
+
+
+def test_turtle_escapes_once_and_round_trips():
+    out = io.StringIO()
+    assert TurtleSerializer(PREFIXES).write(TRIPLES, out) == 3
+    text = out.getvalue()
+    assert ':Cohort1 rdfs:label "Line one\\nsaid \\"two\\"\\\\" .' in text
+    assert '<https://atlas.example.org/#/cohort%201>' in text
+
+    g = Graph().parse(data=text, format="turtle")
+    label = g.value(URIRef('http://example.org/cohort/Cohort1'), URIRef('http://www.w3.org/2000/01/rdf-schema#label'))
+    assert str(label) == 'Line one\nsaid "two"\\'
+
+
+def test_all_backends_give_the_same_graph():
+    turtle, nt, nq = io.StringIO(), io.StringIO(), io.StringIO()
+    TurtleSerializer(PREFIXES).write(TRIPLES, turtle)
+    NTriplesSerializer(NAMESPACES).write(TRIPLES, nt)
+    NQuadsSerializer(NAMESPACES, 'http://example.org/graph').write(TRIPLES, nq)
+    direct = Graph()
+    RDFLibSink(direct, NAMESPACES).add(TRIPLES)
+
+    expected = set(Graph().parse(data=turtle.getvalue(), format="turtle"))
+    assert set(Graph().parse(data=nt.getvalue(), format="nt")) == expected
+    assert all(line.endswith('<http://example.org/graph> .') for line in nq.getvalue().splitlines())
+    assert set(direct) == expected
+    assert (URIRef('http://example.org/cohort/Cohort1'), URIRef('http://example.org/cohort/hasSize'),
+            Literal('12', datatype=XSD.integer)) in direct
+
+
+def test_sink_adds_in_batches(monkeypatch):
+    monkeypatch.setattr(rdf_serializers, "WRITE_BATCH_SIZE", 2)
+    batches = []
+
+    class CountingGraph(Graph):
+        def addN(self, quads):
+            quads = list(quads)
+            batches.append(len(quads))
+            return super().addN(quads)
+
+    graph = CountingGraph()
+    assert RDFLibSink(graph, NAMESPACES).add(TRIPLES) == 3
+    assert batches == [2, 1]
+    assert len(graph) == 3
+
+
+def test_serializer_base_is_abstract():
+    with pytest.raises(TypeError):
+        TripleSerializer()
+
+
+def test_escape_iri_leaves_valid_iris_alone():
+    assert escape_iri('http://example.org/a?b=c#d') == 'http://example.org/a?b=c#d'
+    assert escape_iri('http://example.org/{x}') == 'http://example.org/%7Bx%7D'
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+
+from combine_ttl_files import combine_ttl_files
+from run_all_parsers import ParserRunner, parse_batch
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+INPUT_DIR = os.path.join(PROJECT_ROOT, 'example_input', 'cohortDefinitionOutputs')
+
+
+def test_parse_batch_returns_structured_results(tmp_path):
+    """Good files produce TTL, bad ones come back as results with the error type."""
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text("{not json")
+    json_files = [os.path.join(INPUT_DIR, 'cohort_definition_10616.json'), str(invalid)]
+
+    results = parse_batch(json_files, str(tmp_path / "ttl"), max_workers=2)
+
+    assert [r.input_file for r in results] == json_files
+    good, bad = results
+    assert good.success and good.triple_count > 0
+    assert os.path.exists(good.output_file)
+    assert not bad.success
+    assert bad.error_type == "CohortParserError"
+    assert "Invalid JSON" in bad.error
+
+
+def test_parse_batch_describes_each_concept_once(tmp_path):
+    """With a shared registry, no TTL file of the batch repeats another's concept statements."""
+    json_files = [os.path.join(INPUT_DIR, name) for name in
+                  ('cohort_definition_10616.json', 'cohort_definition_10616_extended.json')]
+
+    results = parse_batch(json_files, str(tmp_path / "ttl"), max_workers=2,
+                          registry_path=str(tmp_path / "registry.sqlite"))
+
+    assert all(r.success for r in results)
+    concept_lines = []
+    for result in results:
+        with open(result.output_file, encoding='utf-8') as f:
+            concept_lines += [line for line in f if line.startswith('snomed:')]
+    assert concept_lines and len(concept_lines) == len(set(concept_lines))
+
+
+def _parse(input_dir, output_dir, full=False):
+    runner = ParserRunner(full=full)
+    runner.input_dir = str(input_dir)
+    runner.output_dir = str(output_dir)
+    runner.registry_path = str(output_dir / '.concept_registry.sqlite')
+    runner.manifest_path = str(output_dir / '.ingest_manifest.json')
+    os.makedirs(runner.output_dir, exist_ok=True)
+    runner.changed = runner.parse_inputs(sorted(str(p) for p in input_dir.glob('*.json')))
+    return runner
+
+
+def _combined(output_dir):
+    combined = str(output_dir) + '.combined.ttl'
+    combine_ttl_files(str(output_dir), combined)
+    with open(combined, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_incremental_run_matches_full_run(tmp_path):
+    """Only changed inputs and the cohorts depending on deleted ones are parsed again."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    names = ['cohort_definition_10616.json', 'cohort_definition_10616_extended.json', 'cohort_definition_12397.json']
+    for name in names:
+        shutil.copy(os.path.join(INPUT_DIR, name), input_dir / name)
+    output_dir = tmp_path / "incremental"
+
+    assert _parse(input_dir, output_dir).stats['successful'] == 3
+    again = _parse(input_dir, output_dir)
+    assert not again.changed and again.results == [] and again.stats['unchanged'] == 3
+
+    # The extended cohort shares concepts whose descriptions the deleted one carried
+    os.remove(input_dir / names[0])
+    after_delete = _parse(input_dir, output_dir)
+    assert after_delete.changed and after_delete.stats['deleted'] == 1
+    assert [os.path.basename(r.input_file) for r in after_delete.results] == [names[1]]
+    assert not os.path.exists(output_dir / "cohort_definition_10616.ttl")
+
+    _parse(input_dir, tmp_path / "full", full=True)
+    assert _combined(output_dir) == _combined(tmp_path / "full")
+
+
+def test_profiled_run_reports_stages(tmp_path):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    for name in ('cohort_definition_10616.json', 'cohort_definition_10616_extended.json'):
+        shutil.copy(os.path.join(INPUT_DIR, name), input_dir)
+    runner = ParserRunner(profile=True)
+    runner.input_dir = str(input_dir)
+    runner.output_dir = str(tmp_path / 'ttl')
+    runner.registry_path = str(tmp_path / 'ttl' / '.concept_registry.sqlite')
+    runner.manifest_path = str(tmp_path / 'ttl' / '.ingest_manifest.json')
+    runner.profile_path = str(tmp_path / 'profile.json')
+    os.makedirs(runner.output_dir)
+
+    runner.parse_inputs(sorted(str(p) for p in input_dir.glob('*.json')))
+
+    with open(runner.profile_path, encoding='utf-8') as f:
+        profile = json.load(f)
+    assert profile["cohorts"] == 2
+    assert {"read", "concept_sets", "format", "ttl_validation", "write"} <= set(profile["stages"])
+    assert profile["stages"]["concept_sets"]["total_triples"] > 0
+    assert runner.batch_profile.report_lines()
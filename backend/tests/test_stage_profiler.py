@@ -0,0 +1,80 @@
+import os
+
+from stage_profiler import BatchProfile, StageProfiler, percentile
+from unified_parser import parse_cohort_json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+INPUT_DIR = os.path.join(PROJECT_ROOT, 'example_input', 'cohortDefinitionOutputs')
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _slow_items(count, delay, clock):
+    for i in range(count):
+        clock.sleep(delay)
+        yield i
+
+
+def test_nested_stages_are_charged_self_time():
+    clock = FakeClock()
+    profiler = StageProfiler(clock=clock)
+
+    def outer():
+        yield "first"
+        yield from profiler.wrap("inner", _slow_items(2, 0.25, clock))
+
+    with profiler.stage("consume"):
+        items = list(profiler.wrap("outer", outer()))
+        clock.sleep(0.5)
+
+    assert items == ["first", 0, 1]
+    stages = profiler.to_dict()
+    assert [stages[name]["triples"] for name in ("outer", "inner")] == [3, 2]
+    assert stages["inner"]["seconds"] == 0.5
+    # The outer generator and its consumer do nothing themselves
+    assert stages["outer"]["seconds"] == 0.0
+    assert stages["consume"]["seconds"] == 0.5
+    assert abs(profiler.total_seconds() - sum(s["seconds"] for s in stages.values())) < 1e-9
+
+
+def test_batch_profile_summaries_and_outliers():
+    batch = BatchProfile()
+    for i in range(10):
+        batch.add(f"cohort{i}", {"read": {"seconds": 0.001 * (i + 1), "triples": 0, "calls": 1},
+                                 "concept_sets": {"seconds": 0.01, "triples": 100, "calls": 1}})
+    batch.add("huge", {"read": {"seconds": 0.001, "triples": 0, "calls": 1},
+                       "concept_sets": {"seconds": 1.0, "triples": 9000, "calls": 1}})
+    batch.add("failed", {})
+
+    data = batch.to_dict()
+    assert data["cohorts"] == 11
+    assert data["stages"]["read"]["seconds"]["p50"] == percentile([0.001] + [0.001 * (i + 1) for i in range(10)], 0.5)
+    assert data["stages"]["concept_sets"]["seconds"]["max"] == 1.0
+    assert data["stages"]["concept_sets"]["total_triples"] == 10000
+    assert [o["cohort"] for o in data["outliers"]] == ["huge"]
+    assert any("Outlier: huge" in line and "concept_sets" in line for line in batch.report_lines())
+
+
+def test_profiling_does_not_change_the_triples():
+    json_file = os.path.join(INPUT_DIR, 'cohort_definition_10616.json')
+    profiler = StageProfiler()
+
+    triples = parse_cohort_json(json_file, profiler=profiler)
+
+    assert triples == parse_cohort_json(json_file)
+    stages = profiler.to_dict()
+    assert {"read", "validation", "cohort", "concept_sets", "title"} <= set(stages)
+    # The clinical description's triples pass through (and count for) the title stage too
+    top_level = ("cohort", "evaluation_summary", "algorithm", "concept_sets", "title")
+    assert sum(stages[name]["triples"] for name in top_level if name in stages) == len(triples)
@@ -0,0 +1,44 @@
+import copy
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_throughput import compare
+from benchmarks.synthetic_cohorts import CohortShape, generate_cohort, write_cohorts
+from unified_parser import format_triple, parse_cohort_json
+
+
+def test_generated_cohorts_follow_the_shape(tmp_path):
+    shape = CohortShape(concept_sets=4, items_per_set=3, resolved_per_set=5, source_per_set=2,
+                        description_words=400, vocabularies={"RxNorm": 1.0})
+    paths = write_cohorts(tmp_path, 3, shape, seed=7)
+
+    cohort = generate_cohort(1, shape, seed=7)
+    # Cohort i is the same document whatever the count
+    assert generate_cohort(1, shape, seed=7) == cohort
+    assert len(cohort["concept_sets"]) == 4
+    assert all(len(s["expression"]["items"]) == 3 and len(s["resolvedConcepts"]) == 5
+               for s in cohort["concept_sets"])
+    assert {c["vocabularyId"] for s in cohort["concept_sets"] for c in s["resolvedConcepts"]} == {"RxNorm"}
+    assert len(cohort["clinical_description"].split()) >= 400
+
+    triples = parse_cohort_json(str(paths[1]))
+    predicates = {format_triple(t).split()[1] for t in triples}
+    assert {":hasConceptSet", ":hasResolvedConcept", ":hasInclusionRule", "disease:hasIncidence"} <= predicates
+
+
+def test_compare_flags_regressions_and_output_changes():
+    entry = {"triples": 100, "combined_bytes": 1000, "triples_per_sec": 1000.0, "files_per_sec": 10.0,
+             "peak_rss_mb": 50.0}
+    baseline = {"shape": CohortShape().to_dict(), "seed": 0, "sizes": {"10": entry}}
+    report = copy.deepcopy(baseline)
+    assert compare(report, baseline, 0.25) == {"regressions": [], "output_changes": []}
+
+    report["sizes"]["10"].update(triples_per_sec=700.0, peak_rss_mb=70.0, combined_bytes=1200)
+    found = compare(report, baseline, 0.25)
+    assert len(found["regressions"]) == 2
+    assert found["output_changes"] == ["10 cohorts: combined_bytes 1000 -> 1200"]
+
+    report["seed"] = 1
+    assert "not comparable" in compare(report, baseline, 0.25)["regressions"][0]
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+from ontology_validation.ttl_checks import validate_ontologies
+
+CORE_TTL = """@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix : <http://example.org/{name}-ontology#> .
+
+:{cls} rdf:type {kind} .
+"""
+
+
+def write_module(root: Path, name: str, content: str) -> Path:
+    path = root / name / f"{name}_core.ttl"
+    path.parent.mkdir(parents=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_reports_per_file_failures(tmp_path):
+    write_module(tmp_path, "good", CORE_TTL.format(name="good", cls="Good", kind="owl:Class"))
+    write_module(tmp_path, "noclass", CORE_TTL.format(name="noclass", cls="p", kind="owl:ObjectProperty"))
+    write_module(tmp_path, "broken", "not turtle at all")
+
+    report = validate_ontologies(tmp_path)
+    by_module = {result.module: result for result in report.files}
+
+    assert not report.passed
+    assert by_module["good"].passed
+    assert [c.name for c in by_module["noclass"].checks if not c.passed] == ["classes"]
+    assert [c.name for c in by_module["broken"].checks] == ["syntax"]
+    assert report.to_dict()["failed_files"] == 2
+
+
+def test_each_file_is_loaded_once(tmp_path):
+    from rdflib import Graph
+
+    write_module(tmp_path, "a", CORE_TTL.format(name="a", cls="A", kind="owl:Class"))
+    write_module(tmp_path, "b", CORE_TTL.format(name="b", cls="B", kind="owl:Class"))
+    loads = []
+
+    def load_graph(path):
+        loads.append(path)
+        return Graph().parse(path, format="turtle")
+
+    seen = []
+    report = validate_ontologies(tmp_path, load_graph=load_graph, on_result=seen.append)
+
+    assert report.passed
+    assert sorted(p.name for p in loads) == ["a_core.ttl", "b_core.ttl"]
+    assert [r.module for r in seen] == ["a", "b"]
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from combine_ttl_files import combine_ttl_files
+from run_all_parsers import parse_batch
+from ttl_io import AtomicTextWriter, open_text, sniff_compression
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+INPUT_DIR = os.path.join(PROJECT_ROOT, 'example_input', 'cohortDefinitionOutputs')
+LINES = [f":s{i} :p \"line {i}\" .\n" for i in range(10000)]
+
+
+@pytest.mark.parametrize("suffix, compression", [(".ttl", None), (".ttl.gz", "gzip"), (".ttl.xz", "lzma")])
+def test_writer_round_trips_through_open_text(tmp_path, suffix, compression):
+    path = str(tmp_path / f"out{suffix}")
+    with AtomicTextWriter(path) as f:
+        f.write("@prefix : <http://example.org/> .\n")
+        f.writelines(LINES)
+
+    assert sniff_compression(path) == compression
+    with open_text(path) as f:
+        assert f.read() == "@prefix : <http://example.org/> .\n" + "".join(LINES)
+    assert os.listdir(tmp_path) == [f"out{suffix}"]
+
+
+def test_gzip_output_is_reproducible(tmp_path):
+    contents = []
+    for name in ("a.ttl.gz", "b.ttl.gz"):
+        with AtomicTextWriter(str(tmp_path / name)) as f:
+            f.writelines(LINES)
+        contents.append((tmp_path / name).read_bytes())
+    assert contents[0] == contents[1]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "out.ttl"
+    path.write_text("old\n")
+    with pytest.raises(RuntimeError):
+        with AtomicTextWriter(str(path)) as f:
+            f.writelines(LINES)
+            raise RuntimeError("parse failed")
+    assert path.read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["out.ttl"]
+
+
+def test_combine_reads_compressed_outputs(tmp_path):
+    json_files = [os.path.join(INPUT_DIR, name) for name in
+                  ('cohort_definition_10616.json', 'cohort_definition_10645.json')]
+    parse_batch(json_files, str(tmp_path / "plain"), max_workers=1)
+    results = parse_batch(json_files, str(tmp_path / "gzip"), max_workers=1, compression="gzip")
+    assert all(r.output_file.endswith(".ttl.gz") for r in results)
+
+    combine_ttl_files(str(tmp_path / "plain"), str(tmp_path / "plain.ttl"))
+    combine_ttl_files(str(tmp_path / "gzip"), str(tmp_path / "gzip.ttl.xz"))
+    with open_text(str(tmp_path / "gzip.ttl.xz")) as f:
+        assert f.read() == (tmp_path / "plain.ttl").read_text()
@@ -0,0 +1,40 @@
+from ttl_validation import StatementValidator, validate_statements, validate_turtle_text
+
+PREFIXES = "@prefix : <http://example.org/cohort/> .\n@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n\n"
+
+
+def test_valid_statements_have_no_issues():
+    assert validate_statements(PREFIXES, [":a :b :c .", ':a rdfs:label "A" .']) == []
+
+
+def test_every_bad_statement_is_reported_with_its_position():
+    statements = [
+        ":a :b :c .",
+        ':a rdfs:label "two\nlines" .',
+        ":d :e :f .",
+        ":g :h undeclared:x .",
+    ]
+    issues = validate_statements(PREFIXES, statements)
+    assert [(i.line, i.column) for i in issues] == [(5, 19), (8, 7)]
+    assert "newline" in issues[0].message
+    assert "undeclared" in issues[1].message
+
+
+def test_first_error_in_document():
+    issues = validate_turtle_text(PREFIXES + ":a :b .\n")
+    assert len(issues) == 1 and issues[0].line == 4
+
+
+def test_chunked_validation_matches_whole_document():
+    statements = [":a :b :c .", ':a rdfs:label "two\nlines" .', ":d :e :f .", ":g :h undeclared:x .", ":i :j :k ."]
+    validator = StatementValidator(PREFIXES, chunk_size=2)
+    for statement in statements:
+        validator.add(statement)
+    assert validator.close() == validate_statements(PREFIXES, statements)
+
+
+def test_chunked_validation_reports_bad_prefixes_only():
+    validator = StatementValidator("@prefix : <http://example.org/> \n", chunk_size=1)
+    validator.add(":a :b :c .")
+    issues = validator.close()
+    assert len(issues) == 1 and issues[0].line == 2
@@ -1,7 +1,10 @@
 import os
 import pytest
 import json
-from unified_parser import parse_cohort_json, write_triples_to_file
+import types
+from unified_parser import (ClassIndex, CohortParserError, _is_subclass_of, _is_valid_class, format_triple,
+                            iter_cohort_triples, parse_cohort_json, parse_human_readable_algorithm, write_cohort_ttl,
+                            write_triples_to_file)
 
 # Define paths relative to the project root
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
@@ -53,3 +56,75 @@ def test_parse_invalid_json():
     triples = parse_cohort_json(invalid_json_file)
     assert triples is None or len(triples) == 0, "Should not generate triples for invalid JSON"
 
+def test_class_index_subsumption():
+    """Transitive superclasses are precomputed, including across subClassOf cycles."""
+    index = ClassIndex([
+        {"id": "ex:A", "subClassOf": []},
+        {"id": "ex:B", "subClassOf": ["ex:A"]},
+        {"id": "ex:C", "subClassOf": ["ex:B", "ex:External"]},
+        {"id": "ex:X", "subClassOf": ["ex:Y"]},
+        {"id": "ex:Y", "subClassOf": ["ex:X", "ex:A"]},
+    ])
+    assert "ex:C" in index and "ex:External" not in index
+    assert index.is_subclass_of("ex:C", "ex:A")
+    assert index.is_subclass_of("ex:C", "ex:External")
+    assert not index.is_subclass_of("ex:A", "ex:C")
+    assert index.is_subclass_of("ex:X", "ex:A")
+    assert index.is_subclass_of("ex:Y", "ex:Y")
+
+def test_core_ontology_class_lookups():
+    """The module-level helpers answer from the index built over core_base.json."""
+    assert _is_valid_class("disease:InflammatoryBowelDisease")
+    assert not _is_valid_class("disease:NotAClass")
+    assert _is_subclass_of("disease:InflammatoryBowelDisease", "disease:Disease")
+
+def test_write_cohort_ttl_streams_the_same_document():
+    """The generator pipeline writes what parse_cohort_json + write_triples_to_file write."""
+    json_file = os.path.join(INPUT_DIR, 'cohort_definition_10616.json')
+    listed_file = os.path.join(OUTPUT_DIR, 'listed.ttl')
+    streamed_file = os.path.join(OUTPUT_DIR, 'streamed.ttl')
+
+    assert isinstance(iter_cohort_triples(json_file), types.GeneratorType)
+    count = write_triples_to_file(parse_cohort_json(json_file), listed_file)
+    assert write_cohort_ttl(json_file, streamed_file) == count
+    with open(listed_file, 'rb') as a, open(streamed_file, 'rb') as b:
+        assert a.read() == b.read()
+
+def test_write_cohort_ttl_leaves_no_partial_file():
+    """A cohort that fails part-way does not leave a truncated TTL (or temp file) behind."""
+    bad_file = os.path.join(OUTPUT_DIR, 'bad_cohort.json')
+    with open(bad_file, 'w') as f:
+        json.dump({"id": 1, "name": "Bad", "concept_sets": [{"id": 1, "expression": {"items": [None]}}]}, f)
+
+    with pytest.raises(CohortParserError):
+        write_cohort_ttl(bad_file, os.path.join(OUTPUT_DIR, 'bad_cohort.ttl'))
+    assert not any(name.startswith('bad_cohort.ttl') for name in os.listdir(OUTPUT_DIR))
+
+def test_algorithm_inclusion_rules():
+    """Inclusion criteria subsections of an Atlas algorithm become ordered rules."""
+    algorithm = ("### Cohort Entry Events\n\n1. condition occurrence of 'Asthma'.\n\n"
+                 "### Inclusion Criteria\n\n#### 1. Age 18 or older\n\nEntry events with age >= 18.\n\n"
+                 "#### 2. No prior COPD\n\nEntry events having no condition occurrences of 'COPD'.\n\n"
+                 "### Cohort Exit\n\nThe person exits the cohort at the end of continuous observation.\n")
+    statements = {format_triple(t) for t in parse_human_readable_algorithm(algorithm, ":Cohort1")}
+
+    assert ':EntryCondition_Cohort1_1 rdfs:label "Asthma" .' in statements
+    assert ":AlgorithmActivity_Cohort1 prov:wasDerivedFrom :InclusionCriteriaActivity_Cohort1 ." in statements
+    assert ':InclusionRule_Cohort1_2 rdfs:label "No prior COPD" .' in statements
+    assert ':InclusionRule_Cohort1_2 :hasRuleOrder "2"^^xsd:integer .' in statements
+    assert ':InclusionRule_Cohort1_1 :hasRuleDescription "Entry events with age >= 18." .' in statements
+    assert ":ExitCriteriaActivity_Cohort1 :hasExitCriteria :EndOfObservation ." in statements
+
+def test_unnumbered_inclusion_rule_does_not_take_a_numbered_rules_uri():
+    """An unnumbered heading first in line must not share the URI of rule 1."""
+    algorithm = ("### Inclusion Criteria\n\n#### Prior observation\n\nAt least 365 days of observation.\n\n"
+                 "#### 1. Age 18 or older\n\nEntry events with age >= 18.\n\n"
+                 "#### No prior COPD\n\nNo condition occurrences of 'COPD'.\n")
+    statements = {format_triple(t) for t in parse_human_readable_algorithm(algorithm, ":Cohort1")}
+
+    rules = {s.split()[2] for s in statements if ":definesInclusionRule" in s}
+    assert rules == {":InclusionRule_Cohort1_1", ":InclusionRule_Cohort1_unnumbered_1",
+                     ":InclusionRule_Cohort1_unnumbered_2"}
+    assert ':InclusionRule_Cohort1_1 rdfs:label "Age 18 or older" .' in statements
+    assert ':InclusionRule_Cohort1_unnumbered_1 rdfs:label "Prior observation" .' in statements
+    assert ':InclusionRule_Cohort1_unnumbered_2 :hasRuleOrder "3"^^xsd:integer .' in statements
@@ -21,11 +21,23 @@ function App() {
     }
   };
 
+  // Validation and combine run as background jobs; poll until they finish
+  const waitForJob = async (jobId) => {
+    for (;;) {
+      const response = await axios.get(`/api/jobs/${jobId}`);
+      if (response.data.status === 'succeeded' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  };
+
   const runValidation = async () => {
     try {
       setLoading(true);
       const response = await axios.post('/api/validate');
-      alert(response.data.success ? 'Validation passed!' : 'Validation failed!');
+      const job = await waitForJob(response.data.job_id);
+      alert(job.result?.success ? 'Validation passed!' : 'Validation failed!');
     } catch (err) {
       alert('Error running validation');
     } finally {
@@ -37,7 +49,8 @@ function App() {
     try {
       setLoading(true);
       const response = await axios.post('/api/combine');
-      alert(response.data.success ? 'Ontologies combined successfully!' : 'Failed to combine ontologies!');
+      const job = await waitForJob(response.data.job_id);
+      alert(job.result?.success ? 'Ontologies combined successfully!' : 'Failed to combine ontologies!');
     } catch (err) {
       alert('Error combining ontologies');
     } finally {